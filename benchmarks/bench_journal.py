@@ -0,0 +1,91 @@
+"""
+Benchmark for the transfer journal overhead.
+Copies a folder of files with the copy engine, then replays the same run's
+journal writes (a durable plan record per batch of BATCH_SIZE, a done record
+per file) and reports their cost as a share of the copy time. Timing two
+full copies instead would mostly measure page cache noise.
+
+Usage: python benchmarks/bench_journal.py [--files 5000] [--size 262144]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.copy_engine import BATCH_SIZE, CopyEngine  # noqa: E402
+from operations.file_operations import FileOperationConfig  # noqa: E402
+from operations.journal import TransferJournal  # noqa: E402
+from operations.plan import PlanEntry  # noqa: E402
+
+
+def make_entries(source: str, dest: str, count: int, size: int) -> list:
+    """Create the source files and plan a transfer for each."""
+    payload = os.urandom(size)
+    entries = []
+    for i in range(count):
+        path = os.path.join(source, f"file_{i:06d}.bin")
+        with open(path, "wb") as f:
+            f.write(payload)
+        st = os.stat(path)
+        entries.append(PlanEntry(path, os.path.join(dest, f"file_{i:06d}.bin"), "Bench", size, st.st_mtime_ns))
+    return entries
+
+
+def copy_time(entries: list) -> float:
+    """Copy all entries with the copy engine, returning the elapsed time."""
+    engine = CopyEngine("Copy")
+    start = time.perf_counter()
+    engine.run(entries, lambda event: None, os.path.dirname(entries[0].source))
+    return time.perf_counter() - start
+
+
+def journal_time(entries: list, journal: TransferJournal) -> float:
+    """Write the journal records of a run over the entries, returning the elapsed time."""
+    start = time.perf_counter()
+    for i in range(0, len(entries), BATCH_SIZE):
+        batch = entries[i:i + BATCH_SIZE]
+        journal.planned(batch, [entry.destination for entry in batch])
+        for entry in batch:
+            journal.done(entry.source)
+    journal.mark_scanned()
+    journal.close(True)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=5_000, help="Files to copy")
+    parser.add_argument("--size", type=int, default=256 * 1024, help="Bytes per file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source")
+        dest = os.path.join(tmp, "dest")
+        for folder in (source, dest):
+            os.makedirs(folder)
+
+        entries = make_entries(source, dest, args.files, args.size)
+        copying = copy_time(entries)
+
+        config = FileOperationConfig(
+            folder_path=source,
+            dest_folder_path=dest,
+            mode="Basic",
+            selected_category="Bench",
+            selected_types=[".bin"],
+            operation_type="Copy",
+        )
+        journaling = journal_time(entries, TransferJournal(os.path.join(tmp, "run.journal"), config))
+
+    megabytes = args.files * args.size / 1_000_000
+    print(f"copy:    {copying:7.3f}s ({megabytes / copying:.1f} MB/s)")
+    print(f"journal: {journaling:7.3f}s ({journaling / args.files * 1e6:.1f} us/file)")
+    print(f"journal overhead: {journaling / copying * 100:.2f}% of copy time")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
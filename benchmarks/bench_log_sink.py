@@ -0,0 +1,107 @@
+"""
+Benchmark for the UI log sink.
+Times a preview of a synthetic tree while its events are sent to the log
+view, once with per-line QTextEdit.append (the previous behavior) and once
+with the batched LogHandler.
+
+Usage: QT_QPA_PLATFORM=offscreen python benchmarks/bench_log_sink.py [--count 100000]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication, QTextEdit  # noqa: E402
+
+from gui.main_window import LogHandler  # noqa: E402
+from operations.events import OperationEvent  # noqa: E402
+from operations.file_operations import FileOperationConfig, preview_changes  # noqa: E402
+
+
+def make_tree(root: str, count: int, per_dir: int = 1000) -> None:
+    """Create empty .mp4 files spread over subdirectories.
+
+    Args:
+        root: Folder to populate
+        count: Number of files
+        per_dir: Files per subdirectory
+    """
+    for i in range(count):
+        subdir = os.path.join(root, f"dir_{i // per_dir:04d}")
+        if i % per_dir == 0:
+            os.makedirs(subdir, exist_ok=True)
+        open(os.path.join(subdir, f"clip_{i:07d}.mp4"), "w").close()
+
+
+def legacy_log(log_area: QTextEdit) -> Callable[[OperationEvent], None]:
+    """Build a listener that appends and scrolls once per line, as before."""
+
+    def log(event: OperationEvent) -> None:
+        timestamp = time.strftime("%H:%M:%S")
+        log_area.append(
+            f"<span style='color:gray'>[{timestamp}]</span> <span style='color:white'>{event.describe()}</span>"
+        )
+        log_area.verticalScrollBar().setValue(log_area.verticalScrollBar().maximum())
+
+    return log
+
+
+def run_preview(
+    config: FileOperationConfig,
+    listener: Callable[[OperationEvent], None],
+    finish: Callable[[], None],
+) -> float:
+    """Run a preview with its events sent to a listener.
+
+    Returns:
+        Elapsed seconds, including the final flush of the sink
+    """
+    start = time.perf_counter()
+    preview_changes(config, on_event=listener)
+    finish()
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100_000, help="Number of files to preview")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)  # noqa: F841
+    logging.getLogger("operation_log").propagate = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source")
+        print(f"Creating {args.count} files...")
+        make_tree(source, args.count)
+        config = FileOperationConfig(
+            folder_path=source,
+            dest_folder_path=tmp,
+            mode="Basic",
+            selected_category="Video Basic",
+            selected_types=[".mp4"],
+        )
+
+        legacy_area = QTextEdit()
+        legacy = run_preview(config, legacy_log(legacy_area), lambda: None)
+        print(f"per-line append: {legacy:8.2f}s  ({legacy_area.document().blockCount()} lines in view)")
+
+        batched_area = QTextEdit()
+        handler = LogHandler(batched_area)
+        batched = run_preview(
+            config,
+            lambda event: handler.log(event.describe(), event.level, event.per_file),
+            handler.flush,
+        )
+        print(f"batched sink:    {batched:8.2f}s  ({batched_area.document().blockCount()} lines in view)")
+        print(f"speedup: {legacy / batched:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Micro-benchmark for filename matching.
+Compares the compiled FileMatcher against the previous per-file matching
+logic on a synthetic list of filenames.
+
+Usage: python benchmarks/bench_matcher.py [--count 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.file_extensions import CATEGORIES_MAP  # noqa: E402
+from operations.matcher import FileMatcher  # noqa: E402
+
+
+def make_names(count: int, seed: int = 42) -> List[str]:
+    """Generate synthetic filenames with a mix of extensions and cases.
+
+    Args:
+        count: Number of names to generate
+        seed: Random seed for reproducible runs
+
+    Returns:
+        List of filenames
+    """
+    rng = random.Random(seed)
+    extensions = sorted({ext for exts in CATEGORIES_MAP.values() for ext in exts})
+    extensions += ["", ".tar.gz", ".log", ".bak"]
+    names = []
+    for i in range(count):
+        ext = rng.choice(extensions)
+        if rng.random() < 0.3:
+            ext = ext.upper()
+        names.append(f"IMG_{i:07d}_holiday{ext}")
+    return names
+
+
+def legacy_matches(file: str, selected_types: List[str], keyword: str) -> bool:
+    """The matching logic used before FileMatcher, kept as a baseline."""
+    file_ext = os.path.splitext(file)[1].lower()
+    if file_ext not in [ext.lower() for ext in selected_types]:
+        return False
+    if not keyword:
+        return True
+    return keyword.lower() in file.lower()
+
+
+def timed(label: str, count: int, func: Callable[[], int]) -> float:
+    """Run a benchmark body and print its per-file cost.
+
+    Returns:
+        Elapsed seconds
+    """
+    start = time.perf_counter()
+    matched = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.3f}s  {elapsed / count * 1e9:8.1f} ns/file  ({matched} matched)")
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1_000_000, help="Number of synthetic names")
+    args = parser.parse_args()
+
+    names = make_names(args.count)
+    selected_types = list(CATEGORIES_MAP["Image All"])
+    keyword = "Holiday"
+    matcher = FileMatcher(selected_types, keyword)
+
+    print(f"{args.count} names, {len(selected_types)} selected types")
+    baseline = timed(
+        "legacy per-file",
+        args.count,
+        lambda: sum(legacy_matches(name, selected_types, keyword) for name in names),
+    )
+    single = timed("FileMatcher.matches", args.count, lambda: sum(map(matcher.matches, names)))
+    batch = timed("FileMatcher.match_many", args.count, lambda: sum(matcher.match_many(names)))
+    print(f"speedup: {baseline / single:.1f}x per-name, {baseline / batch:.1f}x batched")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
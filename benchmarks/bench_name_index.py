@@ -0,0 +1,72 @@
+"""
+Benchmark for destination conflict resolution.
+Resolves many files that all want the same name in one directory, once with
+the previous os.path.exists loop and once with DestinationNameIndex.
+
+The previous loop is quadratic, so by default it only runs on the first
+--legacy-count names and its cost for the full count is extrapolated.
+
+Usage: python benchmarks/bench_name_index.py [--count 50000] [--legacy-count 3000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.name_index import DestinationNameIndex  # noqa: E402
+
+
+def legacy_reserve(dest_dir: str, file: str) -> str:
+    """The conflict loop used before DestinationNameIndex."""
+    dest_path = os.path.join(dest_dir, file)
+    if os.path.exists(dest_path):
+        base, ext = os.path.splitext(file)
+        counter = 1
+        while os.path.exists(dest_path):
+            dest_path = os.path.join(dest_dir, f"{base}_{counter}{ext}")
+            counter += 1
+    return dest_path
+
+
+def touch(path: str) -> None:
+    """Create an empty file, standing in for the transfer."""
+    open(path, "x").close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=50_000, help="Colliding names to resolve")
+    parser.add_argument("--legacy-count", type=int, default=3_000, help="Names resolved with the old loop")
+    args = parser.parse_args()
+    legacy_count = min(args.legacy_count, args.count)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_dir = os.path.join(tmp, "legacy")
+        os.makedirs(legacy_dir)
+        start = time.perf_counter()
+        for _ in range(legacy_count):
+            touch(legacy_reserve(legacy_dir, "IMG_0001.jpg"))
+        legacy = time.perf_counter() - start
+        # n names cost about n^2 / 2 existence checks
+        legacy_full = legacy * (args.count / legacy_count) ** 2
+
+        index_dir = os.path.join(tmp, "index")
+        os.makedirs(index_dir)
+        index = DestinationNameIndex()
+        start = time.perf_counter()
+        for _ in range(args.count):
+            touch(index.reserve(os.path.join(index_dir, "IMG_0001.jpg")))
+        indexed = time.perf_counter() - start
+
+    print(f"os.path.exists loop: {legacy:8.2f}s for {legacy_count} names "
+          f"(~{legacy_full:.0f}s extrapolated to {args.count})")
+    print(f"DestinationNameIndex: {indexed:7.2f}s for {args.count} names")
+    print(f"speedup at {args.count} names: ~{legacy_full / indexed:.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Benchmark for the memory used by a preview plan.
+Stores synthetic entries (files spread over nested folders, as in a photo or
+video library) in a plan, measures the memory it holds with tracemalloc and
+reports bytes per planned file, compared with a plain list of PlanEntry
+objects. Paging through the stored plan is timed as well.
+
+Usage: python benchmarks/bench_plan_memory.py [--files 1000000] [--spill-threshold 0]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import Iterator, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.plan import PlanEntry, PlanStore  # noqa: E402
+
+SOURCE = "/media/inbox"
+DEST = "/media/library/Image All"
+
+
+def synthetic_entries(count: int, files_per_dir: int) -> Iterator[PlanEntry]:
+    """Generate entries without keeping them alive."""
+    for i in range(count):
+        folder = f"{SOURCE}/{2000 + i // 500_000}/{i // files_per_dir:06d}"
+        name = f"IMG_{i:08d}.jpg"
+        yield PlanEntry(f"{folder}/{name}", f"{DEST}/{name}", "Image All", 2_500_000 + i, 1_700_000_000_000_000_000 + i)
+
+
+def measure(count: int, files_per_dir: int, spill_threshold: Optional[int]) -> int:
+    """Bytes held by a PlanStore with count entries."""
+    gc.collect()
+    tracemalloc.start()
+    store = PlanStore(spill_threshold)
+    for entry in synthetic_entries(count, files_per_dir):
+        store.append(entry)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    pages = 0
+    for first in range(0, len(store), 50):
+        store.page(first, 50)
+        pages += 1
+    elapsed = time.perf_counter() - start
+    print(f"    paging: {elapsed / pages * 1e6:.1f} us per page of 50, {len(store)} entries")
+    store.close()
+    return held
+
+
+def measure_list(count: int, files_per_dir: int) -> int:
+    """Bytes held by a list of PlanEntry objects."""
+    gc.collect()
+    tracemalloc.start()
+    entries = list(synthetic_entries(count, files_per_dir))
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del entries
+    return held
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=1_000_000, help="Planned files")
+    parser.add_argument("--files-per-dir", type=int, default=200, help="Files per source folder")
+    parser.add_argument(
+        "--spill-threshold", type=int, default=0, help="Bytes of names kept in memory in the spilled run"
+    )
+    parser.add_argument("--skip-list", action="store_true", help="Do not measure the list baseline")
+    args = parser.parse_args()
+
+    results = []
+    if not args.skip_list:
+        results.append(("list of PlanEntry", measure_list(args.files, args.files_per_dir)))
+    print("in-memory plan:")
+    results.append(("plan, names in memory", measure(args.files, args.files_per_dir, None)))
+    print("spilled plan:")
+    results.append(("plan, names spilled", measure(args.files, args.files_per_dir, args.spill_threshold)))
+
+    for label, held in results:
+        print(f"{label:24s} {held / 1_000_000:8.1f} MB  {held / args.files:6.1f} bytes/file")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
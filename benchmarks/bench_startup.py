@@ -0,0 +1,134 @@
+"""
+Benchmark for application startup.
+Launches the GUI and the CLI in fresh processes and measures, from process
+launch, the time until the main window is shown and until the CLI reports its
+first matched file. Each run is also traced with -X importtime and the
+slowest top-level imports are listed, so a regression can be traced to the
+module that caused it.
+
+The GUI uses Qt's offscreen platform unless QT_QPA_PLATFORM is set. With
+--cold every run gets an empty bytecode cache, so modules are compiled
+again as on a fresh install.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--cold] [--top 8]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs main.main(), but returns as soon as the window has been painted
+GUI_DRIVER = f"""
+import sys
+sys.path.insert(0, {REPO!r})
+from PyQt6.QtWidgets import QApplication
+
+def exec_until_shown(app):
+    app.processEvents()
+    print("WINDOW SHOWN", flush=True)
+    return 0
+
+QApplication.exec = exec_until_shown
+import main
+sys.exit(main.main())
+"""
+
+
+def top_level_imports(stderr: str) -> Dict[str, int]:
+    """Parse -X importtime output into cumulative microseconds per top-level import."""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented further than the single leading space
+        if cumulative_us.strip().isdigit() and not name.startswith("  "):
+            imports[name.strip()] = int(cumulative_us)
+    return imports
+
+
+def run(command: List[str], marker, cwd: str, env: Dict[str, str]) -> Tuple[float, Dict[str, int]]:
+    """Run a command until it prints a line for which marker() is true.
+
+    Returns:
+        Tuple of (seconds from launch to that line, top-level import times)
+    """
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-X", "importtime", *command],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        cwd=cwd,
+        env=env,
+    )
+    reached = None
+    for line in proc.stdout:
+        if reached is None and marker(line):
+            reached = time.perf_counter() - start
+    stderr = proc.stderr.read()
+    proc.wait()
+    if reached is None:
+        raise RuntimeError(f"{command[0]} exited with {proc.returncode} before reaching the marker:\n{stderr[-2000:]}")
+    return reached, top_level_imports(stderr)
+
+
+def report(label: str, results: List[Tuple[float, Dict[str, int]]], top: int) -> None:
+    """Print timings and the slowest imports of a scenario."""
+    times = [seconds for seconds, _ in results]
+    print(f"{label}: median {statistics.median(times) * 1000:6.1f} ms, min {min(times) * 1000:6.1f} ms")
+    imports = results[-1][1]
+    for name, micros in sorted(imports.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"    {micros / 1000:7.1f} ms  {name}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per scenario")
+    parser.add_argument("--files", type=int, default=2_000, help="Files in the tree scanned by the CLI")
+    parser.add_argument("--cold", action="store_true", help="Use an empty bytecode cache for every run")
+    parser.add_argument("--top", type=int, default=8, help="Slowest top-level imports to list")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source")
+        dest = os.path.join(tmp, "dest")
+        os.makedirs(dest)
+        for i in range(args.files):
+            folder = os.path.join(source, f"dir_{i % 20:02d}")
+            os.makedirs(folder, exist_ok=True)
+            open(os.path.join(folder, f"file_{i:06d}{'.mp4' if i % 2 else '.txt'}"), "w").close()
+
+        gui_runs, cli_runs = [], []
+        for i in range(args.runs):
+            env = dict(os.environ)
+            env.setdefault("QT_QPA_PLATFORM", "offscreen")
+            if args.cold:
+                env["PYTHONPYCACHEPREFIX"] = os.path.join(tmp, f"pycache_{i}")
+            # The GUI writes its log file to the working directory
+            gui_runs.append(run(["-c", GUI_DRIVER], lambda line: line.startswith("WINDOW SHOWN"), tmp, env))
+            cli_runs.append(run(
+                [os.path.join(REPO, "cli.py"), "preview", source, dest, "--category", "Video Basic"],
+                lambda line: json.loads(line)["event"] == "FileMatched",
+                tmp,
+                env,
+            ))
+
+    report("time to window", gui_runs, args.top)
+    report("time to first scanned file (CLI)", cli_runs, args.top)
+    qt = sorted(name for name in cli_runs[-1][1] if name.startswith("PyQt6"))
+    if qt:
+        print(f"the CLI must not import PyQt6, but imported: {', '.join(qt)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
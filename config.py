@@ -131,7 +131,7 @@ class Config:
         """Set the match type for file matching.
         
         Args:
-            match_type: 'Contains' or 'Exact Match'
+            match_type: 'Contains', 'Exact Match', 'Glob' or 'Regex'
         """
         self._match_type = match_type
     
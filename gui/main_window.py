@@ -2,13 +2,20 @@
 Main window implementation for File Falcon Pro.
 This module contains the primary UI components and layout.
 """
+import html
+import logging
+import queue
 import time
-from typing import Optional
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Optional, Tuple
 
-from PyQt6.QtGui import QIcon
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtGui import QIcon, QTextCursor
 from PyQt6.QtWidgets import (
     QButtonGroup,
+    QCheckBox,
     QComboBox,
+    QDoubleSpinBox,
     QFileDialog,
     QGridLayout,
     QGroupBox,
@@ -16,59 +23,160 @@ from PyQt6.QtWidgets import (
     QLabel,
     QLineEdit,
     QListWidget,
+    QListWidgetItem,
     QMainWindow,
     QMessageBox,
     QPushButton,
     QRadioButton,
     QStatusBar,
+    QTabWidget,
     QTextEdit,
     QVBoxLayout,
     QWidget,
 )
 
 from config import Config
-from operations.file_extensions import CATEGORIES_MAP
-from operations.file_operations import FileOperationConfig, execute_changes, preview_changes
+from gui.widgets import PreviewPane
+from gui.workers import OperationTask, OperationWorker
+from operations.file_extensions import CATEGORIES_MAP, EXTENSION_INDEX
+from operations.layout import DEFAULT_LAYOUT, LAYOUT_FIELDS, LAYOUT_PRESETS
+from operations.metrics import OperationStats
+from operations.plan import OperationPlan
 
+if TYPE_CHECKING:
+    # Imported on first use: it loads pydantic and the whole operations stack,
+    # none of which is needed to show the window
+    from operations.file_operations import FileOperationConfig
 
-class LogHandler:
-    """Handler for displaying log messages in the UI."""
+
+# Maximum number of lines kept in the log view; older lines spill to the log file
+MAX_LOG_LINES = 5000
+
+# Interval at which queued log messages are drained into the view
+LOG_FLUSH_INTERVAL_MS = 100
+
+# Per-file lines beyond this many per flush are collapsed into a summary line
+MAX_FILE_LINES_PER_FLUSH = 50
+
+# Bytes per unit of the size limits; binary, like the CLI's M suffix
+SIZE_UNIT = 1024 ** 2
+
+LEVEL_COLORS = {
+    "success": "green",
+    "warning": "orange",
+    "error": "red",
+    "info": "white",
+}
+
+
+class LogHandler(QObject):
+    """Handler for displaying log messages in the UI.
+    
+    Messages are queued by log(), which is safe to call from any thread, and
+    drained into the view in batches on a timer.
+    """
     
-    def __init__(self, log_area: QTextEdit):
+    def __init__(
+        self,
+        log_area: QTextEdit,
+        max_lines: int = MAX_LOG_LINES,
+        flush_interval_ms: int = LOG_FLUSH_INTERVAL_MS,
+    ):
         """Initialize the log handler.
         
         Args:
             log_area: Text edit widget to display logs
+            max_lines: Number of lines kept in the view
+            flush_interval_ms: Milliseconds between batched updates of the view
         """
+        super().__init__(log_area)
         self.log_area = log_area
+        self.log_area.setUndoRedoEnabled(False)
+        self.log_area.document().setMaximumBlockCount(max_lines)
+        self.collapse_file_lines = True
+        self._pending: "queue.SimpleQueue[Tuple[str, str, str, bool]]" = queue.SimpleQueue()
+        self._shown: Deque[str] = deque()
+        self._max_lines = max_lines
+        self._spill_logger = logging.getLogger("operation_log")
+        
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start(flush_interval_ms)
     
-    def log(self, message: str, level: str = "info") -> None:
-        """Log a message to the UI.
+    def log(self, message: str, level: str = "info", per_file: bool = False) -> None:
+        """Queue a message for the UI.
         
         Args:
             message: Message to log
             level: Log level (info, success, warning, error)
+            per_file: Whether this is a per-file line that may be collapsed
         """
-        timestamp = time.strftime("%H:%M:%S")
-        
-        # Set color based on level
-        if level == "success":
-            color = "green"
-        elif level == "warning":
-            color = "orange"
-        elif level == "error":
-            color = "red"
-        else:  # info
-            color = "white"
-        
-        # Format and append message
-        formatted_message = f"<span style='color:gray'>[{timestamp}]</span> <span style='color:{color}'>{message}</span>"
-        self.log_area.append(formatted_message)
+        self._pending.put((time.strftime("%H:%M:%S"), str(message), level, per_file))
+    
+    def flush(self) -> None:
+        """Append all queued messages to the view in a single edit."""
+        if self._pending.empty():
+            return
+        
+        lines = []
+        collapsed = 0
+        file_lines = 0
+        while not self._pending.empty():
+            timestamp, message, level, per_file = self._pending.get_nowait()
+            if per_file and self.collapse_file_lines:
+                file_lines += 1
+                if file_lines > MAX_FILE_LINES_PER_FLUSH:
+                    collapsed += 1
+                    self._spill_logger.info(message)
+                    continue
+            if collapsed:
+                # Summarize the collapsed run where it ended, before this line
+                lines.append(self._collapsed_line(collapsed))
+                collapsed = 0
+            lines.append((timestamp, message, level))
+        if collapsed:
+            lines.append(self._collapsed_line(collapsed))
+        
+        cursor = QTextCursor(self.log_area.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        for timestamp, message, level in lines:
+            if not self.log_area.document().isEmpty():
+                cursor.insertBlock()
+            color = LEVEL_COLORS.get(level, "white")
+            cursor.insertHtml(
+                f"<span style='color:gray'>[{timestamp}]</span> "
+                f"<span style='color:{color}'>{html.escape(message)}</span>"
+            )
+            self._remember(f"[{timestamp}] {message}")
+        cursor.endEditBlock()
         
         # Scroll to bottom
         self.log_area.verticalScrollBar().setValue(
             self.log_area.verticalScrollBar().maximum()
         )
+    
+    @staticmethod
+    def _collapsed_line(count: int) -> Tuple[str, str, str]:
+        """Build the line standing in for a run of collapsed per-file lines.
+        
+        Args:
+            count: Number of per-file lines left out of the view
+            
+        Returns:
+            (timestamp, message, level) of the summary line
+        """
+        return time.strftime("%H:%M:%S"), f"... {count} more file lines (see log file)", "info"
+    
+    def _remember(self, line: str) -> None:
+        """Track a displayed line, spilling the oldest once the view is full.
+        
+        Args:
+            line: Plain-text line that was added to the view
+        """
+        self._shown.append(line)
+        if len(self._shown) > self._max_lines:
+            self._spill_logger.info(self._shown.popleft())
 
 
 class MainWindow(QMainWindow):
@@ -89,6 +197,7 @@ class MainWindow(QMainWindow):
         self.source_label = None
         self.dest_label = None
         self.category_combo = None
+        self.route_all_check = None
         self.file_type_list = None
         self.mode_basic_radio = None
         self.mode_advanced_radio = None
@@ -96,15 +205,32 @@ class MainWindow(QMainWindow):
         self.keyword_entry = None
         self.contains_radio = None
         self.exact_radio = None
+        self.glob_radio = None
+        self.regex_radio = None
         self.match_type_group = None
+        self.sniff_combo = None
+        self.min_size_spin = None
+        self.max_size_spin = None
+        self.min_age_spin = None
+        self.max_age_spin = None
+        self.date_field_combo = None
+        self.dest_layout_combo = None
         self.move_radio = None
         self.copy_radio = None
         self.operation_group = None
         self.preview_btn = None
         self.execute_btn = None
+        self.cancel_btn = None
         self.status_bar = None
         self.log_area = None
+        self.summarize_check = None
+        self.live_stats_check = None
+        self.results_tabs = None
+        self.preview_pane = None
         self.log_handler = None
+        self.last_plan: Optional[OperationPlan] = None
+        self.worker: Optional[OperationWorker] = None
+        self.run_metrics: Optional[OperationStats] = None
         
         # Set window properties
         self.setWindowTitle("File Falcon Pro")
@@ -135,6 +261,11 @@ class MainWindow(QMainWindow):
         self.category_combo.currentTextChanged.connect(self._update_file_types)
         category_layout.addWidget(self.category_combo)
         
+        # Route every file to its own category in a single pass
+        self.route_all_check = QCheckBox("Sort into all categories in one pass")
+        self.route_all_check.toggled.connect(self._on_route_all_toggled)
+        category_layout.addWidget(self.route_all_check)
+        
         main_layout.addWidget(category_group)
         
         # Create folder selection area
@@ -211,18 +342,79 @@ class MainWindow(QMainWindow):
         match_layout = QHBoxLayout()
         self.contains_radio = QRadioButton("Contains")
         self.exact_radio = QRadioButton("Exact Match")
+        self.glob_radio = QRadioButton("Glob")
+        self.glob_radio.setToolTip("Wildcard patterns separated by ';', e.g. IMG_2024*;DSC_????.*")
+        self.regex_radio = QRadioButton("Regex")
+        self.regex_radio.setToolTip(r"Regular expression searched in the filename, e.g. ^\d{8}_\d{6}")
         self.contains_radio.setChecked(True)
         
         self.match_type_group = QButtonGroup()
         self.match_type_group.addButton(self.contains_radio)
         self.match_type_group.addButton(self.exact_radio)
+        self.match_type_group.addButton(self.glob_radio)
+        self.match_type_group.addButton(self.regex_radio)
         
         match_layout.addWidget(QLabel("Match Type:"))
         match_layout.addWidget(self.contains_radio)
         match_layout.addWidget(self.exact_radio)
+        match_layout.addWidget(self.glob_radio)
+        match_layout.addWidget(self.regex_radio)
         match_layout.addStretch()
         advanced_layout.addLayout(match_layout)
         
+        # Content sniffing options
+        sniff_layout = QHBoxLayout()
+        sniff_layout.addWidget(QLabel("Detect type from content:"))
+        self.sniff_combo = QComboBox()
+        self.sniff_combo.addItem("Off", "Off")
+        self.sniff_combo.addItem("Files with unknown extensions", "Unknown")
+        self.sniff_combo.addItem("All files", "All")
+        self.sniff_combo.setToolTip(
+            "Read the first few KB of files to route extensionless or mislabeled files by their content"
+        )
+        sniff_layout.addWidget(self.sniff_combo)
+        sniff_layout.addStretch()
+        advanced_layout.addLayout(sniff_layout)
+        
+        # Size and age filters; 0 means no limit
+        size_layout = QHBoxLayout()
+        size_layout.addWidget(QLabel("Size (MiB):"))
+        self.min_size_spin = self._limit_spin_box(1_000_000, "Any")
+        self.max_size_spin = self._limit_spin_box(1_000_000, "Any")
+        size_layout.addWidget(QLabel("from"))
+        size_layout.addWidget(self.min_size_spin)
+        size_layout.addWidget(QLabel("to"))
+        size_layout.addWidget(self.max_size_spin)
+        size_layout.addStretch()
+        advanced_layout.addLayout(size_layout)
+        
+        age_layout = QHBoxLayout()
+        age_layout.addWidget(QLabel("Age (days):"))
+        self.min_age_spin = self._limit_spin_box(100_000, "Any")
+        self.max_age_spin = self._limit_spin_box(100_000, "Any")
+        age_layout.addWidget(QLabel("from"))
+        age_layout.addWidget(self.min_age_spin)
+        age_layout.addWidget(QLabel("to"))
+        age_layout.addWidget(self.max_age_spin)
+        self.date_field_combo = QComboBox()
+        self.date_field_combo.addItem("since modified", "mtime")
+        self.date_field_combo.addItem("since changed (ctime)", "ctime")
+        age_layout.addWidget(self.date_field_combo)
+        age_layout.addStretch()
+        advanced_layout.addLayout(age_layout)
+        
+        # Destination layout, editable beyond the presets
+        dest_layout_row = QHBoxLayout()
+        dest_layout_row.addWidget(QLabel("Destination folders:"))
+        self.dest_layout_combo = QComboBox()
+        self.dest_layout_combo.setEditable(True)
+        self.dest_layout_combo.addItems(LAYOUT_PRESETS)
+        self.dest_layout_combo.setToolTip(
+            "Folders under the destination; placeholders: " + " ".join(f"{{{name}}}" for name in LAYOUT_FIELDS)
+        )
+        dest_layout_row.addWidget(self.dest_layout_combo, 1)
+        advanced_layout.addLayout(dest_layout_row)
+        
         main_layout.addWidget(advanced_group)
         
         # Show/hide advanced options based on mode
@@ -246,10 +438,10 @@ class MainWindow(QMainWindow):
         operation_layout.addWidget(self.copy_radio)
         main_layout.addWidget(operation_group)
         
-        # Create log area
-        log_group = QGroupBox("Operation Log")
-        log_layout = QVBoxLayout()
-        log_group.setLayout(log_layout)
+        # Create log area and preview results, one tab each
+        self.results_tabs = QTabWidget()
+        log_tab = QWidget()
+        log_layout = QVBoxLayout(log_tab)
         
         self.log_area = QTextEdit()
         self.log_area.setReadOnly(True)
@@ -257,10 +449,26 @@ class MainWindow(QMainWindow):
         self.log_area.setMinimumHeight(150)
         log_layout.addWidget(self.log_area)
         
-        main_layout.addWidget(log_group)
+        log_options_layout = QHBoxLayout()
+        self.summarize_check = QCheckBox("Summarize per-file lines")
+        self.summarize_check.setChecked(True)
+        log_options_layout.addWidget(self.summarize_check)
+        self.live_stats_check = QCheckBox("Show live statistics in the status bar")
+        log_options_layout.addWidget(self.live_stats_check)
+        log_options_layout.addStretch()
+        log_layout.addLayout(log_options_layout)
+        self.results_tabs.addTab(log_tab, "Operation Log")
+        
+        self.preview_pane = PreviewPane()
+        self.results_tabs.addTab(self.preview_pane, "Preview")
+        
+        main_layout.addWidget(self.results_tabs)
         
         # Create log handler
         self.log_handler = LogHandler(self.log_area)
+        self.summarize_check.toggled.connect(
+            lambda checked: setattr(self.log_handler, "collapse_file_lines", checked)
+        )
         self.log_handler.log("File Falcon Pro started. Ready for operations.")
         
         # Create button area
@@ -274,9 +482,15 @@ class MainWindow(QMainWindow):
         self.execute_btn.setIcon(QIcon.fromTheme("document-save"))
         self.execute_btn.clicked.connect(self._execute_changes)
         
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setIcon(QIcon.fromTheme("process-stop"))
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self._cancel_operation)
+        
         button_layout.addStretch()
         button_layout.addWidget(self.preview_btn)
         button_layout.addWidget(self.execute_btn)
+        button_layout.addWidget(self.cancel_btn)
         main_layout.addLayout(button_layout)
         
         # Create status bar
@@ -290,6 +504,23 @@ class MainWindow(QMainWindow):
         # Update labels if paths are already set
         self._update_folder_labels()
     
+    @staticmethod
+    def _limit_spin_box(maximum: float, no_limit_text: str) -> QDoubleSpinBox:
+        """Create a spin box for an optional limit, showing no_limit_text at 0.
+        
+        Args:
+            maximum: Largest value that can be entered
+            no_limit_text: Text shown instead of 0
+            
+        Returns:
+            The spin box
+        """
+        spin = QDoubleSpinBox()
+        spin.setRange(0, maximum)
+        spin.setDecimals(1)
+        spin.setSpecialValueText(no_limit_text)
+        return spin
+    
     def _select_folder(self, folder_type: str) -> None:
         """Handle selecting a folder.
         
@@ -332,10 +563,28 @@ class MainWindow(QMainWindow):
         
         if selected_category in CATEGORIES_MAP:
             for ext in sorted(CATEGORIES_MAP[selected_category]):
-                self.file_type_list.addItem(ext)
+                item = QListWidgetItem(ext)
+                # Extensions shared with other categories are routed by precedence
+                others = [category for category in EXTENSION_INDEX[ext] if category != selected_category]
+                if others:
+                    item.setToolTip(f"Also in: {', '.join(others)}")
+                self.file_type_list.addItem(item)
                 
         self.log_handler.log(f"Selected category: {selected_category}")
     
+    def _on_route_all_toggled(self, checked: bool) -> None:
+        """Switch between one category and sorting into all of them.
+        
+        Args:
+            checked: Whether files are routed to every category
+        """
+        self.category_combo.setEnabled(not checked)
+        self.file_type_list.setEnabled(not checked)
+        if checked:
+            self.log_handler.log("Sorting into all categories by file extension")
+        else:
+            self.log_handler.log(f"Selected category: {self.category_combo.currentText()}")
+    
     def _on_mode_change(self, button) -> None:
         """Handle mode change between Basic and Advanced.
         
@@ -347,7 +596,7 @@ class MainWindow(QMainWindow):
         self.config.set_mode(mode)
         self.log_handler.log(f"Switched to {mode} mode")
     
-    def _get_file_operation_config(self) -> Optional[FileOperationConfig]:
+    def _get_file_operation_config(self) -> Optional["FileOperationConfig"]:
         """Create a FileOperationConfig based on current UI state.
         
         Returns:
@@ -367,13 +616,14 @@ class MainWindow(QMainWindow):
             return None
         
         # Get selected file types
+        route_categories = list(CATEGORIES_MAP) if self.route_all_check.isChecked() else []
         selected_types = [
             self.file_type_list.item(i).text() 
             for i in range(self.file_type_list.count()) 
             if self.file_type_list.item(i).isSelected()
         ]
         
-        if not selected_types:
+        if not selected_types and not route_categories:
             self.log_handler.log("No file types selected: Please select at least one file type", "error")
             QMessageBox.warning(
                 self, 
@@ -382,15 +632,29 @@ class MainWindow(QMainWindow):
             )
             return None
         
+        from operations.file_operations import FileOperationConfig
+        
         # Create config
         try:
             operation_type = "Move" if self.move_radio.isChecked() else "Copy"
             mode = "Advanced" if self.mode_advanced_radio.isChecked() else "Basic" 
-            match_type = "Contains" if self.contains_radio.isChecked() else "Exact Match"
+            match_type = self.match_type_group.checkedButton().text()
+            content_sniffing = self.sniff_combo.currentData() if mode == "Advanced" else "Off"
+            limits = self._limit_options() if mode == "Advanced" else {}
+            dest_layout = self.dest_layout_combo.currentText().strip() if mode == "Advanced" else DEFAULT_LAYOUT
             
-            self.log_handler.log(f"Configuration: {operation_type} in {mode} mode with {len(selected_types)} file types")
+            if route_categories:
+                self.log_handler.log(f"Configuration: {operation_type} in {mode} mode into {len(route_categories)} categories")
+            else:
+                self.log_handler.log(f"Configuration: {operation_type} in {mode} mode with {len(selected_types)} file types")
             if mode == "Advanced":
                 self.log_handler.log(f"Advanced options: {match_type} match with keyword '{self.keyword_entry.text()}'")
+                if content_sniffing != "Off":
+                    self.log_handler.log(f"Detecting types from content: {self.sniff_combo.currentText()}")
+                if limits:
+                    self.log_handler.log(f"Limits: {', '.join(f'{name}={value}' for name, value in limits.items())}")
+                if dest_layout != DEFAULT_LAYOUT:
+                    self.log_handler.log(f"Destination folders: {dest_layout}")
                 
             return FileOperationConfig(
                 folder_path=str(source_path),
@@ -401,62 +665,82 @@ class MainWindow(QMainWindow):
                 keyword=self.keyword_entry.text(),
                 match_type=match_type,
                 operation_type=operation_type,
+                route_categories=route_categories,
+                content_sniffing=content_sniffing,
+                dest_layout=dest_layout,
+                **limits,
             )
         except ValueError as e:
             self.log_handler.log(f"Configuration error: {str(e)}", "error")
             QMessageBox.critical(self, "Configuration Error", str(e))
             return None
     
+    def _limit_options(self) -> Dict[str, Any]:
+        """Get the size and age limits set in the advanced options.
+        
+        Returns:
+            FileOperationConfig fields for the limits that are set
+        """
+        limits: Dict[str, Any] = {}
+        if self.min_size_spin.value():
+            limits["min_size"] = int(self.min_size_spin.value() * SIZE_UNIT)
+        if self.max_size_spin.value():
+            limits["max_size"] = int(self.max_size_spin.value() * SIZE_UNIT)
+        if self.min_age_spin.value():
+            limits["min_age_days"] = self.min_age_spin.value()
+        if self.max_age_spin.value():
+            limits["max_age_days"] = self.max_age_spin.value()
+        if "min_age_days" in limits or "max_age_days" in limits:
+            limits["date_field"] = self.date_field_combo.currentData()
+        return limits
+    
     def _preview_changes(self) -> None:
         """Preview the file changes without executing them."""
+        if self.worker is not None:
+            return
         config = self._get_file_operation_config()
         if not config:
             return
             
+        from operations.file_operations import preview_changes
+        
         self.status_bar.showMessage("Previewing changes...")
         self.log_handler.log("Starting preview operation...", "info")
         
-        # Connect the log handler to the operations module
-        class UILogAdapter:
-            def __init__(self, log_handler):
-                self.log_handler = log_handler
-                
-            def __call__(self, message):
-                self.log_handler.log(message)
-                
-        # Override rich print function to capture output
-        import operations.file_operations
-        original_print = operations.file_operations.console.print
-        
-        def ui_print(message, *args, **kwargs):
-            original_print(message, *args, **kwargs)
-            if hasattr(message, "style") and message.style == "bold red":
-                self.log_handler.log(str(message), "error")
-            elif hasattr(message, "style") and message.style == "bold green":
-                self.log_handler.log(str(message), "success")
-            elif hasattr(message, "style") and message.style == "yellow":
-                self.log_handler.log(str(message), "warning")
-            else:
-                self.log_handler.log(str(message), "info")
+        # Matches stream into the preview table instead of the log
+        plan = OperationPlan(config)
+        self.preview_pane.show_plan(plan)
+        self.results_tabs.setCurrentWidget(self.preview_pane)
+        metrics = self.run_metrics = OperationStats("Preview")
+        self._start_worker(
+            lambda cancel_event, on_event: preview_changes(config, cancel_event, on_event, plan, metrics),
+            self._on_preview_completed,
+            log_per_file=False,
+        )
+    
+    def _on_preview_completed(self, plan: OperationPlan) -> None:
+        """Handle the result of a preview run.
         
-        operations.file_operations.console.print = ui_print
+        Args:
+            plan: Plan returned by preview_changes
+        """
+        self.preview_pane.finish()
+        if self.worker.is_cancelled():
+            self.log_handler.log("Preview cancelled", "warning")
+            self.status_bar.showMessage("Preview cancelled", 3000)
+            return
         
-        try:
-            results = preview_changes(config)
-            
-            if not results:
-                self.log_handler.log("No files found matching your criteria.", "warning")
-            else:
-                total_files = sum(len(files) for files in results.values())
-                self.log_handler.log(f"Preview complete: Found {total_files} matching files", "success")
-        finally:
-            # Restore original print function
-            operations.file_operations.console.print = original_print
-            
+        self.last_plan = plan
+        if not plan:
+            self.log_handler.log("No files found matching your criteria.", "warning")
+        else:
+            self.log_handler.log(f"Preview complete: Found {len(plan)} matching files", "success")
         self.status_bar.showMessage("Preview complete", 3000)
     
     def _execute_changes(self) -> None:
         """Execute the file changes based on current configuration."""
+        if self.worker is not None:
+            return
         config = self._get_file_operation_config()
         if not config:
             return
@@ -474,36 +758,114 @@ class MainWindow(QMainWindow):
                 self.log_handler.log("Move operation cancelled by user", "warning")
                 return
         
+        from operations.file_operations import execute_changes
+        
         # Execute changes
         self.status_bar.showMessage(f"Executing {config.operation_type.lower()} operation...")
         self.log_handler.log(f"Starting {config.operation_type} operation...", "info")
+        self.results_tabs.setCurrentIndex(0)
+        
+        plan = self.last_plan
+        self.last_plan = None
+        metrics = self.run_metrics = OperationStats(config.operation_type)
+        self._start_worker(
+            lambda cancel_event, on_event: execute_changes(config, plan, cancel_event, on_event, metrics),
+            self._on_execute_completed,
+        )
+    
+    def _on_execute_completed(self, success: bool) -> None:
+        """Handle the result of an execute run.
         
-        # Override rich print function to capture output
-        import operations.file_operations
-        original_print = operations.file_operations.console.print
-        
-        def ui_print(message, *args, **kwargs):
-            original_print(message, *args, **kwargs)
-            if hasattr(message, "style") and message.style == "bold red":
-                self.log_handler.log(str(message), "error")
-            elif hasattr(message, "style") and message.style == "bold green":
-                self.log_handler.log(str(message), "success")
-            elif hasattr(message, "style") and message.style == "yellow":
-                self.log_handler.log(str(message), "warning")
-            else:
-                self.log_handler.log(str(message), "info")
+        Args:
+            success: Value returned by execute_changes
+        """
+        if self.worker.is_cancelled():
+            self.log_handler.log("Operation cancelled by user", "warning")
+            self.status_bar.showMessage("Operation cancelled", 5000)
+        elif success:
+            self.log_handler.log("Operation completed successfully", "success")
+            self.status_bar.showMessage("Operation completed successfully", 5000)
+        else:
+            self.log_handler.log("Operation completed with errors", "error")
+            self.status_bar.showMessage("Operation completed with errors", 5000)
+    
+    def _start_worker(
+        self,
+        task: OperationTask,
+        on_completed: Callable[[Any], None],
+        log_per_file: bool = True,
+    ) -> None:
+        """Run an operation on a background thread.
         
-        operations.file_operations.console.print = ui_print
+        Args:
+            task: Operation to run, see OperationWorker
+            on_completed: Slot receiving the operation's return value
+            log_per_file: Whether per-file events go to the log
+        """
+        self.worker = OperationWorker(task, self.log_handler.log, self, log_per_file)
+        self.worker.progress.connect(self._on_worker_progress)
+        self.worker.completed.connect(on_completed)
+        self.worker.failed.connect(self._on_worker_failed)
+        self.worker.finished.connect(self._on_worker_finished)
+        self._set_running(True)
+        self.worker.start()
+    
+    def _on_worker_progress(self, count: int) -> None:
+        """Show the number of files handled so far.
         
-        try:
-            success = execute_changes(config)
-            
-            if success:
-                self.log_handler.log("Operation completed successfully", "success")
-                self.status_bar.showMessage("Operation completed successfully", 5000)
-            else:
-                self.log_handler.log("Operation completed with errors", "error")
-                self.status_bar.showMessage("Operation completed with errors", 5000)
-        finally:
-            # Restore original print function
-            operations.file_operations.console.print = original_print
+        Args:
+            count: Files handled so far
+        """
+        if self.live_stats_check.isChecked() and self.run_metrics is not None:
+            self.status_bar.showMessage(self.run_metrics.summary())
+        else:
+            self.status_bar.showMessage(f"Working... {count} files")
+    
+    def _on_worker_failed(self, error: str) -> None:
+        """Report an unexpected error raised by a worker.
+        
+        Args:
+            error: Error message
+        """
+        self.log_handler.log(f"Operation failed: {error}", "error")
+        self.status_bar.showMessage("Operation failed", 5000)
+    
+    def _on_worker_finished(self) -> None:
+        """Clean up after a worker thread exits."""
+        # A preview that failed still shows the files found so far
+        self.preview_pane.finish()
+        if self.run_metrics is not None:
+            self.log_handler.log(f"Statistics: {self.run_metrics.summary()}")
+            self.run_metrics = None
+        self.worker.deleteLater()
+        self.worker = None
+        self._set_running(False)
+    
+    def _cancel_operation(self) -> None:
+        """Request cancellation of the running operation."""
+        if self.worker is None:
+            return
+        self.worker.cancel()
+        self.cancel_btn.setEnabled(False)
+        self.log_handler.log("Cancelling after the current file...", "warning")
+    
+    def _set_running(self, running: bool) -> None:
+        """Toggle the action buttons while an operation runs.
+        
+        Args:
+            running: Whether an operation is in progress
+        """
+        self.preview_btn.setEnabled(not running)
+        self.execute_btn.setEnabled(not running)
+        self.cancel_btn.setEnabled(running)
+    
+    def closeEvent(self, event) -> None:
+        """Stop any running operation before the window closes.
+        
+        Args:
+            event: Qt close event
+        """
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.wait()
+        super().closeEvent(event)
@@ -0,0 +1,369 @@
+"""
+Reusable widgets for File Falcon Pro.
+This module contains the preview results pane: a table view over an
+OperationPlan that only materializes the rows on screen, so previews of
+millions of files stay responsive.
+"""
+import os
+from array import array
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer
+from PyQt6.QtWidgets import (
+    QAbstractItemView,
+    QApplication,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QLineEdit,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
+)
+
+from operations.plan import MISSING, OperationPlan
+
+# Interval at which rows added by a running scan are shown
+PULL_INTERVAL_MS = 100
+
+# Entries tested against the filter per timer tick, so filtering never blocks the UI
+FILTER_CHUNK = 20_000
+
+# Rows read from the plan at once when the view needs one that is not cached
+FETCH_ROWS = 64
+
+# Formatted rows kept for painting
+ROW_CACHE_SIZE = 4096
+
+# Header, plan sort field for each column
+COLUMNS = [
+    ("Name", "name"),
+    ("Type", "extension"),
+    ("Size", "size"),
+    ("Folder", "source"),
+    ("Destination", "destination"),
+]
+SIZE_COLUMN = 2
+
+# Cached display values of a row: the column texts, then the full source path
+Row = Tuple[str, str, str, str, str, str]
+
+
+def format_size(size: int) -> str:
+    """Format a byte count for display.
+
+    Args:
+        size: Size in bytes, or MISSING
+
+    Returns:
+        Size with a binary unit, e.g. '1.5 MiB', like the CLI size options
+    """
+    if size == MISSING:
+        return "?"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+class PreviewTableModel(QAbstractTableModel):
+    """Table model over the entries of an OperationPlan.
+
+    Rows are formatted when the view asks for them. Without a sort or filter
+    row n is plan entry n; otherwise an array maps rows to entries. A plan
+    that is still being filled is polled on a timer and new entries are
+    appended as rows; they are sorted in once the scan finishes.
+    """
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        """Initialize an empty model.
+
+        Args:
+            parent: Optional Qt parent
+        """
+        super().__init__(parent)
+        self.plan: Optional[OperationPlan] = None
+        # Plan entries considered so far; later ones have not been pulled in
+        self._count = 0
+        # Row -> entry index when sorted or filtered, None for the identity
+        self._rows: Optional[array] = None
+        self._filter = ""
+        self._sort: Optional[Tuple[int, Qt.SortOrder]] = None
+        # Whether rows were appended after the last sort
+        self._unsorted_tail = False
+        # Entries still to be tested against a newly set filter
+        self._filter_job: Optional[Iterator[int]] = None
+        # Whether the filter runs over rows that are already sorted
+        self._filter_keeps_order = False
+        self._live = False
+        self._cache: Dict[int, Row] = {}
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(PULL_INTERVAL_MS)
+        self._timer.timeout.connect(self._pull)
+
+    def watch(self, plan: OperationPlan) -> None:
+        """Show a plan that a running preview is still filling.
+
+        Args:
+            plan: Plan to show
+        """
+        self.beginResetModel()
+        self.plan = plan
+        self._count = 0
+        self._rows = None if not self._filter else array("Q")
+        self._unsorted_tail = False
+        self._filter_job = None
+        self._cache.clear()
+        self.endResetModel()
+        self._live = True
+        self._timer.start()
+
+    def finish(self) -> None:
+        """Pull in the last entries of a finished preview and apply the sort."""
+        if not self._live:
+            return
+        self._live = False
+        while self._filter_job is not None or (self.plan is not None and self._count < len(self.plan)):
+            self._pull()
+        self._timer.stop()
+        if self._sort is not None and self._unsorted_tail and self._filter_job is None:
+            self.sort(*self._sort)
+
+    @property
+    def total(self) -> int:
+        """Number of plan entries pulled in, shown or filtered out."""
+        return self._count
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return self._count if self._rows is None else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(
+        self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole
+    ) -> Any:
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return COLUMNS[section][0]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._row(index.row())[index.column()]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self._row(index.row())[-1]
+        if role == Qt.ItemDataRole.TextAlignmentRole and index.column() == SIZE_COLUMN:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
+        """Sort the rows pulled in so far by a column."""
+        if not 0 <= column < len(COLUMNS):
+            return
+        self._sort = (column, order)
+        if self.plan is None or self._filter_job is not None:
+            # Applied once there are rows, or once the filter has run
+            return
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            key = self.plan.entries.sort_key(COLUMNS[column][1])
+            rows = range(self._count) if self._rows is None else self._rows
+            self.beginResetModel()
+            self._rows = array("Q", sorted(rows, key=key, reverse=order == Qt.SortOrder.DescendingOrder))
+            self._unsorted_tail = False
+            self._cache.clear()
+            self.endResetModel()
+        finally:
+            QApplication.restoreOverrideCursor()
+
+    def set_filter(self, text: str) -> None:
+        """Show only the entries whose source or destination path contains a text.
+
+        Matching is case-insensitive and runs in chunks on the timer. When the
+        text only gets longer, just the rows currently shown are re-tested.
+
+        Args:
+            text: Text to look for; empty shows every entry
+        """
+        text = text.strip().lower()
+        if text == self._filter:
+            return
+        narrowing = bool(self._filter) and self._filter in text and self._filter_job is None
+        shown = self._rows
+        self._filter = text
+        self.beginResetModel()
+        self._cache.clear()
+        if not text:
+            self._rows = None
+            self._filter_job = None
+            self.endResetModel()
+            if self._sort is not None:
+                self.sort(*self._sort)
+            return
+        self._rows = array("Q")
+        # Re-testing the shown rows keeps their order; all entries are in plan order
+        self._filter_job = iter(shown) if narrowing else iter(range(self._count))
+        self._filter_keeps_order = narrowing
+        self.endResetModel()
+        self._timer.start()
+
+    def _pull(self) -> None:
+        """Timer tick: advance a pending filter, then show newly planned entries."""
+        if self.plan is None:
+            return
+        if self._filter_job is not None:
+            chunk = list(islice(self._filter_job, FILTER_CHUNK))
+            if len(chunk) < FILTER_CHUNK:
+                self._filter_job = None
+            self._append_rows(self._matching(chunk))
+            if self._filter_job is None:
+                if self._sort is not None and not self._filter_keeps_order:
+                    self.sort(*self._sort)
+                if not self._live:
+                    self._timer.stop()
+            return
+
+        total = len(self.plan)
+        if total <= self._count:
+            if not self._live:
+                self._timer.stop()
+            return
+        self._unsorted_tail = True
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), self._count, total - 1)
+            self._count = total
+            self.endInsertRows()
+            return
+        new = list(range(self._count, min(total, self._count + FILTER_CHUNK)))
+        self._count = new[-1] + 1
+        self._append_rows(self._matching(new) if self._filter else new)
+
+    def _matching(self, entry_indexes: List[int]) -> List[int]:
+        """Get the entries among some indexes that pass the filter."""
+        if not entry_indexes:
+            return []
+        plan = self.plan
+        first = entry_indexes[0]
+        if entry_indexes[-1] - first + 1 == len(entry_indexes):
+            # A run of consecutive entries is read in one go
+            entries = plan.page(first, len(entry_indexes))
+        else:
+            entries = [plan[entry_index] for entry_index in entry_indexes]
+        source_root = len(os.path.join(plan.config.folder_path, ""))
+        dest_root = len(os.path.join(plan.config.dest_folder_path, ""))
+        text = self._filter
+        return [
+            entry_index
+            for entry_index, entry in zip(entry_indexes, entries)
+            if text in entry.source[source_root:].lower() or text in entry.destination[dest_root:].lower()
+        ]
+
+    def _append_rows(self, entry_indexes: List[int]) -> None:
+        """Append rows for entries at the end of the table."""
+        if not entry_indexes:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(entry_indexes) - 1)
+        self._rows.extend(entry_indexes)
+        self.endInsertRows()
+
+    def _row(self, row: int) -> Row:
+        """Get the display values of a row, reading the plan on a cache miss."""
+        entry_index = row if self._rows is None else self._rows[row]
+        cached = self._cache.get(entry_index)
+        if cached is not None:
+            return cached
+        if len(self._cache) >= ROW_CACHE_SIZE:
+            self._cache.clear()
+        # Neighbouring entries are likely to be painted next when unsorted
+        count = FETCH_ROWS if self._rows is None else 1
+        source_root = self.plan.config.folder_path
+        dest_root = self.plan.config.dest_folder_path
+        for offset, entry in enumerate(self.plan.page(entry_index, count)):
+            name = os.path.basename(entry.source)
+            self._cache[entry_index + offset] = (
+                name,
+                os.path.splitext(name)[1].lower(),
+                format_size(entry.size),
+                os.path.relpath(os.path.dirname(entry.source), source_root),
+                os.path.relpath(os.path.dirname(entry.destination), dest_root),
+                entry.source,
+            )
+        return self._cache[entry_index]
+
+
+class PreviewPane(QWidget):
+    """Preview results: a filter box, a sortable table and a row count."""
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        """Initialize the pane.
+
+        Args:
+            parent: Optional Qt parent
+        """
+        super().__init__(parent)
+        self.model = PreviewTableModel(self)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        filter_layout = QHBoxLayout()
+        self.filter_entry = QLineEdit()
+        self.filter_entry.setPlaceholderText("Filter by path...")
+        self.filter_entry.setClearButtonEnabled(True)
+        self.filter_entry.textChanged.connect(self.model.set_filter)
+        self.count_label = QLabel("No preview yet")
+        filter_layout.addWidget(self.filter_entry)
+        filter_layout.addWidget(self.count_label)
+        layout.addLayout(filter_layout)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        # Start unsorted; enabling sorting applies the current indicator
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.table.setSortingEnabled(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setWordWrap(False)
+        self.table.setAlternatingRowColors(True)
+        # Fixed row heights keep scrolling cheap however many rows there are
+        vertical_header = self.table.verticalHeader()
+        vertical_header.setVisible(False)
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(self.table.fontMetrics().height() + 6)
+        horizontal_header = self.table.horizontalHeader()
+        horizontal_header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        horizontal_header.setStretchLastSection(True)
+        horizontal_header.resizeSection(0, 260)
+        layout.addWidget(self.table)
+
+        self.model.rowsInserted.connect(self._update_count)
+        self.model.modelReset.connect(self._update_count)
+
+    def show_plan(self, plan: OperationPlan) -> None:
+        """Show a plan, typically one a preview is about to fill.
+
+        Args:
+            plan: Plan to show
+        """
+        self.model.watch(plan)
+
+    def finish(self) -> None:
+        """Show the last rows of a finished preview."""
+        self.model.finish()
+        self._update_count()
+
+    def _update_count(self, *args) -> None:
+        """Show how many files are listed."""
+        shown = self.model.rowCount()
+        total = self.model.total
+        if shown == total:
+            self.count_label.setText(f"{total} files")
+        else:
+            self.count_label.setText(f"{shown} of {total} files")
@@ -0,0 +1,101 @@
+"""
+Background workers for File Falcon Pro.
+This module runs file operations off the Qt event-loop thread and reports
+back to the UI through signals.
+"""
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from operations.events import (
+    EventListener,
+    FileFailed,
+    FileMatched,
+    FileTransferred,
+    OperationEvent,
+)
+
+# Minimum seconds between progress signals, so the UI is not flooded
+PROGRESS_INTERVAL = 0.05
+
+# An operation task receives the cancel event and an event listener
+OperationTask = Callable[[threading.Event, EventListener], Any]
+
+# Thread-safe log sink taking (message, level, per_file), e.g. LogHandler.log
+LogSink = Callable[[str, str, bool], None]
+
+
+class OperationWorker(QThread):
+    """Runs a preview or execute task on a background thread.
+
+    Operation events are passed straight to the log sink instead of through a
+    signal per line; progress, completion and errors are signals.
+    """
+
+    progress = pyqtSignal(int)
+    completed = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(
+        self,
+        task: OperationTask,
+        log: LogSink,
+        parent: Optional[QObject] = None,
+        log_per_file: bool = True,
+    ):
+        """Initialize the worker.
+
+        Args:
+            task: Callable running the operation; it must check the cancel
+                event between files and report through the event listener
+            log: Thread-safe sink receiving a line per operation event
+            parent: Optional Qt parent
+            log_per_file: Whether per-file events are logged; they are still
+                counted for progress when not
+        """
+        super().__init__(parent)
+        self.task = task
+        self.log = log
+        self.log_per_file = log_per_file
+        self.cancel_event = threading.Event()
+        self._files = 0
+        self._last_progress = 0.0
+
+    def cancel(self) -> None:
+        """Ask the operation to stop after the current file."""
+        self.cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        """Check whether cancellation was requested.
+
+        Returns:
+            True if cancel() was called
+        """
+        return self.cancel_event.is_set()
+
+    def run(self) -> None:
+        """Run the task, forwarding its events to the log sink."""
+        try:
+            result = self.task(self.cancel_event, self._on_event)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.completed.emit(result)
+
+    def _on_event(self, event: OperationEvent) -> None:
+        """Log an operation event and emit throttled progress.
+
+        Args:
+            event: Event reported by the operation
+        """
+        if self.log_per_file or not event.per_file:
+            self.log(event.describe(), event.level, event.per_file)
+        if not isinstance(event, (FileMatched, FileTransferred, FileFailed)):
+            return
+        self._files += 1
+        now = time.monotonic()
+        if now - self._last_progress >= PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.progress.emit(self._files)
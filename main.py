@@ -15,14 +15,20 @@ from gui.main_window import MainWindow
 
 def setup_logging() -> None:
     """Configure application logging."""
+    file_handler = logging.FileHandler("filefalpro.log", mode="a")
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         handlers=[
             logging.StreamHandler(),
-            logging.FileHandler("filefalpro.log", mode="a")
+            file_handler
         ]
     )
+    
+    # Lines dropped from the UI log view go to the log file only
+    operation_log = logging.getLogger("operation_log")
+    operation_log.propagate = False
+    operation_log.addHandler(file_handler)
 
 
 def main() -> int:
@@ -0,0 +1,239 @@
+"""
+Asyncio API for File Falcon Pro.
+This module runs previews and executes from an asyncio application. The
+blocking work runs on a bounded pool of job threads, events are handed to the
+event loop through a bounded buffer so a slow consumer pauses the job instead
+of piling up events, and cancelling the awaiting task cancels the job.
+
+Every job has its own cancel event and event buffer, so several jobs on
+different folders can run in one event loop without interfering.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Optional
+
+from operations.events import EventListener, OperationEvent
+
+if TYPE_CHECKING:
+    from operations.file_operations import FileOperationConfig
+    from operations.plan import OperationPlan
+
+DEFAULT_MAX_JOBS = 4
+
+# Events a job may emit ahead of its consumer before it is paused
+DEFAULT_MAX_PENDING_EVENTS = 1024
+
+# How often a paused job checks whether it was cancelled, in seconds
+_CANCEL_POLL_INTERVAL = 0.1
+
+# Marks the end of a job's event stream
+_DONE = object()
+
+
+class AsyncOperations:
+    """Runs file operations for asyncio code on a managed pool of job threads."""
+
+    def __init__(
+        self,
+        max_jobs: int = DEFAULT_MAX_JOBS,
+        max_pending_events: int = DEFAULT_MAX_PENDING_EVENTS,
+    ):
+        """Initialize the runner.
+
+        Args:
+            max_jobs: Maximum number of previews/executes running at once;
+                further jobs wait for a free slot
+            max_pending_events: Events a job may emit ahead of its consumer
+        """
+        self.max_pending_events = max(1, max_pending_events)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_jobs), thread_name_prefix="job")
+
+    async def __aenter__(self) -> "AsyncOperations":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Wait for running jobs and release the job threads."""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    async def plan(
+        self,
+        config: "FileOperationConfig",
+        on_event: Optional[EventListener] = None,
+    ) -> "OperationPlan":
+        """
+        Preview a config, like preview_changes.
+
+        Args:
+            config: File operation configuration
+            on_event: Optional listener, called on the event loop for each event
+
+        Returns:
+            Plan of matched files, reusable by execute()
+        """
+        from operations.file_operations import preview_changes
+
+        if on_event is None:
+            on_event = _ignore
+
+        result = None
+        stream = self._stream(lambda cancel, emit: preview_changes(config, cancel, emit))
+        async with aclosing(stream):
+            async for event in stream:
+                if isinstance(event, _Result):
+                    result = event.value
+                else:
+                    on_event(event)
+        return result
+
+    async def execute(
+        self,
+        config: "FileOperationConfig",
+        plan: Optional["OperationPlan"] = None,
+    ) -> AsyncIterator[OperationEvent]:
+        """
+        Execute a config, like execute_changes, yielding its events.
+
+        The last event is OperationFinished (or OperationError), which
+        carries the totals. Cancelling the consuming task, or leaving the
+        loop early, stops the run between files. Closing the generator, e.g.
+        with ``async with contextlib.aclosing(runner.execute(config)) as
+        events``, also waits until the run has stopped; a generator that is
+        merely abandoned is closed whenever it is garbage collected, so the
+        run may still be finishing its current file after the task is done.
+
+        Args:
+            config: File operation configuration
+            plan: Optional plan from plan() for the same config
+
+        Yields:
+            Progress events in the order they were emitted
+        """
+        from operations.file_operations import execute_changes
+
+        stream = self._stream(lambda cancel, emit: execute_changes(config, plan, cancel, emit))
+        async with aclosing(stream):
+            async for event in stream:
+                if not isinstance(event, _Result):
+                    yield event
+
+    async def _stream(
+        self, task: Callable[[threading.Event, EventListener], object]
+    ) -> AsyncIterator[object]:
+        """Run a blocking task on a job thread, yielding its events and then its result."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        slots = threading.Semaphore(self.max_pending_events)
+        cancel_event = threading.Event()
+
+        def emit(event: object) -> None:
+            # Runs on the job thread; blocks while the consumer is behind.
+            # Once cancelled nobody reads the events, so they are dropped
+            while not slots.acquire(timeout=_CANCEL_POLL_INTERVAL):
+                if cancel_event.is_set():
+                    return
+            if cancel_event.is_set():
+                slots.release()
+                return
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+        def run() -> None:
+            try:
+                result = _Result(task(cancel_event, emit))
+                loop.call_soon_threadsafe(queue.put_nowait, result)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, _DONE)
+
+        job = self._executor.submit(run)
+        future = asyncio.wrap_future(job)
+        # A consumer cancelled inside its own loop body leaves this generator
+        # suspended at its yield until someone closes it, so also stop the
+        # job when the consuming task ends
+        consumer = asyncio.current_task()
+        stop = lambda task: cancel_event.set()  # noqa: E731
+        if consumer is not None:
+            consumer.add_done_callback(stop)
+        try:
+            while True:
+                event = await queue.get()
+                if event is _DONE:
+                    break
+                slots.release()
+                yield event
+            await future
+        finally:
+            if consumer is not None:
+                consumer.remove_done_callback(stop)
+            if not future.done():
+                cancel_event.set()
+                # Wait for the job to stop, so a caller that closes the stream
+                # knows its files are no longer touched; a job still queued
+                # never starts
+                if not job.cancel():
+                    await asyncio.shield(future)
+
+
+class _Result:
+    """Return value of a job, passed through its event stream."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: object):
+        self.value = value
+
+
+def _ignore(event: OperationEvent) -> None:
+    """Listener that drops events."""
+
+
+# Runner behind the module-level functions, created on first use
+_default_runner: Optional[AsyncOperations] = None
+
+
+def _runner() -> AsyncOperations:
+    """Get the shared runner used by plan() and execute()."""
+    global _default_runner
+    if _default_runner is None:
+        _default_runner = AsyncOperations()
+    return _default_runner
+
+
+async def plan(
+    config: "FileOperationConfig",
+    on_event: Optional[EventListener] = None,
+) -> "OperationPlan":
+    """
+    Preview a config on the shared runner; see AsyncOperations.plan.
+
+    Args:
+        config: File operation configuration
+        on_event: Optional listener, called on the event loop for each event
+
+    Returns:
+        Plan of matched files
+    """
+    return await _runner().plan(config, on_event)
+
+
+async def execute(
+    config: "FileOperationConfig",
+    plan: Optional["OperationPlan"] = None,
+) -> AsyncIterator[OperationEvent]:
+    """
+    Execute a config on the shared runner; see AsyncOperations.execute.
+
+    Args:
+        config: File operation configuration
+        plan: Optional plan from plan() for the same config
+
+    Yields:
+        Progress events
+    """
+    stream = _runner().execute(config, plan)
+    async with aclosing(stream):
+        async for event in stream:
+            yield event
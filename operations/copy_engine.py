@@ -0,0 +1,463 @@
+"""
+Concurrent copy engine for File Falcon Pro.
+This module executes planned transfers across a bounded thread pool, with
+separate concurrency limits per source and destination device.
+
+Moves within one device are renamed in place on the calling thread, which
+only touches metadata. Moves across devices are copied in the pool, verified
+and then unlinked.
+"""
+import errno
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from operations.copy_backends import copy_data
+from operations.events import (
+    ConflictRenamed,
+    EventListener,
+    FileFailed,
+    FileTransferred,
+)
+from operations.journal import TransferJournal
+from operations.metrics import OperationStats
+from operations.name_index import DestinationNameIndex
+from operations.plan import PlanEntry
+
+logger = logging.getLogger("copy_engine")
+
+DEFAULT_COPY_WORKERS = 4
+DEFAULT_DEVICE_WORKERS = 4
+
+# Entries whose destinations are resolved and reordered together
+BATCH_SIZE = 256
+
+
+@dataclass
+class CopyStats:
+    """Totals for a copy engine run."""
+
+    files: int = 0
+    errors: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+    cancelled: bool = False
+    # Files already transferred by an earlier, interrupted run
+    skipped: int = 0
+    # Number of files transferred by each copy strategy
+    strategies: Dict[str, int] = field(default_factory=dict)
+    # Moves done by renaming within a device, and by copying across devices
+    renamed: int = 0
+    moved_by_copy: int = 0
+
+    @property
+    def files_per_second(self) -> float:
+        """Average number of files transferred per second."""
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        """Average throughput in MB/s."""
+        return self.bytes / 1_000_000 / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _process_file(src_path: str, dest_path: str, operation_type: str) -> Tuple[str, Tuple[Tuple[str, float], ...]]:
+    """
+    Copy a single file, removing the source afterwards for a move.
+
+    Same-device moves never get here; the engine renames them in place. A
+    move's source is only unlinked once the copy has been verified.
+
+    Args:
+        src_path: Source file path
+        dest_path: Destination file path
+        operation_type: 'Move' or 'Copy'
+
+    Returns:
+        The copy_data strategy that transferred the data, and the seconds
+        spent per phase as (phase, seconds) pairs
+    """
+    try:
+        before = os.stat(src_path) if operation_type == "Move" else None
+        start = time.perf_counter()
+        strategy = copy_data(src_path, dest_path)
+        copied = time.perf_counter()
+        shutil.copystat(src_path, dest_path)  # preserves metadata like copy2
+        done = time.perf_counter()
+        phases = (("copy", copied - start), ("metadata", done - copied))
+        if operation_type == "Move":
+            _verify_copy(src_path, dest_path, before)
+            os.unlink(src_path)
+            phases += (("verify", time.perf_counter() - done),)
+        return strategy, phases
+    except Exception as e:
+        logger.error(f"Error processing file {src_path} to {dest_path}: {str(e)}")
+        raise  # Reraise to be caught by the calling function
+
+
+def _verify_copy(src_path: str, dest_path: str, before: os.stat_result) -> None:
+    """
+    Check that a copy made for a move is complete before its source is removed.
+
+    The source must be unchanged since the copy started and the destination
+    must have its size. Mtimes are only compared on the source, since the
+    destination filesystem may store them at a coarser resolution.
+
+    Args:
+        src_path: Source file path
+        dest_path: Destination file path
+        before: Stat of the source taken before copying
+
+    Raises:
+        OSError: If the copy cannot be trusted; it is removed and the source kept
+    """
+    after = os.stat(src_path)
+    copied = os.stat(dest_path)
+    if (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+        reason = "source changed while it was copied"
+    elif copied.st_size != after.st_size:
+        reason = f"copied {copied.st_size} of {after.st_size} bytes"
+    else:
+        return
+    os.unlink(dest_path)
+    raise OSError(f"Copy verification failed ({reason}); source kept")
+
+
+def _batches(entries: Iterable[PlanEntry], size: int) -> Iterator[List[PlanEntry]]:
+    """Split a stream of entries into lists of at most ``size`` entries."""
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _interleave_by_size(jobs: List[Tuple[PlanEntry, str]]) -> List[Tuple[PlanEntry, str]]:
+    """
+    Order jobs largest, smallest, next largest, next smallest, ...
+
+    Mixing large and small files keeps both the bandwidth-bound and the
+    metadata-bound parts of the pipeline busy.
+
+    Args:
+        jobs: (entry, destination) pairs
+
+    Returns:
+        The same pairs in interleaved order
+    """
+    by_size = sorted(jobs, key=lambda job: job[0].size, reverse=True)
+    ordered = []
+    low, high = 0, len(by_size) - 1
+    while low <= high:
+        ordered.append(by_size[low])
+        if low != high:
+            ordered.append(by_size[high])
+        low += 1
+        high -= 1
+    return ordered
+
+
+class CopyEngine:
+    """Runs planned transfers concurrently."""
+
+    def __init__(
+        self,
+        operation_type: str,
+        workers: int = DEFAULT_COPY_WORKERS,
+        source_device_workers: int = DEFAULT_DEVICE_WORKERS,
+        dest_device_workers: int = DEFAULT_DEVICE_WORKERS,
+        metrics: Optional[OperationStats] = None,
+    ):
+        """Initialize the engine.
+
+        Args:
+            operation_type: 'Move' or 'Copy'
+            workers: Maximum number of transfers running at once
+            source_device_workers: Maximum concurrent transfers reading from one device
+            dest_device_workers: Maximum concurrent transfers writing to one device
+            metrics: Optional stats receiving phase times and per-file latencies
+        """
+        self.operation_type = operation_type
+        self.metrics = metrics if metrics is not None else OperationStats(operation_type)
+        self.workers = max(1, workers)
+        self.source_device_workers = max(1, source_device_workers)
+        self.dest_device_workers = max(1, dest_device_workers)
+        self._device_cache: Dict[str, int] = {}
+        self._semaphores: Dict[Tuple[str, int], threading.Semaphore] = {}
+        self._semaphores_lock = threading.Lock()
+        # Taken destination names, so two jobs never share a name
+        self.names = DestinationNameIndex()
+        # Destination directories known to exist
+        self._dest_dirs: Set[str] = set()
+
+    def run(
+        self,
+        entries: Iterable[PlanEntry],
+        emit: EventListener,
+        relative_to: str,
+        cancel_event: Optional[threading.Event] = None,
+        journal: Optional[TransferJournal] = None,
+    ) -> CopyStats:
+        """
+        Transfer all entries, emitting an event per file from the calling thread.
+
+        Destination names are resolved in plan order before dispatch, so the
+        ``_1``, ``_2`` conflict suffixes depend only on the order of entries,
+        not on which transfer finishes first. Plans from an unordered scan
+        list files in the order directories happened to be listed, so which
+        of two same-named files gets ``_1`` can differ between runs.
+
+        Args:
+            entries: Planned transfers
+            emit: Listener receiving per-file events
+            relative_to: Folder that relative source paths in events refer to
+            cancel_event: Optional event that stops dispatching new files when set
+            journal: Optional journal; files it lists as done are skipped, files
+                it planned earlier keep their destination, and every batch is
+                journaled before it is dispatched
+
+        Returns:
+            Totals for the run
+        """
+        stats = CopyStats()
+        start = time.perf_counter()
+        inflight: Dict[Future, Tuple[PlanEntry, str]] = {}
+        max_inflight = self.workers * 2
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="copy") as executor:
+            for batch in _batches(entries, BATCH_SIZE):
+                if journal is not None:
+                    pending = [entry for entry in batch if not journal.is_completed(entry.source)]
+                    stats.skipped += len(batch) - len(pending)
+                    batch = pending
+                resolving = time.perf_counter()
+                jobs = [(entry, self._destination(entry, journal)) for entry in batch]
+                creating = time.perf_counter()
+                self.metrics.add_time("conflict_resolution", creating - resolving, len(batch))
+                self._create_dirs(dest_path for _, dest_path in jobs)
+                self.metrics.add_time("mkdir", time.perf_counter() - creating)
+                if journal is not None:
+                    with self.metrics.phase("journal"):
+                        journal.planned(batch, [dest_path for _, dest_path in jobs])
+                if self.operation_type == "Move":
+                    jobs = self._rename_in_place(jobs, stats, emit, relative_to, cancel_event, journal)
+                for entry, dest_path in _interleave_by_size(jobs):
+                    if cancel_event is not None and cancel_event.is_set():
+                        stats.cancelled = True
+                        break
+                    while len(inflight) >= max_inflight:
+                        done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                        self._report(done, inflight, stats, emit, relative_to, journal)
+                    future = executor.submit(self._transfer, entry, dest_path)
+                    inflight[future] = (entry, dest_path)
+                if stats.cancelled:
+                    break
+            else:
+                if journal is not None:
+                    journal.mark_scanned()
+
+            # Let transfers already in progress finish
+            done, _ = wait(inflight)
+            self._report(done, inflight, stats, emit, relative_to, journal)
+
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+    def create_dirs(self, directories: Iterable[str]) -> None:
+        """Create destination directories in bulk before the run, e.g. every one a plan uses.
+
+        Directories created here are known to be empty, so the name index
+        does not list them when resolving conflicts. A directory that cannot
+        be created is left to fail its transfers.
+
+        Args:
+            directories: Destination directories; parents should come first
+        """
+        with self.metrics.phase("mkdir"):
+            for dest_dir in directories:
+                if dest_dir in self._dest_dirs:
+                    continue
+                try:
+                    try:
+                        os.mkdir(dest_dir)
+                    except FileNotFoundError:
+                        os.makedirs(dest_dir)
+                    self.names.add_empty_directory(dest_dir)
+                except FileExistsError:
+                    pass
+                except OSError as e:
+                    logger.error(f"Error creating directory {dest_dir}: {str(e)}")
+                    continue
+                self._dest_dirs.add(dest_dir)
+
+    def _create_dirs(self, dest_paths: Iterable[str]) -> None:
+        """Create the destination directories of a batch that do not exist yet.
+
+        A directory that cannot be created is left to fail its transfers.
+        """
+        for dest_dir in {os.path.dirname(dest_path) for dest_path in dest_paths} - self._dest_dirs:
+            try:
+                os.makedirs(dest_dir, exist_ok=True)
+            except OSError as e:
+                logger.error(f"Error creating directory {dest_dir}: {str(e)}")
+                continue
+            self._dest_dirs.add(dest_dir)
+
+    def _destination(self, entry: PlanEntry, journal: Optional[TransferJournal]) -> str:
+        """Reserve a destination, reusing the one an earlier run journaled."""
+        if journal is not None:
+            dest_path = journal.destination(entry.source)
+            if dest_path is not None:
+                self.names.claim(dest_path)
+                return dest_path
+        return self.names.reserve(entry.destination)
+
+    def _transfer(self, entry: PlanEntry, dest_path: str) -> str:
+        """Move or copy one file within the device limits (runs in a worker)."""
+        source_limit = self._semaphore("source", os.path.dirname(entry.source), self.source_device_workers)
+        dest_limit = self._semaphore("dest", os.path.dirname(dest_path), self.dest_device_workers)
+        # Always acquire source before destination so limits cannot deadlock
+        with source_limit, dest_limit:
+            start = time.perf_counter()
+            strategy, phases = _process_file(entry.source, dest_path, self.operation_type)
+            self.metrics.record_file(max(entry.size, 0), time.perf_counter() - start, phases)
+            return strategy
+
+    def _report(
+        self,
+        done: Iterable[Future],
+        inflight: Dict[Future, Tuple[PlanEntry, str]],
+        stats: CopyStats,
+        emit: EventListener,
+        relative_to: str,
+        journal: Optional[TransferJournal] = None,
+    ) -> None:
+        """Emit events for finished transfers and update the totals."""
+        for future in done:
+            entry, dest_path = inflight.pop(future)
+            try:
+                strategy = future.result()
+            except Exception as e:
+                self._failed(entry, dest_path, e, stats, emit)
+                continue
+            if self.operation_type == "Move":
+                stats.moved_by_copy += 1
+            self._succeeded(entry, dest_path, strategy, stats, emit, relative_to, journal)
+
+    def _rename_in_place(
+        self,
+        jobs: List[Tuple[PlanEntry, str]],
+        stats: CopyStats,
+        emit: EventListener,
+        relative_to: str,
+        cancel_event: Optional[threading.Event],
+        journal: Optional[TransferJournal],
+    ) -> List[Tuple[PlanEntry, str]]:
+        """
+        Move the jobs whose source and destination share a device by renaming.
+
+        Args:
+            jobs: (entry, destination) pairs of a batch
+            stats: Totals to update
+            emit: Listener receiving per-file events
+            relative_to: Folder that relative source paths in events refer to
+            cancel_event: Optional event that stops the loop when set
+            journal: Optional journal recording finished moves
+
+        Returns:
+            The jobs that cross a device boundary and have to be copied
+        """
+        to_copy = []
+        renaming = 0.0
+        renamed = 0
+        for entry, dest_path in jobs:
+            if self._device(os.path.dirname(entry.source)) != self._device(os.path.dirname(dest_path)):
+                to_copy.append((entry, dest_path))
+                continue
+            if cancel_event is not None and cancel_event.is_set():
+                stats.cancelled = True
+                break
+            start = time.perf_counter()
+            try:
+                os.rename(entry.source, dest_path)
+            except OSError as e:
+                if e.errno == errno.EXDEV:
+                    # Same device seen through two mount points, e.g. a bind mount
+                    to_copy.append((entry, dest_path))
+                    continue
+                logger.error(f"Error processing file {entry.source} to {dest_path}: {str(e)}")
+                self._failed(entry, dest_path, e, stats, emit)
+                continue
+            seconds = time.perf_counter() - start
+            renaming += seconds
+            renamed += 1
+            self.metrics.record_file(max(entry.size, 0), seconds)
+            stats.renamed += 1
+            self._succeeded(entry, dest_path, "rename", stats, emit, relative_to, journal)
+        if renamed:
+            self.metrics.add_time("rename", renaming, renamed)
+        return to_copy
+
+    def _succeeded(
+        self,
+        entry: PlanEntry,
+        dest_path: str,
+        strategy: str,
+        stats: CopyStats,
+        emit: EventListener,
+        relative_to: str,
+        journal: Optional[TransferJournal],
+    ) -> None:
+        """Record a finished transfer and emit its events."""
+        if journal is not None:
+            journal.done(entry.source)
+        if dest_path != entry.destination:
+            emit(ConflictRenamed(entry.source, dest_path))
+        stats.files += 1
+        stats.bytes += max(entry.size, 0)
+        stats.strategies[strategy] = stats.strategies.get(strategy, 0) + 1
+        emit(FileTransferred(
+            entry.source,
+            dest_path,
+            os.path.relpath(entry.source, relative_to),
+            max(entry.size, 0),
+            self.operation_type,
+            strategy,
+        ))
+
+    def _failed(
+        self, entry: PlanEntry, dest_path: str, error: Exception, stats: CopyStats, emit: EventListener
+    ) -> None:
+        """Record a failed transfer, freeing its destination name."""
+        self.names.release(dest_path)
+        stats.errors += 1
+        self.metrics.record_error()
+        emit(FileFailed(entry.source, str(error)))
+
+    def _device(self, directory: str) -> int:
+        """Get the device a directory is on, or -1 if it cannot be determined."""
+        device = self._device_cache.get(directory)
+        if device is None:
+            try:
+                device = os.stat(directory).st_dev
+            except OSError:
+                device = -1
+            self._device_cache[directory] = device
+        return device
+
+    def _semaphore(self, role: str, directory: str, limit: int) -> threading.Semaphore:
+        """Get the semaphore limiting concurrent transfers on a directory's device."""
+        device = self._device(directory)
+        with self._semaphores_lock:
+            semaphore = self._semaphores.get((role, device))
+            if semaphore is None:
+                semaphore = self._semaphores[(role, device)] = threading.Semaphore(limit)
+        return semaphore
@@ -0,0 +1,216 @@
+"""
+Duplicate detection for File Falcon Pro.
+This module finds byte-identical files among planned transfers. Candidates are
+narrowed by size, then by a hash of their first and last blocks, and only the
+survivors are hashed in full, streaming so memory stays flat.
+"""
+import hashlib
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from operations.events import DuplicateFound, EventListener, FileFailed
+from operations.journal import TransferJournal
+from operations.name_index import DestinationNameIndex
+from operations.plan import MISSING, PlanEntry
+
+DEFAULT_HASH_WORKERS = 4
+
+# Bytes read from each end of a file for the partial hash
+PARTIAL_BLOCK_SIZE = 64 * 1024
+
+# Read size for full hashes
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class DuplicateGroup:
+    """Planned files with identical content."""
+
+    # The first file in plan order; it is transferred normally
+    original: PlanEntry
+    duplicates: List[PlanEntry] = field(default_factory=list)
+
+    @property
+    def wasted_bytes(self) -> int:
+        """Bytes that transferring every duplicate would add."""
+        return self.original.size * len(self.duplicates)
+
+
+def partial_hash(path: str, size: int) -> str:
+    """
+    Hash the first and last PARTIAL_BLOCK_SIZE bytes of a file.
+
+    Files of at most 2 * PARTIAL_BLOCK_SIZE bytes are hashed whole, so for
+    them equal digests mean equal content.
+
+    Args:
+        path: File to hash
+        size: Size of the file
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if size <= 2 * PARTIAL_BLOCK_SIZE:
+            digest.update(f.read())
+        else:
+            digest.update(f.read(PARTIAL_BLOCK_SIZE))
+            f.seek(-PARTIAL_BLOCK_SIZE, os.SEEK_END)
+            digest.update(f.read(PARTIAL_BLOCK_SIZE))
+    return digest.hexdigest()
+
+
+def full_hash(path: str) -> str:
+    """
+    Hash a whole file, reading it in fixed-size chunks.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.blake2b()
+    buffer = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+
+def find_duplicates(
+    entries: Sequence[PlanEntry],
+    workers: int = DEFAULT_HASH_WORKERS,
+    cancel_event: Optional[threading.Event] = None,
+) -> List[DuplicateGroup]:
+    """
+    Group planned files by content.
+
+    Args:
+        entries: Planned transfers, in plan order
+        workers: Number of files hashed concurrently
+        cancel_event: Optional event that stops hashing when set
+
+    Returns:
+        Groups with at least one duplicate, each led by its first entry in plan order
+    """
+    by_size: Dict[int, List[PlanEntry]] = defaultdict(list)
+    for entry in entries:
+        if entry.size != MISSING:
+            by_size[entry.size].append(entry)
+    candidates = [group for group in by_size.values() if len(group) > 1]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="hash") as executor:
+        candidates = _refine(
+            executor, candidates, lambda entry: partial_hash(entry.source, entry.size), cancel_event
+        )
+        # Small files were hashed whole by partial_hash, so they are fully compared
+        small = [group for group in candidates if group[0].size <= 2 * PARTIAL_BLOCK_SIZE]
+        large = [group for group in candidates if group[0].size > 2 * PARTIAL_BLOCK_SIZE]
+        large = _refine(executor, large, lambda entry: full_hash(entry.source), cancel_event)
+
+    return [DuplicateGroup(group[0], group[1:]) for group in small + large]
+
+
+def _refine(
+    executor: ThreadPoolExecutor,
+    groups: Iterable[List[PlanEntry]],
+    key: Callable[[PlanEntry], str],
+    cancel_event: Optional[threading.Event],
+) -> List[List[PlanEntry]]:
+    """
+    Split candidate groups by a content key, dropping singletons.
+
+    Files that cannot be read are left out, so they are transferred normally.
+    """
+    def safe_key(entry: PlanEntry) -> Optional[str]:
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        try:
+            return key(entry)
+        except OSError:
+            return None
+
+    # Hash all candidates in one batch so small groups do not serialize the pool
+    flat = [entry for group in groups for entry in group]
+    by_key: Dict[Tuple[int, str], List[PlanEntry]] = defaultdict(list)
+    for entry, digest in zip(flat, executor.map(safe_key, flat)):
+        if digest is not None:
+            by_key[(entry.size, digest)].append(entry)
+    return [group for group in by_key.values() if len(group) > 1]
+
+
+def link_duplicates(
+    duplicates: Iterable[Tuple[PlanEntry, PlanEntry]],
+    destinations: Dict[str, str],
+    names: DestinationNameIndex,
+    operation_type: str,
+    emit: EventListener,
+    journal: Optional[TransferJournal] = None,
+) -> Tuple[int, int]:
+    """
+    Hard-link duplicates to the already transferred copy of their original.
+
+    For moves, the duplicate source is removed once its link exists.
+    Duplicates whose original was not transferred are reported as failed.
+
+    Args:
+        duplicates: (duplicate, original) pairs
+        destinations: Final destination path of each transferred original, by source
+        names: Index used to pick free destination names
+        operation_type: 'Move' or 'Copy'
+        emit: Listener receiving per-file events
+        journal: Optional journal; links are journaled like transfers, and a
+            link planned by an earlier attempt keeps its destination
+
+    Returns:
+        Tuple of (files linked, files failed)
+    """
+    linked = 0
+    failed = 0
+    links = []
+    for duplicate, original in duplicates:
+        target = destinations.get(original.source)
+        if target is None:
+            # The original was not transferred, so there is nothing to link to;
+            # the duplicate is left in place and reported like a failed transfer
+            failed += 1
+            emit(FileFailed(
+                duplicate.source,
+                f"not hard-linked, its original {os.path.basename(original.source)} was not transferred",
+            ))
+            continue
+        dest_path = journal.destination(duplicate.source) if journal is not None else None
+        if dest_path is not None:
+            names.claim(dest_path)
+        else:
+            dest_path = names.reserve(duplicate.destination)
+        links.append((duplicate, original, target, dest_path))
+    if journal is not None and links:
+        journal.planned([link[0] for link in links], [link[3] for link in links])
+
+    for duplicate, original, target, dest_path in links:
+        try:
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            os.link(target, dest_path)
+            if operation_type == "Move":
+                os.unlink(duplicate.source)
+        except OSError as e:
+            names.release(dest_path)
+            failed += 1
+            emit(FileFailed(duplicate.source, str(e)))
+            continue
+        if journal is not None:
+            journal.done(duplicate.source)
+        linked += 1
+        emit(DuplicateFound(duplicate.source, original.source, "hard-linked"))
+    return linked, failed
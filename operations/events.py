@@ -0,0 +1,303 @@
+"""
+Operation events for File Falcon Pro.
+preview_changes and execute_changes report what they do through these events
+so that the GUI, the console and tests can each subscribe in their own way.
+"""
+import json
+import os
+import time
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Callable, ClassVar, Dict, Iterable, Optional, TextIO, Tuple
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@dataclass(frozen=True)
+class OperationEvent:
+    """Base class for all operation events."""
+
+    # Severity used for display: info, success, warning or error
+    level: ClassVar[str] = "info"
+    # Whether the event concerns a single file (and may be summarized)
+    per_file: ClassVar[bool] = False
+
+    def describe(self) -> str:
+        """Get a human-readable description of the event.
+
+        Returns:
+            Plain-text message; the event's class name unless a subclass
+            describes itself
+        """
+        return type(self).__name__
+
+
+@dataclass(frozen=True)
+class ScanStarted(OperationEvent):
+    """The source folder is about to be scanned."""
+
+    folder: str
+
+    def describe(self) -> str:
+        return f"Scanning folder: {self.folder}"
+
+
+@dataclass(frozen=True)
+class ExecuteStarted(OperationEvent):
+    """A move or copy run is starting."""
+
+    operation_type: str
+
+    def describe(self) -> str:
+        return f"Executing {self.operation_type} operation..."
+
+
+@dataclass(frozen=True)
+class FileMatched(OperationEvent):
+    """A file matched the criteria during a preview."""
+
+    per_file: ClassVar[bool] = True
+
+    source: str
+    destination: str
+    relative_source: str
+
+    def describe(self) -> str:
+        return f"• {self.relative_source} -> {self.destination}"
+
+
+@dataclass(frozen=True)
+class ConflictRenamed(OperationEvent):
+    """The destination name was taken, so the file gets a numbered name."""
+
+    level: ClassVar[str] = "warning"
+    per_file: ClassVar[bool] = True
+
+    source: str
+    destination: str
+
+    def describe(self) -> str:
+        return f"File already exists, renamed to: {os.path.basename(self.destination)}"
+
+
+@dataclass(frozen=True)
+class FileTransferred(OperationEvent):
+    """A file was copied or moved."""
+
+    per_file: ClassVar[bool] = True
+
+    source: str
+    destination: str
+    relative_source: str
+    bytes: int
+    operation_type: str
+    # How the data was transferred, e.g. 'reflink', 'copy_file_range' or 'rename'
+    strategy: str = ""
+
+    def describe(self) -> str:
+        verb = "Moved" if self.operation_type == "Move" else "Copied"
+        if self.strategy:
+            return f"{verb}: {self.relative_source} ({self.strategy})"
+        return f"{verb}: {self.relative_source}"
+
+
+@dataclass(frozen=True)
+class DuplicateFound(OperationEvent):
+    """A planned file has the same content as an earlier one."""
+
+    per_file: ClassVar[bool] = True
+
+    source: str
+    original: str
+    # What was done about it: 'skipped', 'hard-linked' or 'reported'
+    action: str
+
+    def describe(self) -> str:
+        return f"Duplicate of {self.original}, {self.action}: {os.path.basename(self.source)}"
+
+
+@dataclass(frozen=True)
+class FileFailed(OperationEvent):
+    """A single file could not be processed."""
+
+    level: ClassVar[str] = "error"
+    per_file: ClassVar[bool] = True
+
+    source: str
+    error: str
+
+    def describe(self) -> str:
+        return f"Error processing {os.path.basename(self.source)}: {self.error}"
+
+
+@dataclass(frozen=True)
+class Notice(OperationEvent):
+    """A general status message."""
+
+    message: str
+    severity: str = "info"
+
+    @property
+    def level(self) -> str:  # type: ignore[override]
+        return self.severity
+
+    def describe(self) -> str:
+        return self.message
+
+
+@dataclass(frozen=True)
+class OperationError(OperationEvent):
+    """The operation as a whole failed."""
+
+    level: ClassVar[str] = "error"
+
+    message: str
+
+    def describe(self) -> str:
+        return self.message
+
+
+@dataclass(frozen=True)
+class OperationFinished(OperationEvent):
+    """A preview or execute run ended, with its totals."""
+
+    operation: str
+    files: int
+    errors: int = 0
+    bytes: int = 0
+    cancelled: bool = False
+    elapsed: float = 0.0
+    # How the files of a move got there: renamed within a device or copied across
+    renamed: int = 0
+    moved_by_copy: int = 0
+
+    @property
+    def level(self) -> str:  # type: ignore[override]
+        if self.errors:
+            return "error"
+        if self.cancelled or not self.files:
+            return "warning"
+        return "success"
+
+    def describe(self) -> str:
+        if self.operation == "Preview":
+            if self.cancelled:
+                return f"Preview cancelled after {self.files} files."
+            if not self.files:
+                return "No files matched your criteria."
+            return f"Found {self.files} matching files."
+
+        message = f"Successfully processed {self.files} files."
+        if self.elapsed > 0:
+            message += (
+                f" ({self.files / self.elapsed:.1f} files/s,"
+                f" {self.bytes / 1_000_000 / self.elapsed:.1f} MB/s)"
+            )
+        if self.renamed or self.moved_by_copy:
+            message += f" {self.renamed} renamed in place, {self.moved_by_copy} copied across devices."
+        if self.errors:
+            message += f" Encountered errors with {self.errors} files."
+        if self.cancelled:
+            message += " Operation cancelled."
+        return message
+
+
+# Receives every event emitted by an operation
+EventListener = Callable[[OperationEvent], None]
+
+LEVEL_STYLES: Dict[str, str] = {
+    "info": "",
+    "success": "bold green",
+    "warning": "yellow",
+    "error": "bold red",
+}
+
+
+class ConsoleReporter:
+    """Event listener that renders events with rich."""
+
+    def __init__(self, console: Optional["Console"] = None):
+        """Initialize the reporter.
+
+        Args:
+            console: Console to print to; a new one is created if omitted
+        """
+        if console is None:
+            # rich is only imported by callers that print to a console
+            from rich.console import Console
+            console = Console()
+        self.console = console
+
+    def __call__(self, event: OperationEvent) -> None:
+        indent = "  " if event.per_file else ""
+        self.console.print(
+            indent + event.describe(),
+            style=LEVEL_STYLES.get(event.level, ""),
+            markup=False,
+            highlight=False,
+        )
+
+
+class JsonLinesReporter:
+    """Event listener that writes one JSON object per event, for other programs.
+
+    Each line holds the event's fields plus 'event' (its class name), 'level',
+    'message' (the describe() text) and 't' (seconds since the reporter was
+    created, or since ``start``).
+    """
+
+    # Longest time per-file lines stay in the stream buffer, in seconds
+    FLUSH_INTERVAL = 0.1
+
+    def __init__(self, stream: TextIO, per_file: bool = True, start: Optional[float] = None):
+        """Initialize the reporter.
+
+        Args:
+            stream: Text stream to write to, e.g. sys.stdout
+            per_file: Whether to write per-file events
+            start: time.perf_counter() value that 't' is measured from
+        """
+        self.stream = stream
+        self.per_file = per_file
+        self.start = time.perf_counter() if start is None else start
+        self._fields: Dict[type, Tuple[str, ...]] = {}
+        self._last_flush = 0.0
+
+    def __call__(self, event: OperationEvent) -> None:
+        if event.per_file and not self.per_file:
+            return
+        names = self._fields.get(type(event))
+        if names is None:
+            names = self._fields[type(event)] = tuple(f.name for f in fields(event))
+        now = time.perf_counter()
+        record = {
+            "event": type(event).__name__,
+            "level": event.level,
+            "message": event.describe(),
+            "t": round(now - self.start, 6),
+        }
+        for name in names:
+            record[name] = getattr(event, name)
+        self.stream.write(json.dumps(record) + "\n")
+        # Summary events go out at once; per-file lines are flushed in batches
+        if not event.per_file or now - self._last_flush >= self.FLUSH_INTERVAL:
+            self.stream.flush()
+            self._last_flush = now
+
+
+def broadcast(listeners: Iterable[EventListener]) -> EventListener:
+    """Combine several listeners into one.
+
+    Args:
+        listeners: Listeners that should each receive every event
+
+    Returns:
+        A listener forwarding events to all of them in order
+    """
+    listeners = list(listeners)
+
+    def listener(event: OperationEvent) -> None:
+        for callback in listeners:
+            callback(event)
+
+    return listener
@@ -2,7 +2,8 @@
 File extension definitions for different media types.
 This module provides categorized lists of file extensions for use in the File Falcon Pro application.
 """
-from typing import Dict, List
+from types import MappingProxyType
+from typing import Container, Dict, Iterable, List, Mapping, Optional, Tuple
 
 
 def _normalize_extensions(extensions: List[str]) -> List[str]:
@@ -107,3 +108,109 @@ CATEGORIES_MAP: Dict[str, List[str]] = {
     "Design": design,
     "Markup": markup,
 }
+
+# Order in which categories claim extensions listed by several of them when
+# routing files (e.g. '.psd' is in Image All, Layout and Design): documents
+# first, then media, Basic before All, and the broad image and markup lists last
+ROUTING_PRECEDENCE: List[str] = [
+    "PDF",
+    "JSON",
+    "Spreadsheet",
+    "Presentations",
+    "Text",
+    "Database",
+    "Video Basic",
+    "Video All",
+    "Image Basic",
+    "Design",
+    "Layout",
+    "Image All",
+    "Markup",
+]
+
+
+def _build_extension_index() -> Mapping[str, Tuple[str, ...]]:
+    """
+    Map every extension to the categories that list it.
+    
+    Returns:
+        Read-only dictionary of lowercase extension to categories, in
+        ROUTING_PRECEDENCE order so the first one is where the extension is routed
+    """
+    rank = {category: i for i, category in enumerate(ROUTING_PRECEDENCE)}
+    ordered = sorted(CATEGORIES_MAP, key=lambda category: (rank.get(category, len(rank)), category))
+    index: Dict[str, List[str]] = {}
+    for category in ordered:
+        for ext in CATEGORIES_MAP[category]:
+            index.setdefault(ext.lower(), []).append(category)
+    return MappingProxyType({ext: tuple(categories) for ext, categories in index.items()})
+
+
+# Reverse index of CATEGORIES_MAP: extension -> categories listing it
+EXTENSION_INDEX: Mapping[str, Tuple[str, ...]] = _build_extension_index()
+
+# Number of dots in the longest compound suffix, e.g. 2 for '.tar.gz'
+MAX_SUFFIX_DOTS = max((ext.count(".") for ext in EXTENSION_INDEX), default=0)
+
+
+def longest_suffix(name: str, extensions: Container[str], max_dots: int) -> Optional[str]:
+    """
+    Find the longest suffix of a filename that is one of the given extensions.
+    
+    Like os.path.splitext, leading dots belong to the name, so '.mp4' has no
+    extension, but compound suffixes like '.tar.gz' are found as a whole.
+    
+    Args:
+        name: Lowercased filename
+        extensions: Lowercase extensions to look for
+        max_dots: Number of dots in the longest extension
+        
+    Returns:
+        The longest matching suffix, or None if no extension matches
+    """
+    found = None
+    end = len(name)
+    stem_start = end - len(name.lstrip("."))
+    for _ in range(max_dots):
+        end = name.rfind(".", 0, end)
+        if end <= stem_start:
+            break
+        candidate = name[end:]
+        if candidate in extensions:
+            found = candidate
+    return found
+
+
+def categories_for(name: str) -> Tuple[str, ...]:
+    """
+    Look up the categories a filename belongs to by its extension.
+    
+    Args:
+        name: Filename, in any case
+        
+    Returns:
+        Categories listing the file's extension, in ROUTING_PRECEDENCE order;
+        empty if the extension is unknown
+    """
+    ext = longest_suffix(name.lower(), EXTENSION_INDEX, MAX_SUFFIX_DOTS)
+    return EXTENSION_INDEX[ext] if ext is not None else ()
+
+
+def routing_table(categories: Iterable[str]) -> Dict[str, str]:
+    """
+    Map every extension of the given categories to the one category it is routed to.
+    
+    Args:
+        categories: Category names from CATEGORIES_MAP
+        
+    Returns:
+        Dictionary of lowercase extension to category, following ROUTING_PRECEDENCE
+    """
+    wanted = set(categories)
+    table: Dict[str, str] = {}
+    for ext, owners in EXTENSION_INDEX.items():
+        for category in owners:
+            if category in wanted:
+                table[ext] = category
+                break
+    return table
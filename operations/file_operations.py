@@ -4,21 +4,50 @@ This module handles file system operations such as moving and copying files.
 """
 import logging
 import os
-import shutil
-from typing import Dict, List, Literal
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Literal, Optional, Tuple
 
-from pydantic import BaseModel, Field, field_validator
-from rich.console import Console
+from pydantic import BaseModel, Field, field_validator, model_validator
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+from operations.copy_engine import DEFAULT_COPY_WORKERS, DEFAULT_DEVICE_WORKERS, CopyEngine
+from operations.dedup import DEFAULT_HASH_WORKERS, find_duplicates, link_duplicates
+from operations.events import (
+    ConsoleReporter,
+    DuplicateFound,
+    EventListener,
+    ExecuteStarted,
+    FileMatched,
+    FileTransferred,
+    Notice,
+    OperationError,
+    OperationEvent,
+    OperationFinished,
+    ScanStarted,
 )
+from operations.file_extensions import CATEGORIES_MAP, categories_for
+from operations.journal import TransferJournal
+from operations.layout import DEFAULT_LAYOUT, DestinationLayout, layout_fields
+from operations.matcher import FileMatcher, compile_pattern
+from operations.metadata_index import MetadataIndex
+from operations.metrics import OperationStats
+from operations.plan import MISSING, OperationPlan, PlanEntry, PlanStore
+from operations.scanner import DEFAULT_SCAN_WORKERS, ScanEntry, scan_files
+from operations.sniffer import DEFAULT_SNIFF_WORKERS, ContentSniffer, same_format
+
 logger = logging.getLogger("file_operations")
 
-# Setup rich console for prettier output
-console = Console()
+# Default listener for callers that do not subscribe, created on first use
+_console_reporter: Optional[ConsoleReporter] = None
+
+
+def _default_listener() -> EventListener:
+    """Get the rich console listener used when no listener is given."""
+    global _console_reporter
+    if _console_reporter is None:
+        _console_reporter = ConsoleReporter()
+    return _console_reporter
 
 
 class FileOperationConfig(BaseModel):
@@ -30,8 +59,55 @@ class FileOperationConfig(BaseModel):
     selected_category: str
     selected_types: List[str]
     keyword: str = ""
-    match_type: Literal["Contains", "Exact Match"] = "Contains"
+    match_type: Literal["Contains", "Exact Match", "Glob", "Regex"] = "Contains"
     operation_type: Literal["Move", "Copy"] = "Copy"
+    scan_workers: int = Field(DEFAULT_SCAN_WORKERS, ge=1, description="Directories listed concurrently.")
+    ordered_scan: bool = Field(
+        False,
+        description="Process files in a deterministic order, which also fixes which same-named file gets a _1 suffix.",
+    )
+    copy_workers: int = Field(DEFAULT_COPY_WORKERS, ge=1, description="Files transferred concurrently.")
+    source_device_workers: int = Field(
+        DEFAULT_DEVICE_WORKERS, ge=1, description="Concurrent transfers reading from one device."
+    )
+    dest_device_workers: int = Field(
+        DEFAULT_DEVICE_WORKERS, ge=1, description="Concurrent transfers writing to one device."
+    )
+    dedup_mode: Literal["Off", "Skip", "Hardlink", "Report"] = Field(
+        "Off", description="What to do with files whose content duplicates an earlier match."
+    )
+    hash_workers: int = Field(DEFAULT_HASH_WORKERS, ge=1, description="Files hashed concurrently.")
+    index_path: Optional[str] = Field(
+        None, description="SQLite metadata index reused by later scans of the same folder."
+    )
+    journal_path: Optional[str] = Field(
+        None, description="Transfer journal that lets an interrupted execute be resumed."
+    )
+    route_categories: List[str] = Field(
+        default_factory=list,
+        description="Categories to sort into in one pass; replaces selected_category/selected_types when set.",
+    )
+    metrics_path: Optional[str] = Field(
+        None, description="JSON file the run's timings, counters and latency histograms are written to."
+    )
+    content_sniffing: Literal["Off", "Unknown", "All"] = Field(
+        "Off",
+        description="Recognize file types from their first bytes: for files with an unknown extension, or all files.",
+    )
+    sniff_workers: int = Field(DEFAULT_SNIFF_WORKERS, ge=1, description="Files sniffed concurrently.")
+    min_size: Optional[int] = Field(None, ge=0, description="Only files of at least this many bytes.")
+    max_size: Optional[int] = Field(None, ge=0, description="Only files of at most this many bytes.")
+    date_field: Literal["mtime", "ctime"] = Field(
+        "mtime", description="Timestamp the date and age limits apply to: modification or status change time."
+    )
+    date_after: Optional[datetime] = Field(None, description="Only files dated at or after this time.")
+    date_before: Optional[datetime] = Field(None, description="Only files dated at or before this time.")
+    min_age_days: Optional[float] = Field(None, ge=0, description="Only files at least this many days old.")
+    max_age_days: Optional[float] = Field(None, ge=0, description="Only files at most this many days old.")
+    dest_layout: str = Field(
+        DEFAULT_LAYOUT,
+        description="Destination folders relative to dest_folder_path, e.g. '{category}/{year}/{month}'.",
+    )
 
     @field_validator("folder_path", "dest_folder_path")
     @classmethod
@@ -40,160 +116,413 @@ class FileOperationConfig(BaseModel):
         if v and not os.path.exists(v):
             raise ValueError(f"Path does not exist: {v}")
         return v
+    
+    @field_validator("dest_layout")
+    @classmethod
+    def validate_dest_layout(cls, v: str) -> str:
+        """Validate the destination layout template."""
+        layout_fields(v)
+        return v
+    
+    @field_validator("route_categories")
+    @classmethod
+    def validate_route_categories(cls, v: List[str]) -> List[str]:
+        """Validate that routed categories exist."""
+        unknown = [category for category in v if category not in CATEGORIES_MAP]
+        if unknown:
+            raise ValueError(f"Unknown categories: {', '.join(unknown)}")
+        return v
+    
+    @model_validator(mode="after")
+    def validate_pattern(self) -> "FileOperationConfig":
+        """Validate Glob and Regex keywords before any directory is scanned."""
+        if self.mode == "Advanced":
+            compile_pattern(self.keyword, self.match_type)
+        return self
+    
+    @model_validator(mode="after")
+    def validate_ranges(self) -> "FileOperationConfig":
+        """Validate that size, date and age ranges are not empty."""
+        ranges = [
+            ("min_size", "max_size", self.min_size, self.max_size),
+            (
+                "date_after",
+                "date_before",
+                self.date_after.timestamp() if self.date_after is not None else None,
+                self.date_before.timestamp() if self.date_before is not None else None,
+            ),
+            ("min_age_days", "max_age_days", self.min_age_days, self.max_age_days),
+        ]
+        for low_name, high_name, low, high in ranges:
+            if low is not None and high is not None and low > high:
+                raise ValueError(f"{low_name} must not exceed {high_name}")
+        return self
 
 
-def preview_changes(config: FileOperationConfig) -> Dict[str, List[str]]:
+def preview_changes(
+    config: FileOperationConfig,
+    cancel_event: Optional[threading.Event] = None,
+    on_event: Optional[EventListener] = None,
+    plan: Optional[OperationPlan] = None,
+    metrics: Optional[OperationStats] = None,
+) -> OperationPlan:
     """
     Preview file changes without executing them.
     
     Args:
         config: File operation configuration
+        cancel_event: Optional event that stops the scan between files when set
+        on_event: Optional listener for progress events; defaults to console output
+        plan: Optional empty plan for the config to fill, which other threads
+            may read while the scan is running
+        metrics: Optional stats to collect timings in, e.g. to poll them live
         
     Returns:
-        Dictionary of matched files and their destinations
+        Plan of matched files and their destinations, reusable by execute_changes
     """
-    if not config.selected_types:
-        console.print("[bold red]No file types selected.[/bold red]")
-        return {}
+    emit = on_event or _default_listener()
+    if plan is None:
+        plan = OperationPlan(config)
+    if metrics is None:
+        metrics = OperationStats()
+    metrics.operation = metrics.operation or "Preview"
+    if not config.selected_types and not config.route_categories:
+        emit(OperationError("No file types selected."))
+        return plan
 
-    console.print(f"[bold blue]Scanning folder:[/bold blue] {config.folder_path}")
+    emit(ScanStarted(config.folder_path))
+    start = time.perf_counter()
     
-    matched_files = {}
+    cancelled = False
     try:
-        for root, _, files in os.walk(config.folder_path):
-            for file in files:
-                if _file_matches(file, config):
-                    src_path = os.path.join(root, file)
-                    dest_dir = os.path.join(config.dest_folder_path, config.selected_category)
-                    dest_path = os.path.join(dest_dir, file)
-                    
-                    relative_src = os.path.relpath(src_path, config.folder_path)
-                    if config.selected_category not in matched_files:
-                        matched_files[config.selected_category] = []
-                    matched_files[config.selected_category].append(relative_src)
-                    
-                    console.print(f"  [green]• {relative_src}[/green] -> [yellow]{dest_path}[/yellow]")
-        
-        if not matched_files:
-            console.print("[yellow]No files matched your criteria.[/yellow]")
-        else:
-            console.print(f"\n[bold green]Found {sum(len(files) for files in matched_files.values())} files to {config.operation_type.lower()}.[/bold green]")
+        for entry in _plan_entries(config, metrics):
+            if cancel_event is not None and cancel_event.is_set():
+                cancelled = True
+                break
+            plan.entries.append(entry)
+            emit(FileMatched(entry.source, entry.destination, plan.relative_source(entry)))
             
     except Exception as e:
         logger.error(f"Error previewing changes: {str(e)}")
-        console.print(f"[bold red]Error previewing changes:[/bold red] {str(e)}")
+        emit(OperationError(f"Error previewing changes: {str(e)}"))
     
-    return matched_files
+    metrics.add_files(len(plan), plan.total_bytes)
+    metrics.finish()
+    if config.metrics_path:
+        metrics.write(config.metrics_path)
+    emit(OperationFinished(
+        "Preview", len(plan), bytes=plan.total_bytes, cancelled=cancelled, elapsed=time.perf_counter() - start
+    ))
+    return plan
 
 
-def execute_changes(config: FileOperationConfig) -> bool:
+def execute_changes(
+    config: FileOperationConfig,
+    plan: Optional[OperationPlan] = None,
+    cancel_event: Optional[threading.Event] = None,
+    on_event: Optional[EventListener] = None,
+    metrics: Optional[OperationStats] = None,
+) -> bool:
     """
     Execute file operations (move or copy).
     
+    When a plan from preview_changes is supplied and its sources are unchanged,
+    it is executed directly instead of walking the source folder again. With
+    config.journal_path set, an interrupted run is resumed from its journal.
+    
     Args:
         config: File operation configuration
+        plan: Optional plan produced by preview_changes for the same config
+        cancel_event: Optional event that stops the operation between files when set
+        on_event: Optional listener for progress events; defaults to console output
+        metrics: Optional stats to collect timings in, e.g. to poll them live
         
     Returns:
-        True if successful, False otherwise
+        True if successful, False otherwise (including when cancelled)
     """
-    console.print(f"[bold blue]Executing {config.operation_type} operation...[/bold blue]")
-    
-    success_count = 0
-    error_count = 0
+    emit = on_event or _default_listener()
+    emit(ExecuteStarted(config.operation_type))
+    if metrics is None:
+        metrics = OperationStats()
+    metrics.operation = metrics.operation or config.operation_type
     
+    journal: Optional[TransferJournal] = None
+    finished = False
     try:
-        # Create destination category folder if it doesn't exist
-        dest_dir = os.path.join(config.dest_folder_path, config.selected_category)
-        os.makedirs(dest_dir, exist_ok=True)
+        if config.journal_path:
+            journal = TransferJournal(config.journal_path, config)
+        
+        if journal is not None and journal.resumed:
+            emit(Notice(
+                f"Resuming interrupted run: {len(journal.completed)} files already transferred "
+                f"({journal.recovered} found complete on disk)."
+            ))
+        # With the whole plan in the journal, neither scan nor hash again
+        from_journal = journal is not None and journal.resumed and journal.scan_complete
+        if from_journal:
+            entries = journal.remaining()
+        else:
+            entries = _reusable_plan_entries(config, plan, emit)
+            if entries is None:
+                entries = _plan_entries(config, metrics)
+        
+        # Create destination category folder if it doesn't exist; routed
+        # category folders and layout subfolders are created by the copy engine
+        if not config.route_categories and config.dest_layout == DEFAULT_LAYOUT:
+            dest_dir = os.path.join(config.dest_folder_path, config.selected_category)
+            os.makedirs(dest_dir, exist_ok=True)
         
-        for root, _, files in os.walk(config.folder_path):
-            for file in files:
-                if _file_matches(file, config):
-                    relative_path = os.path.relpath(os.path.join(root, file), config.folder_path)
-                    console.print(f"  Processing: [green]{relative_path}[/green]")
-                    
-                    try:
-                        src_path = os.path.join(root, file)
-                        dest_path = os.path.join(dest_dir, file)
-                        
-                        # Check for existing file with same name
-                        if os.path.exists(dest_path):
-                            base, ext = os.path.splitext(file)
-                            counter = 1
-                            while os.path.exists(dest_path):
-                                new_name = f"{base}_{counter}{ext}"
-                                dest_path = os.path.join(dest_dir, new_name)
-                                counter += 1
-                            console.print(f"    [yellow]File already exists, renamed to: {os.path.basename(dest_path)}[/yellow]")
-                        
-                        _process_file(src_path, dest_path, config.operation_type)
-                        success_count += 1
-                    
-                    except Exception as e:
-                        error_count += 1
-                        logger.error(f"Error processing {file}: {str(e)}")
-                        console.print(f"    [bold red]Error:[/bold red] {str(e)}")
+        # A plan knows every destination folder, so they are created at once
+        # up front; files from a scan get theirs created batch by batch
+        planned_dirs = entries.destination_dirs() if isinstance(entries, PlanStore) else []
         
-        if success_count > 0:
-            console.print(f"\n[bold green]Successfully processed {success_count} files.[/bold green]")
-        if error_count > 0:
-            console.print(f"[bold red]Encountered errors with {error_count} files.[/bold red]")
+        duplicates: List[Tuple[PlanEntry, PlanEntry]] = []
+        if config.dedup_mode != "Off" and not from_journal:
+            entries = list(entries)
+            with metrics.phase("dedup"):
+                entries, duplicates = _split_duplicates(config, entries, cancel_event, emit)
+        
+        engine = CopyEngine(
+            config.operation_type,
+            workers=config.copy_workers,
+            source_device_workers=config.source_device_workers,
+            dest_device_workers=config.dest_device_workers,
+            metrics=metrics,
+        )
+        if planned_dirs:
+            engine.create_dirs(planned_dirs)
+        
+        if config.dedup_mode == "Hardlink":
+            # Remember where each original landed so its duplicates can link to it
+            originals = {original.source for _, original in duplicates}
+            destinations: Dict[str, str] = dict(journal.completed) if journal is not None else {}
+            
+            def record(event: OperationEvent) -> None:
+                if isinstance(event, FileTransferred) and event.source in originals:
+                    destinations[event.source] = event.destination
+                emit(event)
+            
+            stats = engine.run(entries, record, config.folder_path, cancel_event, journal)
+            if not stats.cancelled:
+                if journal is not None:
+                    # Duplicates an earlier attempt already linked
+                    pending = [pair for pair in duplicates if not journal.is_completed(pair[0].source)]
+                    stats.skipped += len(duplicates) - len(pending)
+                    duplicates = pending
+                linked, failed = link_duplicates(
+                    duplicates, destinations, engine.names, config.operation_type, emit, journal
+                )
+                stats.files += linked
+                stats.errors += failed
+                metrics.add_files(linked, 0)
+        else:
+            stats = engine.run(entries, emit, config.folder_path, cancel_event, journal)
+            for duplicate, original in duplicates:
+                emit(DuplicateFound(duplicate.source, original.source, "skipped"))
         
-        console.print("[bold blue]File organization complete.[/bold blue]")
-        return success_count > 0 and error_count == 0
+        finished = not stats.cancelled and stats.errors == 0
+        emit(OperationFinished(
+            config.operation_type,
+            stats.files,
+            stats.errors,
+            stats.bytes,
+            stats.cancelled,
+            stats.elapsed,
+            renamed=stats.renamed,
+            moved_by_copy=stats.moved_by_copy,
+        ))
+        return (stats.files > 0 or stats.skipped > 0) and finished
     
     except Exception as e:
         logger.error(f"Error executing changes: {str(e)}")
-        console.print(f"[bold red]Error executing changes:[/bold red] {str(e)}")
+        emit(OperationError(f"Error executing changes: {str(e)}"))
         return False
+    
+    finally:
+        if journal is not None:
+            journal.close(finished)
+        metrics.finish()
+        if config.metrics_path:
+            metrics.write(config.metrics_path)
 
 
-def _file_matches(file: str, config: FileOperationConfig) -> bool:
+def _reusable_plan_entries(
+    config: FileOperationConfig, plan: Optional[OperationPlan], emit: EventListener
+) -> Optional[Iterable[PlanEntry]]:
     """
-    Check if a file matches the criteria specified in the config.
+    Return the entries of a plan if it is still valid for the config.
+    
+    Args:
+        config: File operation configuration about to be executed
+        plan: Plan from an earlier preview, if any
+        emit: Listener receiving a notice when the plan cannot be reused
+        
+    Returns:
+        The planned entries, or None if the source folder must be rescanned
+    """
+    if plan is None:
+        return None
+    if not plan.matches(config):
+        emit(Notice("Options changed since the preview, rescanning source folder.", "warning"))
+        return None
+    if plan.is_stale():
+        emit(Notice("Source files changed since the preview, rescanning source folder.", "warning"))
+        return None
+    return plan.entries
+
+
+def _split_duplicates(
+    config: FileOperationConfig,
+    entries: List[PlanEntry],
+    cancel_event: Optional[threading.Event],
+    emit: EventListener,
+) -> Tuple[List[PlanEntry], List[Tuple[PlanEntry, PlanEntry]]]:
+    """
+    Separate files whose content duplicates an earlier planned file.
     
     Args:
-        file: Filename to check
         config: File operation configuration
+        entries: Planned transfers, in plan order
+        cancel_event: Optional event that stops hashing when set
+        emit: Listener receiving dedup events
         
     Returns:
-        True if the file matches, False otherwise
+        Tuple of (entries to transfer, (duplicate, original) pairs held back)
     """
-    # Check file extension match
-    file_ext = os.path.splitext(file)[1].lower()
-    if file_ext not in [ext.lower() for ext in config.selected_types]:
-        return False
+    emit(Notice(f"Checking {len(entries)} files for duplicate content..."))
+    groups = find_duplicates(entries, config.hash_workers, cancel_event)
+    duplicates = [(duplicate, group.original) for group in groups for duplicate in group.duplicates]
+    wasted = sum(group.wasted_bytes for group in groups)
+    emit(Notice(
+        f"Found {len(duplicates)} duplicate files in {len(groups)} groups "
+        f"({wasted / 1_000_000:.1f} MB)."
+    ))
+    
+    if config.dedup_mode == "Report":
+        for duplicate, original in duplicates:
+            emit(DuplicateFound(duplicate.source, original.source, "reported"))
+        return entries, []
+    
+    held_back = {duplicate.source for duplicate, _ in duplicates}
+    return [entry for entry in entries if entry.source not in held_back], duplicates
 
-    # If in Basic mode, we only check extension
-    if config.mode != "Advanced":
-        return True
 
-    # Advanced mode: check keyword match
-    if not config.keyword:  # If no keyword specified, match all files with the extension
-        return True
+def _plan_entries(config: FileOperationConfig, metrics: OperationStats) -> Iterator[PlanEntry]:
+    """
+    Stream plan entries for the files matching the config.
+    
+    Args:
+        config: File operation configuration
+        metrics: Stats receiving the scan and match times
         
-    # Check Contains or Exact Match
-    if config.match_type == "Contains":
-        return config.keyword.lower() in file.lower()
-    else:  # Exact Match
-        filename = os.path.splitext(file)[0].lower()
-        return filename == config.keyword.lower()
+    Yields:
+        PlanEntry for each matching file, with its size/mtime snapshot
+    """
+    matcher = FileMatcher.from_config(config)
+    layout = DestinationLayout.from_config(config)
+    files = _scan_matching_files(config, matcher, metrics)
+    for scan_entry, content_ext in _classify_files(config, matcher, files, metrics):
+        try:
+            size, mtime_ns = scan_entry.snapshot()
+        except OSError:
+            size, mtime_ns = MISSING, MISSING
+        category = matcher.category(scan_entry.name, content_ext) or config.selected_category
+        dest_dir = layout.directory(scan_entry, category, mtime_ns)
+        yield PlanEntry(
+            source=scan_entry.path,
+            destination=os.path.join(dest_dir, scan_entry.name),
+            category=category,
+            size=size,
+            mtime_ns=mtime_ns,
+        )
 
 
-def _process_file(src_path: str, dest_path: str, operation_type: str) -> None:
+def _scan_matching_files(
+    config: FileOperationConfig, matcher: FileMatcher, metrics: OperationStats
+) -> Iterator[ScanEntry]:
     """
-    Process a single file (move or copy).
+    Stream the files under the source folder that match the config.
     
     Args:
-        src_path: Source file path
-        dest_path: Destination file path
-        operation_type: 'Move' or 'Copy'
+        config: File operation configuration
+        matcher: Matcher compiled from the config
+        metrics: Stats receiving the scan wall time and the match time
+        
+    Yields:
+        ScanEntry for each matching file, and with content sniffing on for
+        each file that may match once sniffed
     """
+    def match(names: List[str]) -> List[bool]:
+        # Called once per directory in the scan workers
+        start = time.perf_counter()
+        if config.content_sniffing == "All":
+            # Every file is sniffed; names are checked once the content is known
+            matches = [True] * len(names)
+        elif config.content_sniffing == "Unknown":
+            matches = [
+                flag or not categories_for(name)
+                for name, flag in zip(names, matcher.match_many(names))
+            ]
+        else:
+            matches = matcher.match_many(names)
+        metrics.add_time("match", time.perf_counter() - start, len(names))
+        return matches
+    
+    index = MetadataIndex(config.index_path) if config.index_path else None
+    start = time.perf_counter()
     try:
-        if operation_type == "Move":
-            shutil.move(src_path, dest_path)
-        else:  # Copy
-            shutil.copy2(src_path, dest_path)  # copy2 preserves metadata
-    except Exception as e:
-        logger.error(f"Error processing file {src_path} to {dest_path}: {str(e)}")
-        raise  # Reraise to be caught by the calling function
+        yield from scan_files(
+            config.folder_path,
+            match=match,
+            workers=config.scan_workers,
+            ordered=config.ordered_scan,
+            index=index,
+            accept=matcher.stat_filter.accepts if matcher.stat_filter is not None else None,
+        )
+    finally:
+        metrics.add_time("scan", time.perf_counter() - start)
+        if index is not None:
+            index.close()
+
+
+def _classify_files(
+    config: FileOperationConfig,
+    matcher: FileMatcher,
+    files: Iterable[ScanEntry],
+    metrics: OperationStats,
+) -> Iterator[Tuple[ScanEntry, Optional[str]]]:
+    """
+    Select the scanned files that match, sniffing their content if configured.
+    
+    A type recognized from a file's content overrides its extension, unless
+    the extension is another name for the same format, e.g. '.jpeg' for a
+    JPEG; files whose content is not recognized are matched by name.
+    
+    Args:
+        config: File operation configuration
+        matcher: Matcher compiled from the config
+        files: Files from _scan_matching_files
+        metrics: Stats receiving the sniff time
+        
+    Yields:
+        (file, type recognized from its content or None) for each matching file
+    """
+    if config.content_sniffing == "Off":
+        for scan_entry in files:
+            yield scan_entry, None
+        return
+    
+    should_sniff = None
+    if config.content_sniffing == "Unknown":
+        # Files matching by name have a known extension and are not read
+        should_sniff = lambda scan_entry: not matcher.matches(scan_entry.name)  # noqa: E731
+    sniffer = ContentSniffer(config.sniff_workers, metrics=metrics)
+    for scan_entry, content_ext in sniffer.classify(files, should_sniff):
+        if content_ext is None:
+            if matcher.matches(scan_entry.name):
+                yield scan_entry, None
+        elif same_format(scan_entry.name, content_ext) and matcher.matches(scan_entry.name):
+            # The name already says what the file is, so it is routed by its extension
+            yield scan_entry, None
+        elif matcher.matches_content(scan_entry.name, content_ext):
+            yield scan_entry, content_ext
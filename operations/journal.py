@@ -0,0 +1,270 @@
+"""
+Transfer journal for File Falcon Pro.
+This module keeps an append-only write-ahead log of planned and completed
+transfers, so an execute run that was interrupted can be resumed without
+walking or hashing the source folder again and without creating ``_1``
+copies of files that were already transferred.
+
+Each line of the journal is a JSON record:
+
+- ``begin``: the config the run was started with
+- ``plan``: a transfer about to start and the destination reserved for it
+- ``done``: a transfer that finished
+- ``scanned``: every planned transfer has been written
+- ``end``: the run finished; the next run starts a new journal
+
+Writes are buffered and fsync'ed in groups. Plan records are made durable
+before their transfers are dispatched; done records may lag behind, which is
+safe because recovery re-checks every planned transfer without a done record.
+"""
+import json
+import logging
+import os
+import time
+from json.encoder import encode_basestring_ascii
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional
+
+from operations.plan import TUNING_FIELDS, PlanEntry
+
+if TYPE_CHECKING:
+    from operations.file_operations import FileOperationConfig
+
+logger = logging.getLogger("journal")
+
+# Buffered done records that force a flush; normally they are made durable
+# together with the next batch of plan records
+FLUSH_RECORDS = 4096
+
+# Longest time done records stay buffered, in seconds
+FLUSH_INTERVAL = 1.0
+
+# Coarsest mtime resolution of a destination filesystem (FAT stores 2 second
+# steps); copied mtimes closer than this to the source's count as equal
+MTIME_RESOLUTION_NS = 2_000_000_000
+
+# Plan and done records are formatted directly, which is several times
+# faster than json.dumps; strings still go through JSON escaping
+_quote = encode_basestring_ascii
+
+
+def _config_key(config: "FileOperationConfig") -> Dict[str, Any]:
+    """Config fields that must match for a journal to be resumed, as stored in its begin record."""
+    return config.model_dump(mode="json", exclude=TUNING_FIELDS)
+
+
+class TransferJournal:
+    """Write-ahead journal of one execute run, possibly spanning several attempts."""
+
+    def __init__(self, path: str, config: "FileOperationConfig"):
+        """Open a journal, loading the state of an unfinished earlier run.
+
+        A journal left by a run with a different config, or by a run that
+        finished, is discarded.
+
+        Args:
+            path: Journal file path
+            config: Config about to be executed
+        """
+        self.path = path
+        self.operation_type = config.operation_type
+        # Planned transfers without a done record, by source
+        self.pending: Dict[str, PlanEntry] = {}
+        # Destinations of finished transfers, by source
+        self.completed: Dict[str, str] = {}
+        # Whether the previous attempt got through the whole plan
+        self.scan_complete = False
+        self.resumed = False
+        # Transfers found finished on disk during recovery
+        self.recovered = 0
+
+        key = _config_key(config)
+        records = self._read()
+        if records and records[0].get("t") == "begin" and records[0].get("config") == key \
+                and records[-1].get("t") != "end":
+            self.resumed = True
+            self._replay(records)
+            self._file = open(path, "a", encoding="utf-8")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+
+        if not self.resumed:
+            self._append({"t": "begin", "config": key})
+            self.flush()
+        else:
+            self._recover()
+            self.flush()
+
+    def _read(self) -> List[Dict[str, Any]]:
+        """Read all intact records; a torn last line is ignored."""
+        records = []
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break
+        except FileNotFoundError:
+            pass
+        return records
+
+    def _replay(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Rebuild pending and completed transfers from earlier records."""
+        for record in records:
+            kind = record.get("t")
+            if kind == "plan":
+                self.pending[record["src"]] = PlanEntry(
+                    record["src"], record["dst"], record["cat"], record["size"], record["mtime"]
+                )
+            elif kind == "done":
+                entry = self.pending.pop(record["src"], None)
+                self.completed[record["src"]] = entry.destination if entry else record.get("dst", "")
+            elif kind == "scanned":
+                self.scan_complete = True
+
+    def _recover(self) -> None:
+        """
+        Settle transfers that were in flight when the earlier attempt stopped.
+
+        A destination whose size equals the source's and whose mtime matches
+        it to within the destination's timestamp resolution was fully
+        written, since metadata is copied last; anything else at the
+        destination is a partial copy and is removed so the transfer can be
+        redone under the same name.
+        """
+        for source, entry in list(self.pending.items()):
+            try:
+                dest = os.stat(entry.destination)
+            except OSError:
+                continue
+            try:
+                src = os.stat(source)
+            except FileNotFoundError:
+                if self.operation_type == "Move":
+                    # A move whose source is gone has landed
+                    self._mark_recovered(entry)
+                else:
+                    # Nothing to compare the copy with; the transfer fails again
+                    logger.warning(f"Cannot recover copy of {source}: the source is missing")
+                continue
+            try:
+                if dest.st_size == src.st_size and abs(dest.st_mtime_ns - src.st_mtime_ns) < MTIME_RESOLUTION_NS:
+                    if self.operation_type == "Move":
+                        # The copy finished but the source was not removed yet
+                        os.unlink(source)
+                    self._mark_recovered(entry)
+                else:
+                    os.unlink(entry.destination)
+            except OSError as e:
+                logger.error(f"Error recovering transfer of {source}: {str(e)}")
+
+    def _mark_recovered(self, entry: PlanEntry) -> None:
+        """Record a transfer found finished during recovery."""
+        del self.pending[entry.source]
+        self.completed[entry.source] = entry.destination
+        self.recovered += 1
+        self._append({"t": "done", "src": entry.source})
+
+    def is_completed(self, source: str) -> bool:
+        """
+        Check whether an earlier attempt already transferred a file.
+
+        Args:
+            source: Source path
+
+        Returns:
+            True if the file must be skipped
+        """
+        return source in self.completed
+
+    def destination(self, source: str) -> Optional[str]:
+        """
+        Get the destination reserved for a file by an earlier attempt.
+
+        Args:
+            source: Source path
+
+        Returns:
+            The journaled destination, or None if the file was never planned
+        """
+        entry = self.pending.get(source)
+        return entry.destination if entry else None
+
+    def remaining(self) -> Iterator[PlanEntry]:
+        """
+        Iterate the planned transfers that have not finished.
+
+        Only meaningful when scan_complete is True; otherwise the source
+        folder has to be scanned again for files that were never planned.
+
+        Yields:
+            Entries whose destination is the one reserved earlier
+        """
+        yield from list(self.pending.values())
+
+    def planned(self, entries: Iterable[PlanEntry], destinations: Iterable[str]) -> None:
+        """
+        Record transfers about to start and make the records durable.
+
+        Args:
+            entries: Entries about to be dispatched
+            destinations: Destination reserved for each entry
+        """
+        for entry, dest_path in zip(entries, destinations):
+            if entry.source in self.pending:
+                continue
+            if entry.destination != dest_path:
+                entry = PlanEntry(entry.source, dest_path, entry.category, entry.size, entry.mtime_ns)
+            self.pending[entry.source] = entry
+            self._buffer.append(
+                f'{{"t":"plan","src":{_quote(entry.source)},"dst":{_quote(dest_path)},'
+                f'"cat":{_quote(entry.category)},"size":{entry.size:d},"mtime":{entry.mtime_ns:d}}}'
+            )
+        self.flush()
+
+    def done(self, source: str) -> None:
+        """
+        Record a finished transfer; it is made durable with the next flush.
+
+        Args:
+            source: Source path of the transfer
+        """
+        entry = self.pending.pop(source, None)
+        self.completed[source] = entry.destination if entry else ""
+        self._buffer.append(f'{{"t":"done","src":{_quote(source)}}}')
+        if len(self._buffer) >= FLUSH_RECORDS or time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def mark_scanned(self) -> None:
+        """Record that every transfer of the run has been planned."""
+        self.scan_complete = True
+        self._append({"t": "scanned"})
+        self.flush()
+
+    def close(self, finished: bool) -> None:
+        """
+        Flush and close the journal.
+
+        Args:
+            finished: Whether the run completed; an unfinished journal is kept
+                so the next run with the same config resumes it
+        """
+        if finished:
+            self._append({"t": "end"})
+        self.flush()
+        self._file.close()
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """Buffer a record."""
+        self._buffer.append(json.dumps(record, separators=(",", ":")))
+
+    def flush(self) -> None:
+        """Write buffered records and fsync them."""
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._last_flush = time.monotonic()
@@ -0,0 +1,164 @@
+"""
+Destination layouts for File Falcon Pro.
+This module turns a layout template such as '{category}/{year}/{month}' into
+the destination directory of each planned file, using the mtime captured
+while scanning, so no file is stat'ed again. Spreading files over
+dated or per-extension folders keeps each destination directory small,
+which keeps listing it and resolving name conflicts in it fast.
+"""
+import os
+import string
+import time
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from operations.plan import MISSING
+
+if TYPE_CHECKING:
+    from operations.file_operations import FileOperationConfig
+    from operations.scanner import ScanEntry
+
+# Files go straight into their category folder, as before layouts existed
+DEFAULT_LAYOUT = "{category}"
+
+# Placeholders a layout may use
+LAYOUT_FIELDS = ("category", "year", "month", "day", "ext", "source_dir")
+
+# Presets offered by the GUI; any template using LAYOUT_FIELDS is accepted
+LAYOUT_PRESETS = [
+    DEFAULT_LAYOUT,
+    "{category}/{year}",
+    "{category}/{year}/{month}",
+    "{category}/{year}/{month}/{day}",
+    "{category}/{ext}",
+    "{category}/{source_dir}",
+]
+
+# Used for the date fields of files whose mtime is unknown
+UNKNOWN_DATE = "Unknown"
+
+# Used for {ext} of files without an extension
+NO_EXTENSION = "no_extension"
+
+
+def layout_fields(template: str) -> List[str]:
+    """
+    Validate a layout template and list the placeholders it uses.
+
+    Args:
+        template: Layout relative to the destination folder, with '/' between folders
+
+    Returns:
+        Placeholder names in order of appearance
+
+    Raises:
+        ValueError: If the template is empty, absolute, climbs out of the
+            destination folder or uses an unknown or malformed placeholder
+    """
+    if not template.strip():
+        raise ValueError("Destination layout must not be empty")
+    if os.path.isabs(template) or template.startswith(("/", "\\")):
+        raise ValueError(f"Destination layout must be relative: {template}")
+    if ".." in template.replace("\\", "/").split("/"):
+        raise ValueError(f"Destination layout must stay inside the destination folder: {template}")
+    try:
+        parsed = list(string.Formatter().parse(template))
+    except ValueError as e:
+        raise ValueError(f"Malformed destination layout '{template}': {str(e)}") from e
+    fields = []
+    for _, field_name, format_spec, conversion in parsed:
+        if field_name is None:
+            continue
+        if field_name not in LAYOUT_FIELDS or format_spec or conversion:
+            raise ValueError(
+                f"Unknown placeholder '{{{field_name}}}' in destination layout; "
+                f"use {', '.join(f'{{{name}}}' for name in LAYOUT_FIELDS)}"
+            )
+        fields.append(field_name)
+    return fields
+
+
+class DestinationLayout:
+    """Compiled layout template mapping planned files to destination directories."""
+
+    __slots__ = ("root", "template", "source_root", "_fields", "_key_fields", "_parts", "_dirs", "_relative_dirs")
+
+    def __init__(self, root: str, template: str = DEFAULT_LAYOUT, source_root: str = ""):
+        """Compile a layout.
+
+        Args:
+            root: Destination folder the layout is relative to
+            template: Layout template, see LAYOUT_FIELDS
+            source_root: Scanned folder that {source_dir} is relative to
+
+        Raises:
+            ValueError: If the template is invalid
+        """
+        self.root = root
+        self.template = template
+        self.source_root = source_root
+        self._fields = frozenset(layout_fields(template))
+        # Values that tell destination directories apart
+        self._key_fields = tuple(sorted(self._fields | {"category"}))
+        # Folders of the template, joined with the platform separator
+        self._parts = [part for part in template.replace("\\", "/").split("/") if part]
+        # Directory of every combination of field values seen so far
+        self._dirs: Dict[Tuple[str, ...], str] = {}
+        # Source directory -> its path relative to source_root
+        self._relative_dirs: Dict[str, str] = {}
+
+    @classmethod
+    def from_config(cls, config: "FileOperationConfig") -> "DestinationLayout":
+        """Compile the layout of a file operation configuration.
+
+        Args:
+            config: File operation configuration
+
+        Returns:
+            Layout rooted at the config's destination folder
+        """
+        return cls(config.dest_folder_path, config.dest_layout, config.folder_path)
+
+    def directory(self, scan_entry: "ScanEntry", category: str, mtime_ns: int) -> str:
+        """Get the destination directory of a file.
+
+        Args:
+            scan_entry: Scanned file
+            category: Category the file is routed to
+            mtime_ns: Modification time captured by the scan, or MISSING
+
+        Returns:
+            Destination directory; the same string object for files that share it
+        """
+        values = {"category": category}
+        fields = self._fields
+        if "year" in fields or "month" in fields or "day" in fields:
+            if mtime_ns == MISSING:
+                values["year"] = values["month"] = values["day"] = UNKNOWN_DATE
+            else:
+                date = time.localtime(mtime_ns // 1_000_000_000)
+                values["year"] = f"{date.tm_year:04d}"
+                values["month"] = f"{date.tm_mon:02d}"
+                values["day"] = f"{date.tm_mday:02d}"
+        if "ext" in fields:
+            values["ext"] = os.path.splitext(scan_entry.name)[1][1:].lower() or NO_EXTENSION
+        if "source_dir" in fields:
+            values["source_dir"] = self._relative_dir(scan_entry.dirpath)
+
+        key = tuple(values[name] for name in self._key_fields)
+        dest_dir = self._dirs.get(key)
+        if dest_dir is None:
+            parts = [part.format(**values) for part in self._parts]
+            # Empty parts, e.g. {source_dir} for files at the top of the scan, are dropped
+            dest_dir = os.path.join(self.root, *[part for part in parts if part])
+            self._dirs[key] = dest_dir
+        return dest_dir
+
+    def _relative_dir(self, dirpath: str) -> str:
+        """Get a source directory relative to the scanned folder, '' for the folder itself."""
+        relative = self._relative_dirs.get(dirpath)
+        if relative is None:
+            relative = os.path.relpath(dirpath, self.source_root) if self.source_root else ""
+            if relative == os.curdir:
+                relative = ""
+            self._relative_dirs[dirpath] = relative
+        return relative
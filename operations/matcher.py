@@ -0,0 +1,310 @@
+"""
+Filename matching for File Falcon Pro.
+This module compiles the matching criteria of a FileOperationConfig once so
+that checking each scanned filename is a set lookup rather than a rebuild of
+the criteria.
+"""
+import fnmatch
+import os
+import re
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Pattern, Sequence
+
+from operations.file_extensions import longest_suffix, routing_table
+from operations.plan import MISSING
+
+if TYPE_CHECKING:
+    from operations.file_operations import FileOperationConfig
+    from operations.scanner import ScanEntry
+
+# Separates the patterns of a Glob keyword, e.g. 'IMG_2024*;DSC_*'
+GLOB_SEPARATOR = ";"
+
+
+def compile_pattern(keyword: str, match_type: str) -> Optional[Pattern[str]]:
+    """
+    Compile a Glob or Regex keyword into one case-insensitive regular expression.
+
+    Several glob patterns are combined into a single alternation, so each
+    filename is checked with one regex search however many patterns there are.
+
+    Args:
+        keyword: Glob patterns separated by GLOB_SEPARATOR, or a regular expression
+        match_type: 'Glob' or 'Regex'; other match types have no pattern
+
+    Returns:
+        The compiled pattern, or None for an empty keyword or a non-pattern match type
+
+    Raises:
+        ValueError: If the keyword is not a valid pattern
+    """
+    if not keyword or match_type not in ("Glob", "Regex"):
+        return None
+    if match_type == "Glob":
+        globs = [glob.strip() for glob in keyword.split(GLOB_SEPARATOR) if glob.strip()]
+        if not globs:
+            return None
+        source = "|".join(fnmatch.translate(glob) for glob in globs)
+    else:
+        source = keyword
+    try:
+        return re.compile(source, re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Invalid {match_type.lower()} pattern '{keyword}': {str(e)}") from e
+
+
+class StatFilter:
+    """Size and date limits checked against a file's stat data."""
+
+    __slots__ = ("min_size", "max_size", "earliest_ns", "latest_ns", "use_ctime")
+
+    def __init__(
+        self,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        earliest_ns: Optional[int] = None,
+        latest_ns: Optional[int] = None,
+        use_ctime: bool = False,
+    ):
+        """Initialize the filter; None leaves a limit open.
+
+        Args:
+            min_size: Smallest accepted size in bytes
+            max_size: Largest accepted size in bytes
+            earliest_ns: Earliest accepted time, in nanoseconds since the epoch
+            latest_ns: Latest accepted time, in nanoseconds since the epoch
+            use_ctime: Compare the status change time instead of the modification time
+        """
+        self.min_size = min_size
+        self.max_size = max_size
+        self.earliest_ns = earliest_ns
+        self.latest_ns = latest_ns
+        self.use_ctime = use_ctime
+
+    @classmethod
+    def from_config(cls, config: "FileOperationConfig", now: Optional[float] = None) -> Optional["StatFilter"]:
+        """Build the filter of a configuration, turning ages into absolute times.
+
+        Args:
+            config: File operation configuration
+            now: Time ages are counted from, defaulting to the current time
+
+        Returns:
+            The filter, or None if the config sets no size or date limit
+        """
+        if now is None:
+            now = time.time()
+        earliest = [] if config.date_after is None else [config.date_after.timestamp()]
+        latest = [] if config.date_before is None else [config.date_before.timestamp()]
+        if config.max_age_days is not None:
+            earliest.append(now - config.max_age_days * 86400)
+        if config.min_age_days is not None:
+            latest.append(now - config.min_age_days * 86400)
+        stat_filter = cls(
+            config.min_size,
+            config.max_size,
+            int(max(earliest) * 1e9) if earliest else None,
+            int(min(latest) * 1e9) if latest else None,
+            config.date_field == "ctime",
+        )
+        return stat_filter if stat_filter.active else None
+
+    @property
+    def active(self) -> bool:
+        """Whether any limit is set."""
+        return any(limit is not None for limit in (self.min_size, self.max_size, self.earliest_ns, self.latest_ns))
+
+    def accepts(self, scan_entry: "ScanEntry") -> bool:
+        """Check a scanned file against the limits.
+
+        Size and mtime come from the stat the scan already has (the DirEntry
+        cache or the metadata index), so this adds no system call per file
+        unless ctime is compared for a file served from the index.
+
+        Args:
+            scan_entry: File whose name already matched
+
+        Returns:
+            True if the file is within every limit; False if it cannot be stat'ed
+        """
+        try:
+            size, mtime_ns = scan_entry.snapshot()
+        except OSError:
+            return False
+        if size == MISSING:
+            return False
+        if self.min_size is not None and size < self.min_size:
+            return False
+        if self.max_size is not None and size > self.max_size:
+            return False
+        if self.earliest_ns is None and self.latest_ns is None:
+            return True
+        if self.use_ctime:
+            try:
+                timestamp = scan_entry.ctime_ns()
+            except OSError:
+                return False
+        else:
+            timestamp = mtime_ns
+        if self.earliest_ns is not None and timestamp < self.earliest_ns:
+            return False
+        return self.latest_ns is None or timestamp <= self.latest_ns
+
+
+class FileMatcher:
+    """Precompiled filename matcher built from file operation settings."""
+
+    __slots__ = ("extensions", "keyword", "match_type", "routes", "stat_filter", "_max_dots", "_pattern_matches")
+
+    def __init__(
+        self,
+        extensions: Iterable[str],
+        keyword: str = "",
+        match_type: str = "Contains",
+        routes: Optional[Dict[str, str]] = None,
+        stat_filter: Optional[StatFilter] = None,
+    ):
+        """Initialize the matcher.
+
+        Args:
+            extensions: Extensions to accept, e.g. '.mp4' or '.tar.gz'
+            keyword: Optional keyword, or patterns for Glob and Regex; empty
+                matches every accepted extension
+            match_type: 'Contains', 'Exact Match', 'Glob' or 'Regex'
+            routes: Optional lowercase extension -> category table used by category()
+            stat_filter: Optional size and date limits, checked by the scan
+                after the name matched
+
+        Raises:
+            ValueError: If a Glob or Regex keyword is not a valid pattern
+        """
+        self.extensions = frozenset(ext.lower() for ext in extensions)
+        self.routes = routes
+        self.stat_filter = stat_filter
+        self.keyword = keyword.lower()
+        self.match_type = match_type
+        # Number of dots in the longest compound suffix, e.g. 2 for '.tar.gz'
+        self._max_dots = max((ext.count(".") for ext in self.extensions), default=0)
+        # Patterns use the original keyword, as lowercasing would turn \D into \d
+        pattern = compile_pattern(keyword, match_type)
+        # Globs must cover the whole name; a regex may match anywhere in it
+        self._pattern_matches = None
+        if pattern is not None:
+            self._pattern_matches = pattern.fullmatch if match_type == "Glob" else pattern.search
+
+    @classmethod
+    def from_config(cls, config: "FileOperationConfig") -> "FileMatcher":
+        """Compile a matcher from a file operation configuration.
+
+        Args:
+            config: File operation configuration
+
+        Returns:
+            Matcher for the config's types, or every extension of its routed
+            categories, its size and date limits, and in Advanced mode its keyword
+        """
+        keyword = config.keyword if config.mode == "Advanced" else ""
+        stat_filter = StatFilter.from_config(config)
+        if config.route_categories:
+            routes = routing_table(config.route_categories)
+            return cls(routes, keyword, config.match_type, routes, stat_filter)
+        return cls(config.selected_types, keyword, config.match_type, stat_filter=stat_filter)
+
+    def suffix(self, name: str) -> Optional[str]:
+        """Find the longest accepted extension of a filename.
+
+        Like os.path.splitext, leading dots belong to the name, so '.mp4'
+        has no extension.
+
+        Args:
+            name: Lowercased filename
+
+        Returns:
+            The matching extension, or None if no accepted extension matches
+        """
+        return longest_suffix(name, self.extensions, self._max_dots)
+
+    def category(self, name: str, ext: Optional[str] = None) -> Optional[str]:
+        """Find the category a matching filename is routed to.
+
+        Args:
+            name: Filename to route
+            ext: Optional extension to route by instead of the name's, e.g.
+                the type recognized from the file's content
+
+        Returns:
+            The category of its extension, or None without routes or a known extension
+        """
+        if self.routes is None:
+            return None
+        if ext is None:
+            ext = self.suffix(name.lower())
+        return self.routes.get(ext) if ext is not None else None
+
+    def matches(self, name: str) -> bool:
+        """Check whether a filename matches.
+
+        Args:
+            name: Filename to check
+
+        Returns:
+            True if the file matches, False otherwise
+        """
+        lowered = name.lower()
+        ext = self.suffix(lowered)
+        if ext is None:
+            return False
+        return self._keyword_matches(lowered, lowered[: -len(ext)])
+
+    def matches_content(self, name: str, ext: str) -> bool:
+        """Check whether a file matches, given the type recognized from its content.
+
+        Args:
+            name: Filename to check against the keyword
+            ext: Lowercase extension of the recognized type, e.g. '.mp4'
+
+        Returns:
+            True if the type is accepted and the name matches the keyword
+        """
+        if ext not in self.extensions:
+            return False
+        lowered = name.lower()
+        return self._keyword_matches(lowered, os.path.splitext(lowered)[0])
+
+    def _keyword_matches(self, lowered: str, stem: str) -> bool:
+        """Check the keyword against a lowercased filename and its stem."""
+        # If no keyword is specified, match all files with the extension
+        if not self.keyword:
+            return True
+
+        # Check Contains, Exact Match, or a Glob/Regex pattern against the whole name
+        if self.match_type == "Contains":
+            return self.keyword in lowered
+        elif self.match_type == "Exact Match":
+            return stem == self.keyword
+        else:  # Glob or Regex
+            return self._pattern_matches is None or self._pattern_matches(lowered) is not None
+
+    def match_many(self, names: Sequence[str]) -> List[bool]:
+        """Check a batch of filenames, e.g. a whole directory listing.
+
+        Args:
+            names: Filenames to check
+
+        Returns:
+            One flag per name, in the same order
+        """
+        matches = self.matches
+        return [matches(name) for name in names]
+
+    def filter(self, names: Iterable[str]) -> List[str]:
+        """Select the matching filenames from a batch.
+
+        Args:
+            names: Filenames to check
+
+        Returns:
+            The names that match, in their original order
+        """
+        matches = self.matches
+        return [name for name in names if matches(name)]
@@ -0,0 +1,308 @@
+"""
+Persistent file-metadata index for File Falcon Pro.
+This module stores the listing of every scanned directory in SQLite, keyed by
+source folder, so later scans can reuse the listing of any directory whose
+mtime has not changed instead of reading it again.
+
+A directory's mtime changes when entries are added, removed or renamed in it,
+but not when a file inside it is rewritten in place, so sizes and mtimes
+served from the index can lag behind such edits.
+"""
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    scanned_at REAL
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    root_id INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    subdirs TEXT NOT NULL,
+    PRIMARY KEY (root_id, path)
+);
+CREATE TABLE IF NOT EXISTS files (
+    root_id INTEGER NOT NULL,
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    PRIMARY KEY (root_id, dir, name)
+);
+CREATE INDEX IF NOT EXISTS files_by_ext ON files (root_id, ext);
+"""
+
+# Number of recorded directories written per transaction
+COMMIT_INTERVAL = 500
+
+
+@dataclass
+class IndexedFile:
+    """A file as recorded in the index."""
+
+    dir: str
+    name: str
+    ext: str
+    size: int
+    mtime_ns: int
+    inode: int
+
+    @property
+    def path(self) -> str:
+        """Full path of the file."""
+        return os.path.join(self.dir, self.name)
+
+
+@dataclass
+class DirRecord:
+    """A freshly listed directory, to be written to the index."""
+
+    path: str
+    mtime_ns: int
+    subdirs: List[str]
+    files: List[IndexedFile]
+
+
+class MetadataIndex:
+    """SQLite-backed index of scanned directories and files."""
+
+    def __init__(self, db_path: str):
+        """Open (and if needed create) an index database.
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+        # Every thread's connection, so close() can reach them all
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection; SQLite connections are per thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Only used by this thread, but closed by whichever thread calls close()
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Close the connections of every thread that used the index.
+
+        Call it once no scan is using the index anymore.
+        """
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def _root_id(self, root: str, create: bool = False) -> Optional[int]:
+        """Look up the id of a source folder."""
+        conn = self._connection()
+        row = conn.execute("SELECT id FROM roots WHERE path = ?", (root,)).fetchone()
+        if row is not None:
+            return row[0]
+        if not create:
+            return None
+        with conn:
+            return conn.execute("INSERT INTO roots (path) VALUES (?)", (root,)).lastrowid
+
+    def begin_scan(self, root: str) -> "IndexScan":
+        """Start a scan of a source folder.
+
+        Args:
+            root: Source folder being scanned
+
+        Returns:
+            Handle used by the scanner to read and update the index
+        """
+        root = os.path.abspath(root)
+        return IndexScan(self, root, self._root_id(root, create=True))
+
+    # Query API
+
+    def roots(self) -> List[Tuple[str, Optional[float]]]:
+        """List indexed source folders.
+
+        Returns:
+            (path, last completed scan time) pairs
+        """
+        return self._connection().execute("SELECT path, scanned_at FROM roots ORDER BY path").fetchall()
+
+    def summary(self, root: str) -> Dict[str, int]:
+        """Count what is indexed for a source folder.
+
+        Args:
+            root: Source folder
+
+        Returns:
+            Dictionary with 'dirs', 'files' and 'bytes'
+        """
+        root_id = self._root_id(os.path.abspath(root))
+        if root_id is None:
+            return {"dirs": 0, "files": 0, "bytes": 0}
+        conn = self._connection()
+        dirs = conn.execute("SELECT COUNT(*) FROM dirs WHERE root_id = ?", (root_id,)).fetchone()[0]
+        files, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files WHERE root_id = ?", (root_id,)
+        ).fetchone()
+        return {"dirs": dirs, "files": files, "bytes": total}
+
+    def find(
+        self,
+        root: str,
+        ext: Optional[str] = None,
+        min_size: Optional[int] = None,
+        name_contains: Optional[str] = None,
+    ) -> Iterator[IndexedFile]:
+        """Query indexed files of a source folder.
+
+        Args:
+            root: Source folder
+            ext: Only files with this extension, e.g. '.mp4'
+            min_size: Only files of at least this many bytes
+            name_contains: Only files whose name contains this text
+
+        Yields:
+            Matching IndexedFile records
+        """
+        root_id = self._root_id(os.path.abspath(root))
+        if root_id is None:
+            return
+        query = "SELECT dir, name, ext, size, mtime_ns, inode FROM files WHERE root_id = ?"
+        params: list = [root_id]
+        if ext is not None:
+            query += " AND ext = ?"
+            params.append(ext.lower())
+        if min_size is not None:
+            query += " AND size >= ?"
+            params.append(min_size)
+        if name_contains is not None:
+            query += " AND instr(name, ?) > 0"
+            params.append(name_contains)
+        for row in self._connection().execute(query, params):
+            yield IndexedFile(*row)
+
+    def forget(self, root: str) -> None:
+        """Remove everything indexed for a source folder.
+
+        Args:
+            root: Source folder
+        """
+        root_id = self._root_id(os.path.abspath(root))
+        if root_id is None:
+            return
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM files WHERE root_id = ?", (root_id,))
+            conn.execute("DELETE FROM dirs WHERE root_id = ?", (root_id,))
+            conn.execute("DELETE FROM roots WHERE id = ?", (root_id,))
+
+
+class IndexScan:
+    """Index access for one scan of one source folder.
+
+    cached_listing() and visit() may be called from any scanner thread; record() and
+    finish() must be called from the thread consuming the scan.
+    """
+
+    def __init__(self, index: MetadataIndex, root: str, root_id: int):
+        self.index = index
+        self.root = root
+        self.root_id = root_id
+        self._known: Dict[str, Tuple[int, str]] = {
+            path: (mtime_ns, subdirs)
+            for path, mtime_ns, subdirs in index._connection().execute(
+                "SELECT path, mtime_ns, subdirs FROM dirs WHERE root_id = ?", (root_id,)
+            )
+        }
+        self._visited: Set[str] = set()
+        self._pending = 0
+
+    def cached_listing(self, dirpath: str, mtime_ns: int) -> Optional[Tuple[List[IndexedFile], List[str]]]:
+        """Get a directory's indexed listing if it is still current.
+
+        Args:
+            dirpath: Directory being scanned
+            mtime_ns: Its current mtime
+
+        Returns:
+            Tuple of (files, subdirectory paths), or None if it must be listed
+        """
+        known = self._known.get(dirpath)
+        if known is None or known[0] != mtime_ns:
+            return None
+        subdirs = [os.path.join(dirpath, name) for name in known[1].split("\n") if name]
+        rows = self.index._connection().execute(
+            "SELECT dir, name, ext, size, mtime_ns, inode FROM files WHERE root_id = ? AND dir = ?",
+            (self.root_id, dirpath),
+        )
+        return [IndexedFile(*row) for row in rows], subdirs
+
+    def visit(self, dirpath: str) -> None:
+        """Note that a directory still exists.
+
+        Args:
+            dirpath: Directory reached by the scan
+        """
+        self._visited.add(dirpath)
+
+    def record(self, record: DirRecord) -> None:
+        """Store a freshly listed directory, replacing its previous listing.
+
+        Args:
+            record: Directory listing from the scanner
+        """
+        conn = self.index._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO dirs (root_id, path, mtime_ns, subdirs) VALUES (?, ?, ?, ?)",
+            (self.root_id, record.path, record.mtime_ns,
+             "\n".join(os.path.basename(subdir) for subdir in record.subdirs)),
+        )
+        conn.execute("DELETE FROM files WHERE root_id = ? AND dir = ?", (self.root_id, record.path))
+        conn.executemany(
+            "INSERT INTO files (root_id, dir, name, ext, size, mtime_ns, inode) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(self.root_id, f.dir, f.name, f.ext, f.size, f.mtime_ns, f.inode) for f in record.files],
+        )
+        self._pending += 1
+        if self._pending >= COMMIT_INTERVAL:
+            conn.commit()
+            self._pending = 0
+
+    def finish(self, complete: bool) -> None:
+        """Commit the scan, dropping directories that no longer exist.
+
+        Args:
+            complete: Whether the whole tree was visited; deleted directories
+                are only purged after a complete scan
+        """
+        conn = self.index._connection()
+        if complete:
+            removed = [path for path in self._known if path not in self._visited]
+            conn.executemany(
+                "DELETE FROM files WHERE root_id = ? AND dir = ?",
+                [(self.root_id, path) for path in removed],
+            )
+            conn.executemany(
+                "DELETE FROM dirs WHERE root_id = ? AND path = ?",
+                [(self.root_id, path) for path in removed],
+            )
+            conn.execute("UPDATE roots SET scanned_at = ? WHERE id = ?", (time.time(), self.root_id))
+        conn.commit()
@@ -0,0 +1,334 @@
+"""
+Run metrics for File Falcon Pro.
+This module collects where a preview or execute spends its time: per-phase
+timers, file and byte counters, and per-file latency histograms bucketed by
+file size. Each thread records into its own totals without taking a lock,
+so recording is cheap enough to always be on; the totals are added up when
+they are polled during a run or written to a JSON metrics file at the end.
+
+Phases that run in worker threads (match, copy, metadata, ...) add up the
+time of every thread and may exceed the run's wall time; scan is wall time.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("metrics")
+
+# Upper bounds of the file size buckets, in bytes; larger files go in the last bucket
+SIZE_BUCKETS = (64 * 1024, 1024 * 1024, 16 * 1024 * 1024, 256 * 1024 * 1024)
+SIZE_BUCKET_LABELS = ("<64KiB", "64KiB-1MiB", "1MiB-16MiB", "16MiB-256MiB", ">=256MiB")
+
+# Latency bin n holds latencies below 2**n microseconds, so 40 bins reach ~12 days
+LATENCY_BINS = 40
+
+
+def size_bucket(size: int) -> int:
+    """Get the index of the size bucket a file belongs to.
+
+    Args:
+        size: File size in bytes
+
+    Returns:
+        Index into SIZE_BUCKET_LABELS
+    """
+    return bisect_right(SIZE_BUCKETS, size)
+
+
+class LatencyHistogram:
+    """Histogram of per-file latencies in power-of-two microsecond bins."""
+
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self):
+        self.counts = [0] * LATENCY_BINS
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Record one latency.
+
+        Args:
+            seconds: Latency in seconds
+        """
+        self.counts[min(int(seconds * 1_000_000).bit_length(), LATENCY_BINS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add the latencies recorded by another histogram.
+
+        Args:
+            other: Histogram to add
+        """
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, fraction: float) -> float:
+        """Estimate a percentile as the upper bound of the bin it falls in.
+
+        Args:
+            fraction: Percentile as a fraction, e.g. 0.99
+
+        Returns:
+            Latency in seconds, 0.0 if nothing was recorded
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bin_index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return (1 << bin_index) / 1_000_000
+        return (1 << (LATENCY_BINS - 1)) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the histogram for the metrics file."""
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p90_ms": self.percentile(0.9) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            # [upper bound in microseconds, count] for every non-empty bin
+            "bins_us": [[1 << bin_index, count] for bin_index, count in enumerate(self.counts) if count],
+        }
+
+
+class _ThreadTotals:
+    """Totals recorded by one thread, so recording needs no lock."""
+
+    __slots__ = ("files", "bytes", "errors", "phases", "latencies")
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.errors = 0
+        # Seconds and number of timed sections per phase
+        self.phases: Dict[str, List[float]] = {}
+        self.latencies = [LatencyHistogram() for _ in SIZE_BUCKET_LABELS]
+
+    def add_time(self, phase: str, seconds: float, count: int) -> None:
+        totals = self.phases.get(phase)
+        if totals is None:
+            self.phases[phase] = [seconds, count]
+        else:
+            totals[0] += seconds
+            totals[1] += count
+
+
+class OperationStats:
+    """Timers, counters and latency histograms of one run; safe to update from any thread.
+
+    Each thread records into its own totals, which are only added up when
+    the stats are read. Reading while a run is in progress may see a file
+    that is counted but whose latency is not recorded yet.
+    """
+
+    def __init__(self, operation: str = ""):
+        """Start collecting.
+
+        Args:
+            operation: 'Preview', 'Copy' or 'Move'; set by the run if empty
+        """
+        self.operation = operation
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self._end: Optional[float] = None
+        self._local = threading.local()
+        self._threads: List[_ThreadTotals] = []
+        self._threads_lock = threading.Lock()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the run started, or its duration once finished."""
+        end = self._end if self._end is not None else time.perf_counter()
+        return end - self._start
+
+    def finish(self) -> None:
+        """Stop the run clock."""
+        if self._end is None:
+            self._end = time.perf_counter()
+
+    def add_time(self, phase: str, seconds: float, count: int = 1) -> None:
+        """Add time spent in a phase.
+
+        Args:
+            phase: Phase name, e.g. 'scan'
+            seconds: Time spent
+            count: Number of timed sections (files, batches, ...) it covers
+        """
+        self._totals().add_time(phase, seconds, count)
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """Time a block of code as a phase; meant for coarse sections, not per file.
+
+        Args:
+            phase: Phase name
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - start)
+
+    def add_files(self, files: int, size: int) -> None:
+        """Count files handled without a latency, e.g. matched by a preview.
+
+        Args:
+            files: Number of files
+            size: Their combined size in bytes
+        """
+        totals = self._totals()
+        totals.files += files
+        totals.bytes += size
+
+    def record_file(self, size: int, seconds: float, phases: Iterable[Tuple[str, float]] = ()) -> None:
+        """Count a transferred file and record its latency.
+
+        Args:
+            size: File size in bytes
+            seconds: Time the transfer took
+            phases: (phase, seconds) pairs the transfer time breaks down into
+        """
+        totals = self._totals()
+        totals.files += 1
+        totals.bytes += size
+        totals.latencies[bisect_right(SIZE_BUCKETS, size)].add(seconds)
+        for phase, phase_seconds in phases:
+            totals.add_time(phase, phase_seconds, 1)
+
+    def record_error(self) -> None:
+        """Count a file that failed."""
+        self._totals().errors += 1
+
+    @property
+    def files(self) -> int:
+        """Files counted so far."""
+        return sum(totals.files for totals in self._all_totals())
+
+    @property
+    def bytes(self) -> int:
+        """Bytes counted so far."""
+        return sum(totals.bytes for totals in self._all_totals())
+
+    @property
+    def errors(self) -> int:
+        """Failed files counted so far."""
+        return sum(totals.errors for totals in self._all_totals())
+
+    def phases(self) -> Dict[str, Tuple[float, int]]:
+        """Get the time spent per phase.
+
+        Returns:
+            Dictionary of phase to (seconds, timed sections), in first-seen order
+        """
+        phases: Dict[str, List[float]] = {}
+        for totals in self._all_totals():
+            for phase, (seconds, count) in list(totals.phases.items()):
+                merged = phases.setdefault(phase, [0.0, 0])
+                merged[0] += seconds
+                merged[1] += count
+        return {phase: (seconds, int(count)) for phase, (seconds, count) in phases.items()}
+
+    def latencies(self) -> List[LatencyHistogram]:
+        """Get the latency histogram of each size bucket.
+
+        Returns:
+            Histograms in SIZE_BUCKET_LABELS order
+        """
+        merged = [LatencyHistogram() for _ in SIZE_BUCKET_LABELS]
+        for totals in self._all_totals():
+            for histogram, thread_histogram in zip(merged, totals.latencies):
+                histogram.merge(thread_histogram)
+        return merged
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get all metrics as a JSON-serializable dictionary.
+
+        Returns:
+            Dictionary written to the metrics file
+        """
+        elapsed = self.elapsed
+        files, size = self.files, self.bytes
+        return {
+            "operation": self.operation,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started)),
+            "elapsed": elapsed,
+            "files": files,
+            "bytes": size,
+            "errors": self.errors,
+            "files_per_second": files / elapsed if elapsed > 0 else 0.0,
+            "megabytes_per_second": size / 1_000_000 / elapsed if elapsed > 0 else 0.0,
+            "phases": {
+                phase: {"seconds": seconds, "count": count} for phase, (seconds, count) in self.phases().items()
+            },
+            "latency_by_size": {
+                label: histogram.to_dict()
+                for label, histogram in zip(SIZE_BUCKET_LABELS, self.latencies())
+                if histogram.count
+            },
+        }
+
+    def summary(self) -> str:
+        """Get a one-line summary for a status bar.
+
+        Returns:
+            Throughput, the busiest phase and the overall latency percentiles
+        """
+        elapsed = self.elapsed
+        files, size = self.files, self.bytes
+        text = f"{files} files, {files / elapsed if elapsed > 0 else 0.0:.0f} files/s, " \
+            f"{size / 1_000_000 / elapsed if elapsed > 0 else 0.0:.1f} MB/s"
+        phases = self.phases()
+        if phases:
+            phase, (seconds, _) = max(phases.items(), key=lambda item: item[1][0])
+            text += f" | most time: {phase} {seconds:.1f}s"
+        overall = LatencyHistogram()
+        for histogram in self.latencies():
+            overall.merge(histogram)
+        if overall.count:
+            text += f" | latency p50 {overall.percentile(0.5) * 1000:.2f} ms, " \
+                f"p99 {overall.percentile(0.99) * 1000:.2f} ms"
+        return text
+
+    def write(self, path: str) -> None:
+        """Write the metrics to a JSON file, replacing it atomically.
+
+        Args:
+            path: Metrics file path
+        """
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, indent=2)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.error(f"Error writing metrics to {path}: {str(e)}")
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+    def _totals(self) -> _ThreadTotals:
+        """Get the calling thread's totals."""
+        try:
+            return self._local.totals
+        except AttributeError:
+            totals = self._local.totals = _ThreadTotals()
+            with self._threads_lock:
+                self._threads.append(totals)
+            return totals
+
+    def _all_totals(self) -> List[_ThreadTotals]:
+        """Get the totals of every thread that recorded something."""
+        with self._threads_lock:
+            return list(self._threads)
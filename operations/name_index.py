@@ -0,0 +1,108 @@
+"""
+Destination name index for File Falcon Pro.
+This module lists each destination directory once and hands out free file
+names from memory, so resolving a name conflict does not cost a stat call per
+candidate suffix.
+"""
+import os
+import sys
+import threading
+from typing import Dict, Set, Tuple
+
+# Filesystems on these platforms are case-insensitive by default
+_CASE_INSENSITIVE = sys.platform in ("win32", "darwin")
+
+
+def _key(name: str) -> str:
+    """Normalize a filename for comparisons on this platform."""
+    return name.lower() if _CASE_INSENSITIVE else name
+
+
+class DestinationNameIndex:
+    """In-memory index of taken names per destination directory."""
+
+    def __init__(self):
+        """Initialize an empty index; directories are listed on first use."""
+        self._names: Dict[str, Set[str]] = {}
+        # Next numeric suffix to try for each (directory, base, ext)
+        self._counters: Dict[Tuple[str, str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, dest_path: str) -> str:
+        """
+        Claim a free destination path, appending _1, _2, ... on conflict.
+
+        The suffix chosen is the same one the sequential
+        ``while os.path.exists(...)`` loop would pick, but each (base, ext)
+        remembers where its search stopped, so every call is amortized O(1).
+
+        Args:
+            dest_path: Preferred destination path
+
+        Returns:
+            dest_path itself if free, otherwise the first free numbered variant
+        """
+        dest_dir, file = os.path.split(dest_path)
+        with self._lock:
+            names = self._directory(dest_dir)
+            if _key(file) not in names:
+                names.add(_key(file))
+                return dest_path
+
+            base, ext = os.path.splitext(file)
+            counter_key = (dest_dir, base, ext)
+            counter = self._counters.get(counter_key, 1)
+            while _key(f"{base}_{counter}{ext}") in names:
+                counter += 1
+            new_name = f"{base}_{counter}{ext}"
+            names.add(_key(new_name))
+            self._counters[counter_key] = counter + 1
+            return os.path.join(dest_dir, new_name)
+
+    def claim(self, dest_path: str) -> None:
+        """
+        Mark a specific path as taken, e.g. one reserved by an earlier run.
+
+        Args:
+            dest_path: Destination path to hold
+        """
+        dest_dir, file = os.path.split(dest_path)
+        with self._lock:
+            self._directory(dest_dir).add(_key(file))
+
+    def add_empty_directory(self, dest_dir: str) -> None:
+        """
+        Record a directory that was just created, so it is never listed.
+
+        Args:
+            dest_dir: Newly created, empty destination directory
+        """
+        with self._lock:
+            self._names.setdefault(dest_dir, set())
+
+    def release(self, dest_path: str) -> None:
+        """
+        Give back a reserved path whose transfer failed.
+
+        Args:
+            dest_path: Path previously returned by reserve()
+        """
+        if os.path.exists(dest_path):
+            return
+        dest_dir, file = os.path.split(dest_path)
+        with self._lock:
+            self._directory(dest_dir).discard(_key(file))
+
+    def _directory(self, dest_dir: str) -> Set[str]:
+        """Get the taken names of a directory, listing it on first use."""
+        names = self._names.get(dest_dir)
+        if names is None:
+            names = set()
+            try:
+                with os.scandir(dest_dir) as it:
+                    for entry in it:
+                        names.add(_key(entry.name))
+            except FileNotFoundError:
+                pass
+            self._names[dest_dir] = names
+        return names
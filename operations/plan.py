@@ -0,0 +1,382 @@
+"""
+Operation plans for File Falcon Pro.
+A plan records the source -> destination pairs found by a preview so that
+executing it does not have to walk the source tree a second time.
+
+Plans of millions of files are kept compact: directories and categories are
+stored once, and each file only costs a few typed array slots plus its
+encoded name, which can be spilled to a temporary file. PlanEntry objects are
+built on access.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from operations.file_operations import FileOperationConfig
+
+# Size/mtime recorded for sources that could not be stat'ed when planned
+MISSING = -1
+
+# Bytes of file names a plan keeps in memory before spilling them to disk
+DEFAULT_SPILL_THRESHOLD = 64 * 1024 * 1024
+
+# Spilled names are written to disk in chunks of this many bytes
+_SPILL_CHUNK = 1024 * 1024
+
+# Entries read together when iterating a plan
+PAGE_SIZE = 4096
+
+# Config fields that only tune performance; they change neither which files
+# are planned nor where they go
+TUNING_FIELDS = frozenset({
+    "scan_workers",
+    "ordered_scan",
+    "copy_workers",
+    "source_device_workers",
+    "dest_device_workers",
+    "hash_workers",
+    "sniff_workers",
+    "index_path",
+    "journal_path",
+    "metrics_path",
+})
+
+# Names are stored the way os.fsencode would encode them
+_FS_ENCODING = sys.getfilesystemencoding()
+_FS_ERRORS = sys.getfilesystemencodeerrors()
+
+
+def _split(path: str) -> Tuple[str, str]:
+    """Split a path into its directory, including the trailing separator, and name.
+
+    Unlike os.path.split, concatenating the parts gives back the exact path.
+    """
+    cut = path.rfind(os.sep)
+    if os.altsep:
+        cut = max(cut, path.rfind(os.altsep))
+    return path[:cut + 1], path[cut + 1:]
+
+
+@dataclass(slots=True)
+class PlanEntry:
+    """A single planned transfer and the source snapshot it was based on."""
+
+    source: str
+    destination: str
+    category: str
+    size: int
+    mtime_ns: int
+
+    def is_stale(self) -> bool:
+        """Check whether the source changed since it was planned.
+
+        Returns:
+            True if the source is missing or its size/mtime differ
+        """
+        try:
+            st = os.stat(self.source)
+        except OSError:
+            return self.size != MISSING
+        return st.st_size != self.size or st.st_mtime_ns != self.mtime_ns
+
+
+class PlanStore:
+    """
+    Append-only, compact list of plan entries.
+
+    Each entry costs 36 bytes in typed arrays plus the encoded bytes of its
+    name. Source directories, destination directories (with their trailing
+    separator) and categories are interned, so they are stored once however
+    many files share them. Once the names exceed spill_threshold bytes, they
+    move to a temporary file in chunks of about a megabyte and only the
+    fixed part per entry stays in memory.
+
+    One thread may append while others read, e.g. a view showing a preview
+    that is still scanning; readers see the entries appended so far.
+    """
+
+    def __init__(self, spill_threshold: Optional[int] = DEFAULT_SPILL_THRESHOLD):
+        """Initialize an empty store.
+
+        Args:
+            spill_threshold: Bytes of names kept in memory before spilling
+                them to a temporary file, or None to never spill
+        """
+        self.spill_threshold = spill_threshold
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._source_dirs = array("I")
+        self._dest_dirs = array("I")
+        self._categories = array("I")
+        self._sizes = array("q")
+        self._mtimes = array("q")
+        # End offset of each name in the name bytes
+        self._name_ends = array("Q")
+        self._names = bytearray()
+        # Destination names that differ from the source name, by index
+        self._dest_names: Dict[int, str] = {}
+        # Name bytes before this offset are in the spill file
+        self._spilled = 0
+        self._spill_file: Optional[IO[bytes]] = None
+        # Guards the spill file and the swap of the in-memory name bytes
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        # Name offsets are appended last, so every counted entry is complete
+        return len(self._name_ends)
+
+    def __iter__(self) -> Iterator[PlanEntry]:
+        for start in range(0, len(self), PAGE_SIZE):
+            yield from self.page(start, PAGE_SIZE)
+
+    def __getitem__(self, index: int) -> PlanEntry:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("plan index out of range")
+        return self.page(index, 1)[0]
+
+    def append(self, entry: PlanEntry) -> None:
+        """Add an entry at the end of the store.
+
+        Args:
+            entry: Entry to store
+        """
+        index = len(self)
+        source_dir, name = _split(entry.source)
+        dest_dir, dest_name = _split(entry.destination)
+        self._source_dirs.append(self._intern(source_dir))
+        self._dest_dirs.append(self._intern(dest_dir))
+        self._categories.append(self._intern(entry.category))
+        self._sizes.append(entry.size)
+        self._mtimes.append(entry.mtime_ns)
+        if dest_name != name:
+            self._dest_names[index] = dest_name
+        self._names += name.encode(_FS_ENCODING, _FS_ERRORS)
+        self._name_ends.append(self._spilled + len(self._names))
+        if self.spill_threshold is not None and len(self._names) >= _SPILL_CHUNK \
+                and self._spilled + len(self._names) > self.spill_threshold:
+            self._spill()
+
+    def page(self, start: int, count: int) -> List[PlanEntry]:
+        """Get a run of consecutive entries.
+
+        Args:
+            start: Index of the first entry
+            count: Maximum number of entries
+
+        Returns:
+            Up to count entries starting at start
+        """
+        strings = self._strings
+        dest_names = self._dest_names
+        entries = []
+        for index, name in enumerate(self._page_names(start, count), start):
+            entries.append(PlanEntry(
+                strings[self._source_dirs[index]] + name,
+                strings[self._dest_dirs[index]] + (dest_names.get(index, name) if dest_names else name),
+                strings[self._categories[index]],
+                self._sizes[index],
+                self._mtimes[index],
+            ))
+        return entries
+
+    def sort_key(self, field_name: str) -> Callable[[int], Any]:
+        """Get a function mapping an entry index to its sort key for one field.
+
+        Name-based keys decode every name once up front, which is much faster
+        than building the entries.
+
+        Args:
+            field_name: 'name', 'extension', 'size', 'source' (folder, then
+                name) or 'destination' (folder, then name)
+
+        Returns:
+            Key function for the entries stored so far
+        """
+        if field_name == "size":
+            return self._sizes.__getitem__
+        names = [
+            name for start in range(0, len(self), PAGE_SIZE) for name in self._page_names(start, PAGE_SIZE)
+        ]
+        strings = self._strings
+        if field_name == "name":
+            return lambda index: names[index].lower()
+        if field_name == "extension":
+            return lambda index: (os.path.splitext(names[index])[1].lower(), names[index].lower())
+        if field_name == "source":
+            dirs = self._source_dirs
+        elif field_name == "destination":
+            dirs = self._dest_dirs
+        else:
+            raise ValueError(f"Unknown sort field: {field_name}")
+        return lambda index: (strings[dirs[index]], names[index].lower())
+
+    def destination_dirs(self) -> List[str]:
+        """Get the distinct destination directories of the stored entries.
+
+        Directories are interned, so this reads one id per entry and builds
+        one string per directory.
+
+        Returns:
+            Destination directories, sorted so parents come before their children
+        """
+        # Stored with their trailing separator, which dirname of a child drops
+        dirs = {os.path.dirname(self._strings[string_id] + "_") for string_id in set(self._dest_dirs)}
+        return sorted(directory for directory in dirs if directory)
+
+    @property
+    def total_bytes(self) -> int:
+        """Combined size of all stored sources that could be stat'ed."""
+        return sum(size for size in self._sizes if size != MISSING)
+
+    @property
+    def spilled(self) -> bool:
+        """Whether names have been moved to a temporary file."""
+        return self._spill_file is not None
+
+    def close(self) -> None:
+        """Delete the spill file; the store must not be read afterwards."""
+        if self._spill_file is not None:
+            self._spill_file.close()
+
+    def _intern(self, value: str) -> int:
+        """Get the id of a directory or category string, storing it once."""
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self._strings)
+            self._strings.append(value)
+        return string_id
+
+    def _page_names(self, start: int, count: int) -> List[str]:
+        """Decode the source names of a run of consecutive entries."""
+        stop = min(start + count, len(self))
+        if start >= stop:
+            return []
+        first = self._name_ends[start - 1] if start else 0
+        data = self._read_names(first, self._name_ends[stop - 1])
+        names = []
+        offset = 0
+        for index in range(start, stop):
+            end = self._name_ends[index] - first
+            names.append(data[offset:end].decode(_FS_ENCODING, _FS_ERRORS))
+            offset = end
+        return names
+
+    def _spill(self) -> None:
+        """Move the in-memory name bytes to the end of the spill file."""
+        with self._lock:
+            if self._spill_file is None:
+                self._spill_file = tempfile.TemporaryFile(prefix="filefalcon-plan-")
+            self._spill_file.seek(0, os.SEEK_END)
+            self._spill_file.write(self._names)
+            self._spilled += len(self._names)
+            self._names = bytearray()
+
+    def _read_names(self, start: int, end: int) -> bytes:
+        """Read the name bytes between two offsets, from disk or memory."""
+        with self._lock:
+            if start >= self._spilled:
+                return bytes(self._names[start - self._spilled:end - self._spilled])
+            self._spill_file.seek(start)
+            spilled = self._spill_file.read(min(end, self._spilled) - start)
+            if end <= self._spilled:
+                return spilled
+            return spilled + bytes(self._names[:end - self._spilled])
+
+
+@dataclass
+class OperationPlan:
+    """The result of a preview, reusable by execute."""
+
+    config: "FileOperationConfig"
+    entries: PlanStore = field(default_factory=PlanStore)
+    created_at: float = field(default_factory=time.time)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[PlanEntry]:
+        return iter(self.entries)
+
+    def __getitem__(self, index: int) -> PlanEntry:
+        return self.entries[index]
+
+    def page(self, start: int, count: int) -> List[PlanEntry]:
+        """Get a run of consecutive entries, e.g. a screenful for a results view.
+
+        Args:
+            start: Index of the first entry
+            count: Maximum number of entries
+
+        Returns:
+            Up to count entries starting at start
+        """
+        return self.entries.page(start, count)
+
+    @property
+    def total_bytes(self) -> int:
+        """Combined size of all planned sources."""
+        return self.entries.total_bytes
+
+    def relative_source(self, entry: PlanEntry) -> str:
+        """Get an entry's source path relative to the scanned folder.
+
+        Args:
+            entry: Entry belonging to this plan
+
+        Returns:
+            Relative source path
+        """
+        return os.path.relpath(entry.source, self.config.folder_path)
+
+    def by_category(self) -> Dict[str, List[str]]:
+        """Group relative source paths by destination category.
+
+        This builds a string per file; prefer iterating or paging the plan
+        for large results.
+
+        Returns:
+            Dictionary of category to relative source paths
+        """
+        grouped: Dict[str, List[str]] = {}
+        for entry in self.entries:
+            grouped.setdefault(entry.category, []).append(self.relative_source(entry))
+        return grouped
+
+    def matches(self, config: "FileOperationConfig") -> bool:
+        """Check whether this plan was built from an equivalent config.
+
+        Args:
+            config: Config about to be executed
+
+        Returns:
+            True if the plan can be executed for this config
+        """
+        # Moving instead of copying, or tuning the run, does not change what is planned
+        ignored = TUNING_FIELDS | {"operation_type"}
+        return self.config.model_dump(exclude=ignored) == config.model_dump(exclude=ignored)
+
+    def stale_entries(self) -> List[PlanEntry]:
+        """Re-stat the planned sources without walking the tree.
+
+        Files added to the source folder after the preview are not detected.
+
+        Returns:
+            Entries whose source changed or disappeared
+        """
+        return [entry for entry in self.entries if entry.is_stale()]
+
+    def is_stale(self) -> bool:
+        """Check whether any planned source changed since the preview.
+
+        Returns:
+            True if the plan should be rebuilt
+        """
+        return any(entry.is_stale() for entry in self.entries)
@@ -0,0 +1,307 @@
+"""
+Directory scanning for File Falcon Pro.
+This module walks source trees with os.scandir, fanning subdirectories out
+across a bounded thread pool and streaming matching files back to the caller.
+"""
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Set, Tuple
+
+from operations.metadata_index import DirRecord, IndexedFile, IndexScan, MetadataIndex
+from operations.plan import MISSING
+
+logger = logging.getLogger("scanner")
+
+DEFAULT_SCAN_WORKERS = 8
+
+# Batch filename predicate: receives a directory's filenames, returns one flag per name
+BatchMatch = Callable[[List[str]], List[bool]]
+
+# Per-file predicate applied to files whose name matched, e.g. a size filter
+FileFilter = Callable[["ScanEntry"], bool]
+
+
+@dataclass
+class ScanEntry:
+    """A file discovered while scanning a source tree."""
+
+    dirpath: str
+    name: str
+    entry: Optional[os.DirEntry] = field(default=None, repr=False, compare=False)
+    # Size and mtime when already known, e.g. from the metadata index
+    size: Optional[int] = None
+    mtime_ns: Optional[int] = None
+    ino: Optional[int] = None
+    # Device when already known, e.g. from the stat of the file's directory
+    dev: Optional[int] = None
+
+    @property
+    def path(self) -> str:
+        """Full path of the file."""
+        return os.path.join(self.dirpath, self.name)
+
+    def stat(self) -> os.stat_result:
+        """Return stat information, reusing the DirEntry cache when available.
+
+        Returns:
+            The stat result for the file (symlinks are followed)
+        """
+        if self.entry is not None:
+            return self.entry.stat()
+        return os.stat(self.path)
+
+    def snapshot(self) -> Tuple[int, int]:
+        """Return size and mtime, stat'ing only if they are not known yet.
+
+        Returns:
+            Tuple of (size, mtime_ns)
+        """
+        if self.size is None or self.mtime_ns is None:
+            st = self.stat()
+            self.size, self.mtime_ns = st.st_size, st.st_mtime_ns
+        return self.size, self.mtime_ns
+
+    def ctime_ns(self) -> int:
+        """Return the status change time (creation time on Windows).
+
+        The metadata index does not record it, so files served from the
+        index are stat'ed.
+
+        Returns:
+            st_ctime_ns of the file
+        """
+        return self.stat().st_ctime_ns
+
+    def device(self) -> int:
+        """Return the device the file is on.
+
+        Files served from the index take it from their directory's stat; a
+        scanned file was usually stat'ed already, in which case the DirEntry
+        cache answers.
+
+        Returns:
+            st_dev of the file
+        """
+        if self.dev is None:
+            self.dev = self.stat().st_dev
+        return self.dev
+
+    def inode(self) -> int:
+        """Return the inode number, from the DirEntry or index when available.
+
+        Returns:
+            The file's inode number
+        """
+        if self.ino is None:
+            self.ino = self.entry.inode() if self.entry is not None else self.stat().st_ino
+        return self.ino
+
+
+# Result of listing one directory: matching files, subdirectories, and the
+# listing to store in the metadata index (None if nothing changed)
+DirResult = Tuple[List[ScanEntry], List[str], Optional[DirRecord]]
+
+
+def _scan_dir(
+    dirpath: str,
+    match: Optional[BatchMatch],
+    ordered: bool,
+    index_scan: Optional[IndexScan] = None,
+    accept: Optional[FileFilter] = None,
+) -> DirResult:
+    """
+    List a single directory.
+
+    Args:
+        dirpath: Directory to list
+        match: Optional batch predicate called with all filenames in the
+            directory and returning one flag per name
+        ordered: Sort files and subdirectories by name
+        index_scan: Optional metadata index to reuse unchanged listings from
+        accept: Optional predicate for files whose name matched
+
+    Returns:
+        Tuple of (matching files, subdirectories to descend into, index record)
+    """
+    if index_scan is not None:
+        files, subdirs, record = _scan_dir_indexed(dirpath, match, index_scan)
+        if accept is not None:
+            files = [f for f in files if accept(f)]
+        if ordered:
+            files.sort(key=lambda f: f.name)
+            subdirs.sort()
+        return files, subdirs, record
+
+    candidates = []
+    subdirs = []
+    try:
+        with os.scandir(dirpath) as it:
+            for entry in it:
+                try:
+                    # Mirror os.walk: symlinked directories are listed but not followed
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                        continue
+                except OSError:
+                    pass
+                candidates.append(entry)
+    except OSError as e:
+        logger.warning(f"Skipping unreadable directory {dirpath}: {str(e)}")
+
+    if match is not None and candidates:
+        flags = match([entry.name for entry in candidates])
+        candidates = [entry for entry, flag in zip(candidates, flags) if flag]
+    files = [ScanEntry(dirpath, entry.name, entry) for entry in candidates]
+    if accept is not None:
+        files = [f for f in files if accept(f)]
+
+    if ordered:
+        files.sort(key=lambda f: f.name)
+        subdirs.sort()
+    return files, subdirs, None
+
+
+def _scan_dir_indexed(dirpath: str, match: Optional[BatchMatch], index_scan: IndexScan) -> DirResult:
+    """
+    List a directory through the metadata index.
+
+    The directory is only read if its mtime differs from the indexed one;
+    otherwise its files and subdirectories come from the index. Files in
+    directories that are read are stat'ed so the index has their metadata.
+    """
+    try:
+        dir_stat = os.stat(dirpath)
+    except OSError as e:
+        logger.warning(f"Skipping unreadable directory {dirpath}: {str(e)}")
+        return [], [], None
+    mtime_ns = dir_stat.st_mtime_ns
+    index_scan.visit(dirpath)
+
+    record = None
+    cached = index_scan.cached_listing(dirpath, mtime_ns)
+    if cached is not None:
+        indexed, subdirs = cached
+    else:
+        indexed, subdirs = [], []
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            if not entry.is_symlink():
+                                subdirs.append(entry.path)
+                            continue
+                    except OSError:
+                        pass
+                    try:
+                        st = entry.stat()
+                        size, file_mtime_ns, inode = st.st_size, st.st_mtime_ns, entry.inode()
+                    except OSError:
+                        size, file_mtime_ns, inode = MISSING, MISSING, MISSING
+                    ext = os.path.splitext(entry.name)[1].lower()
+                    indexed.append(IndexedFile(dirpath, entry.name, ext, size, file_mtime_ns, inode))
+        except OSError as e:
+            logger.warning(f"Skipping unreadable directory {dirpath}: {str(e)}")
+            return [], [], None
+        record = DirRecord(dirpath, mtime_ns, subdirs, indexed)
+
+    if match is not None and indexed:
+        flags = match([f.name for f in indexed])
+        indexed = [f for f, flag in zip(indexed, flags) if flag]
+    # A file is on its directory's device, so none of them is stat'ed for it
+    files = [
+        ScanEntry(dirpath, f.name, size=f.size, mtime_ns=f.mtime_ns, ino=f.inode, dev=dir_stat.st_dev)
+        for f in indexed
+    ]
+    return files, list(subdirs), record
+
+
+def scan_files(
+    root: str,
+    match: Optional[BatchMatch] = None,
+    workers: int = DEFAULT_SCAN_WORKERS,
+    ordered: bool = False,
+    index: Optional[MetadataIndex] = None,
+    accept: Optional[FileFilter] = None,
+) -> Iterator[ScanEntry]:
+    """
+    Recursively yield files under a folder, listing directories in parallel.
+
+    Files are yielded as soon as their directory has been listed. With
+    ``ordered`` the output is deterministic (names sorted, directories visited
+    depth-first like ``os.walk``) while subdirectories are still prefetched
+    by the pool.
+
+    Args:
+        root: Folder to scan
+        match: Optional batch filename predicate applied inside the workers,
+            e.g. FileMatcher.match_many
+        workers: Maximum number of directories listed concurrently
+        ordered: Yield files in a deterministic order
+        index: Optional metadata index; directories whose mtime is unchanged
+            since the last scan are served from it instead of being listed
+        accept: Optional predicate applied in the workers to files whose
+            name matched, e.g. a size or date filter using their cached stat
+
+    Yields:
+        ScanEntry for every matching file
+    """
+    index_scan = None
+    if index is not None:
+        root = os.path.abspath(root)
+        index_scan = index.begin_scan(root)
+    executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="scan")
+    complete = False
+    try:
+        if ordered:
+            yield from _scan_ordered(executor, root, match, index_scan, accept)
+        else:
+            yield from _scan_unordered(executor, root, match, index_scan, accept)
+        complete = True
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if index_scan is not None:
+            index_scan.finish(complete)
+
+
+def _scan_unordered(
+    executor: ThreadPoolExecutor,
+    root: str,
+    match: Optional[BatchMatch],
+    index_scan: Optional[IndexScan],
+    accept: Optional[FileFilter],
+) -> Iterator[ScanEntry]:
+    """Yield files in completion order."""
+    pending: Set[Future] = {executor.submit(_scan_dir, root, match, False, index_scan, accept)}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            files, subdirs, record = future.result()
+            if record is not None:
+                index_scan.record(record)
+            for subdir in subdirs:
+                pending.add(executor.submit(_scan_dir, subdir, match, False, index_scan, accept))
+            yield from files
+
+
+def _scan_ordered(
+    executor: ThreadPoolExecutor,
+    root: str,
+    match: Optional[BatchMatch],
+    index_scan: Optional[IndexScan],
+    accept: Optional[FileFilter],
+) -> Iterator[ScanEntry]:
+    """Yield files in sorted, depth-first order."""
+    stack: List[Future] = [executor.submit(_scan_dir, root, match, True, index_scan, accept)]
+    while stack:
+        files, subdirs, record = stack.pop().result()
+        if record is not None:
+            index_scan.record(record)
+        # Submit in order so the pool works ahead, push in reverse so the
+        # first subdirectory is visited next
+        futures = [executor.submit(_scan_dir, subdir, match, True, index_scan, accept) for subdir in subdirs]
+        stack.extend(reversed(futures))
+        yield from files
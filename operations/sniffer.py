@@ -0,0 +1,367 @@
+"""
+Content sniffing for File Falcon Pro.
+This module recognizes file types from their leading bytes, so files without
+an extension, or with a misleading one, can be routed by what they contain.
+
+Only the first SNIFF_BYTES of a file are read. Files are sniffed in batches
+on a bounded thread pool, and results are cached by (size, mtime, device,
+inode) so unchanged files are not read again by later scans in the same session.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from operations.metrics import OperationStats
+from operations.plan import MISSING
+from operations.scanner import ScanEntry
+
+logger = logging.getLogger("sniffer")
+
+DEFAULT_SNIFF_WORKERS = 4
+
+# Bytes read from the start of each file; one page covers every signature below
+SNIFF_BYTES = 4096
+
+# Files sniffed per pool task
+SNIFF_BATCH = 64
+
+# Sniff results remembered across scans, oldest dropped first
+CACHE_SIZE = 262_144
+
+# (offset, magic bytes, extension) for formats recognized by a fixed signature
+_SIGNATURES: List[Tuple[int, bytes, str]] = [
+    (0, b"\xff\xd8\xff", ".jpg"),
+    (0, b"\x89PNG\r\n\x1a\n", ".png"),
+    (0, b"GIF87a", ".gif"),
+    (0, b"GIF89a", ".gif"),
+    (0, b"FUJIFILMCCD-RAW", ".raf"),
+    (0, b"IIRO", ".orf"),
+    (0, b"IIRS", ".orf"),
+    (0, b"8BPS", ".psd"),
+    (0, b"%PDF-", ".pdf"),
+    (0, b"\xc5\xd0\xd3\xc6", ".eps"),
+    (0, b"{\\rtf", ".rtf"),
+    (0, b"SQLite format 3\x00", ".sqlite"),
+    (0, b"FLV\x01", ".flv"),
+    (0, b"\x30\x26\xb2\x75\x8e\x66\xcf\x11\xa6\xd9\x00\xaa\x00\x62\xce\x6c", ".wmv"),
+    (0, b".RMF", ".rm"),
+    (0, b"OggS", ".ogg"),
+    (0, b"\x00\x00\x01\xba", ".mpg"),
+    (0, b"\x00\x00\x01\xb3", ".mpg"),
+]
+
+# ISO base media brands (bytes 8-12 after 'ftyp') that are not plain MP4
+_FTYP_BRANDS: Dict[bytes, str] = {
+    b"heic": ".heic",
+    b"heix": ".heic",
+    b"hevc": ".heic",
+    b"hevx": ".heic",
+    b"heim": ".heic",
+    b"heis": ".heic",
+    b"mif1": ".heif",
+    b"msf1": ".heif",
+    b"qt  ": ".mov",
+    b"M4V ": ".m4v",
+    b"M4VH": ".m4v",
+    b"M4VP": ".m4v",
+}
+
+# Brands of ISO base media files that hold no video or image
+_FTYP_IGNORED = {b"M4A ", b"M4B ", b"M4P ", b"crx ", b"avif", b"avis"}
+
+# OpenDocument mimetypes, stored uncompressed at the start of the archive
+_OPENDOCUMENT: Dict[bytes, str] = {
+    b"application/vnd.oasis.opendocument.text": ".odt",
+    b"application/vnd.oasis.opendocument.spreadsheet": ".ods",
+    b"application/vnd.oasis.opendocument.presentation": ".odp",
+}
+
+# Office Open XML part folders, found in the archive's leading file headers
+_OFFICE_OPEN_XML: List[Tuple[bytes, str]] = [(b"word/", ".docx"), (b"xl/", ".xlsx"), (b"ppt/", ".pptx")]
+
+# Other extensions of the formats sniff() recognizes, e.g. Illustrator files
+# are PDFs and most camera raw formats are TIFFs
+ALIASES: Dict[str, FrozenSet[str]] = {
+    ".jpg": frozenset({".jpeg", ".jpe", ".jfif"}),
+    ".tiff": frozenset({".tif", ".dng", ".nrw", ".arw", ".pef", ".srw", ".k25"}),
+    ".heic": frozenset({".heif"}),
+    ".heif": frozenset({".heic"}),
+    ".pdf": frozenset({".ai"}),
+    ".eps": frozenset({".ai", ".ps"}),
+    ".sqlite": frozenset({".db", ".sqlite3"}),
+    ".mp4": frozenset({".m4v", ".m4p"}),
+    ".m4v": frozenset({".mp4"}),
+    ".mov": frozenset({".qt"}),
+    ".mpg": frozenset({".mpeg", ".mpe", ".mpv", ".m2v", ".vob"}),
+    ".m2ts": frozenset({".mts"}),
+    ".wmv": frozenset({".asf"}),
+    ".rm": frozenset({".rmvb"}),
+    ".ogg": frozenset({".ogv"}),
+    ".html": frozenset({".htm"}),
+    ".json": frozenset({".jsonl"}),
+}
+
+
+def same_format(name: str, ext: str) -> bool:
+    """
+    Check whether a filename's extension names the type recognized from its content.
+
+    Args:
+        name: Filename
+        ext: Extension returned by sniff(), e.g. '.jpg'
+
+    Returns:
+        True if the name ends in ext or one of its ALIASES, e.g. 'photo.jpeg'
+    """
+    name_ext = os.path.splitext(name)[1].lower()
+    return name_ext == ext or name_ext in ALIASES.get(ext, ())
+
+
+def sniff(head: bytes) -> Optional[str]:
+    """
+    Recognize a file type from the leading bytes of a file.
+
+    Args:
+        head: Up to SNIFF_BYTES bytes from the start of the file
+
+    Returns:
+        Lowercase extension of the recognized type, e.g. '.mp4', or None
+    """
+    for offset, magic, ext in _SIGNATURES:
+        if head.startswith(magic, offset):
+            return ext
+
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        if brand in _FTYP_IGNORED:
+            return None
+        if brand.startswith(b"3g"):
+            return ".3gp"
+        return _FTYP_BRANDS.get(brand, ".mp4")
+    if head.startswith(b"RIFF"):
+        return {b"WEBP": ".webp", b"AVI ": ".avi"}.get(head[8:12])
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return ".webm" if b"webm" in head[:64] else ".mkv"
+    if head.startswith((b"II*\x00", b"MM\x00*")):
+        # Canon raw files are TIFF with a 'CR' marker
+        return ".cr2" if head[8:10] == b"CR" else ".tiff"
+    if head.startswith(b"BM") and head[6:10] == b"\x00\x00\x00\x00":
+        return ".bmp"
+    if head.startswith(b"PK\x03\x04"):
+        return _sniff_zip(head)
+    if len(head) > 376 and head[0] == head[188] == head[376] == 0x47:
+        return ".ts"
+    if len(head) > 388 and head[4] == head[196] == head[388] == 0x47:
+        return ".m2ts"
+    if head.startswith(b"%!PS-Adobe") and b"EPSF" in head[:32]:
+        return ".eps"
+    return _sniff_text(head)
+
+
+def _sniff_zip(head: bytes) -> Optional[str]:
+    """Tell OpenDocument and Office Open XML files from other ZIP archives."""
+    if head[30:38] == b"mimetype":
+        for mimetype, ext in _OPENDOCUMENT.items():
+            if head.startswith(mimetype, 38):
+                return ext
+        return None
+    for folder, ext in _OFFICE_OPEN_XML:
+        if folder in head:
+            return ext
+    return None
+
+
+def _sniff_text(head: bytes) -> Optional[str]:
+    """Recognize SVG, HTML and XML documents by their first tag, and JSON by its first token."""
+    text = head[:512].lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if text.startswith(b"<svg") or (text.startswith(b"<?xml") and b"<svg" in text):
+        return ".svg"
+    if text.startswith((b"<!doctype html", b"<html")):
+        return ".html"
+    if text.startswith(b"<?xml"):
+        return ".xml"
+    # An object opening with a key, or an array of objects or strings; other
+    # text starting with '[' is more likely an INI or TOML file
+    first = text[:1]
+    following = text[1:].lstrip(b" \t\r\n")[:1]
+    if (first == b"{" and following in (b'"', b"}")) or (first == b"[" and following in (b'"', b"{", b"]")):
+        return ".json"
+    return None
+
+
+def sniff_file(path: str) -> Optional[str]:
+    """
+    Recognize the type of a file, reading at most SNIFF_BYTES of it.
+
+    Args:
+        path: File to sniff
+
+    Returns:
+        Lowercase extension of the recognized type, or None if it is not
+        recognized or cannot be read
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    except OSError as e:
+        logger.warning(f"Cannot sniff {path}: {str(e)}")
+        return None
+    try:
+        return sniff(os.read(fd, SNIFF_BYTES))
+    except OSError as e:
+        logger.warning(f"Cannot sniff {path}: {str(e)}")
+        return None
+    finally:
+        os.close(fd)
+
+
+# Cache key: (size, mtime_ns, device, inode); inode numbers repeat across devices
+CacheKey = Tuple[int, int, int, int]
+
+
+class SniffCache:
+    """Bounded, thread-safe cache of sniff results."""
+
+    def __init__(self, max_size: int = CACHE_SIZE):
+        """Initialize an empty cache.
+
+        Args:
+            max_size: Results kept before the oldest are dropped
+        """
+        self.max_size = max_size
+        self._results: Dict[CacheKey, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(self, key: CacheKey) -> Tuple[bool, Optional[str]]:
+        """Look up a result.
+
+        Args:
+            key: (size, mtime_ns, device, inode) of the file
+
+        Returns:
+            Tuple of (whether the key was cached, cached extension)
+        """
+        with self._lock:
+            if key in self._results:
+                return True, self._results[key]
+        return False, None
+
+    def put(self, key: CacheKey, ext: Optional[str]) -> None:
+        """Store a result, dropping the oldest one when full.
+
+        Args:
+            key: (size, mtime_ns, device, inode) of the file
+            ext: Recognized extension, or None
+        """
+        with self._lock:
+            if key not in self._results and len(self._results) >= self.max_size:
+                del self._results[next(iter(self._results))]
+            self._results[key] = ext
+
+
+# Results shared by every sniffer that is not given its own cache
+_shared_cache = SniffCache()
+
+
+class ContentSniffer:
+    """Sniffs streams of scanned files on a bounded thread pool."""
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_SNIFF_WORKERS,
+        cache: Optional[SniffCache] = None,
+        metrics: Optional[OperationStats] = None,
+    ):
+        """Initialize the sniffer.
+
+        Args:
+            workers: Maximum number of batches read at once
+            cache: Result cache; defaults to one shared by the whole process
+            metrics: Optional stats receiving the sniff time
+        """
+        self.workers = max(1, workers)
+        self.cache = cache if cache is not None else _shared_cache
+        self.metrics = metrics
+
+    def classify(
+        self,
+        files: Iterable[ScanEntry],
+        should_sniff: Optional[Callable[[ScanEntry], bool]] = None,
+    ) -> Iterator[Tuple[ScanEntry, Optional[str]]]:
+        """
+        Sniff files, keeping their order.
+
+        At most two batches per worker are in flight, so a long scan is
+        sniffed as it streams in without queueing every file.
+
+        Args:
+            files: Files to sniff, e.g. from scan_files
+            should_sniff: Optional predicate selecting the files to read;
+                the others are passed through with None
+
+        Yields:
+            (file, recognized extension or None) in the order of files
+        """
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sniff")
+        pending: Deque[Future] = deque()
+        batch: List[ScanEntry] = []
+        try:
+            for scan_entry in files:
+                batch.append(scan_entry)
+                if len(batch) < SNIFF_BATCH:
+                    continue
+                pending.append(executor.submit(self._sniff_batch, batch, should_sniff))
+                batch = []
+                if len(pending) >= 2 * self.workers:
+                    yield from pending.popleft().result()
+            if batch:
+                pending.append(executor.submit(self._sniff_batch, batch, should_sniff))
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _sniff_batch(
+        self, batch: List[ScanEntry], should_sniff: Optional[Callable[[ScanEntry], bool]]
+    ) -> List[Tuple[ScanEntry, Optional[str]]]:
+        """Sniff a batch of files, serving unchanged ones from the cache (runs in a worker)."""
+        start = time.perf_counter()
+        results = []
+        sniffed = 0
+        for scan_entry in batch:
+            if should_sniff is not None and not should_sniff(scan_entry):
+                results.append((scan_entry, None))
+                continue
+            sniffed += 1
+            key = _cache_key(scan_entry)
+            if key is not None:
+                cached, ext = self.cache.get(key)
+                if cached:
+                    results.append((scan_entry, ext))
+                    continue
+            ext = sniff_file(scan_entry.path)
+            if key is not None:
+                self.cache.put(key, ext)
+            results.append((scan_entry, ext))
+        if self.metrics is not None:
+            self.metrics.add_time("sniff", time.perf_counter() - start, sniffed)
+        return results
+
+
+def _cache_key(scan_entry: ScanEntry) -> Optional[CacheKey]:
+    """Get the (size, mtime_ns, device, inode) of a scanned file, or None if unknown."""
+    try:
+        size, mtime_ns = scan_entry.snapshot()
+        device = scan_entry.device()
+        inode = scan_entry.inode()
+    except OSError:
+        return None
+    if MISSING in (size, mtime_ns, inode):
+        return None
+    return size, mtime_ns, device, inode
@@ -0,0 +1,54 @@
+"""Shared fixtures for the File Falcon Pro tests."""
+import os
+from typing import Callable, List
+
+import pytest
+
+from operations.events import OperationEvent
+from operations.file_operations import FileOperationConfig
+
+
+def write_file(path: str, data: bytes = b"") -> str:
+    """Create a file, and any missing parent folders, holding data."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+@pytest.fixture
+def source(tmp_path) -> str:
+    """Empty source folder."""
+    path = tmp_path / "source"
+    path.mkdir()
+    return str(path)
+
+
+@pytest.fixture
+def dest(tmp_path) -> str:
+    """Empty destination folder."""
+    path = tmp_path / "dest"
+    path.mkdir()
+    return str(path)
+
+
+@pytest.fixture
+def make_config(source, dest) -> Callable[..., FileOperationConfig]:
+    """Build configs that sort videos from the source into the destination folder."""
+    def make(**overrides) -> FileOperationConfig:
+        values = dict(
+            folder_path=source,
+            dest_folder_path=dest,
+            mode="Basic",
+            selected_category="Video All",
+            selected_types=[".mp4", ".mov"],
+        )
+        values.update(overrides)
+        return FileOperationConfig(**values)
+    return make
+
+
+@pytest.fixture
+def events() -> List[OperationEvent]:
+    """List collecting the events of an operation run with on_event=events.append."""
+    return []
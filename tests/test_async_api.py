@@ -0,0 +1,185 @@
+"""Tests for the asyncio API."""
+import asyncio
+import os
+import threading
+import time
+from contextlib import aclosing
+
+import pytest
+
+from operations import copy_engine
+from operations.async_api import AsyncOperations, _Result
+from operations.events import FileMatched, FileTransferred, OperationFinished
+from tests.conftest import write_file
+
+
+def _ticker(state):
+    """Job that emits until cancelled, then takes a while to finish its current file."""
+    def task(cancel, emit):
+        while not cancel.is_set():
+            emit("tick")
+            time.sleep(0.005)
+        time.sleep(0.05)
+        state["stopped"] = True
+        return "stopped"
+    return task
+
+
+def test_plan_returns_plan_and_reports_events(make_config, source):
+    write_file(os.path.join(source, "a.mp4"), b"a")
+    write_file(os.path.join(source, "b.txt"), b"b")
+    events = []
+
+    async def run():
+        async with AsyncOperations() as runner:
+            return await runner.plan(make_config(), events.append)
+
+    plan = asyncio.run(run())
+
+    assert [os.path.basename(entry.source) for entry in plan] == ["a.mp4"]
+    assert [type(event) for event in events if isinstance(event, FileMatched)] == [FileMatched]
+    assert isinstance(events[-1], OperationFinished)
+
+
+def test_slow_consumer_pauses_job():
+    emitted = []
+
+    def task(cancel, emit):
+        for i in range(20):
+            emit(i)
+            emitted.append(i)
+        return "done"
+
+    async def run():
+        received, ahead = [], []
+        async with AsyncOperations(max_pending_events=3) as runner:
+            async with aclosing(runner._stream(task)) as stream:
+                async for item in stream:
+                    received.append(item)
+                    await asyncio.sleep(0.01)
+                    ahead.append(len(emitted) - len(received))
+        return received, ahead
+
+    received, ahead = asyncio.run(run())
+
+    assert received[:-1] == list(range(20))
+    assert isinstance(received[-1], _Result) and received[-1].value == "done"
+    # The job ran ahead of the consumer, but never by more than the buffer
+    assert max(ahead) == 3
+
+
+def test_cancelled_consumer_waits_for_job_when_closed():
+    state = {"stopped": False}
+
+    async def run():
+        async with AsyncOperations() as runner:
+            async def consume():
+                async with aclosing(runner._stream(_ticker(state))) as stream:
+                    async for _ in stream:
+                        # Cancelled here, inside the loop body
+                        await asyncio.sleep(1)
+
+            consumer = asyncio.create_task(consume())
+            await asyncio.sleep(0.05)
+            consumer.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await consumer
+            return state["stopped"]
+
+    assert asyncio.run(run())
+
+
+def test_abandoned_stream_still_stops_job():
+    state = {"stopped": False}
+    streams = []
+
+    async def run():
+        runner = AsyncOperations()
+
+        async def consume():
+            stream = runner._stream(_ticker(state))
+            # Kept alive so it is not closed when the task ends
+            streams.append(stream)
+            async for _ in stream:
+                await asyncio.sleep(1)
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        consumer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+        # The job was told to stop, and closing the runner waits for it
+        await runner.close()
+        return state["stopped"]
+
+    assert asyncio.run(run())
+    streams.clear()
+
+
+def test_cancelled_execute_stops_touching_files(monkeypatch, make_config, source, dest):
+    for i in range(40):
+        write_file(os.path.join(source, f"{i:02}.mp4"), b"x")
+    real_copy_data = copy_engine.copy_data
+
+    def slow_copy_data(src_path, dest_path):
+        time.sleep(0.01)
+        return real_copy_data(src_path, dest_path)
+
+    monkeypatch.setattr(copy_engine, "copy_data", slow_copy_data)
+    folder = os.path.join(dest, "Video All")
+
+    async def run():
+        async with AsyncOperations() as runner:
+            async def consume():
+                async with aclosing(runner.execute(make_config(copy_workers=1))) as events:
+                    async for event in events:
+                        if isinstance(event, FileTransferred):
+                            await asyncio.sleep(1)
+
+            consumer = asyncio.create_task(consume())
+            while not os.path.isdir(folder) or not os.listdir(folder):
+                await asyncio.sleep(0.005)
+            consumer.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await consumer
+            copied = sorted(os.listdir(folder))
+            await asyncio.sleep(0.1)
+            return copied
+
+    copied = asyncio.run(run())
+
+    assert 0 < len(copied) < 40
+    assert sorted(os.listdir(folder)) == copied
+
+
+def test_concurrent_jobs_are_independent(make_config, tmp_path):
+    configs = []
+    for name in ("first", "second"):
+        write_file(str(tmp_path / name / "source" / f"{name}.mp4"), name.encode())
+        (tmp_path / name / "dest").mkdir()
+        configs.append(make_config(
+            folder_path=str(tmp_path / name / "source"), dest_folder_path=str(tmp_path / name / "dest")
+        ))
+    threads = set()
+
+    async def collect(runner, config):
+        events = []
+        async for event in runner.execute(config):
+            threads.add(threading.current_thread())
+            events.append(event)
+        return events
+
+    async def run():
+        async with AsyncOperations(max_jobs=2) as runner:
+            return await asyncio.gather(*(collect(runner, config) for config in configs))
+
+    results = asyncio.run(run())
+
+    for name, config, events in zip(("first", "second"), configs, results):
+        [transferred] = [event for event in events if isinstance(event, FileTransferred)]
+        assert transferred.source == os.path.join(config.folder_path, f"{name}.mp4")
+        assert isinstance(events[-1], OperationFinished) and events[-1].files == 1
+        with open(os.path.join(config.dest_folder_path, "Video All", f"{name}.mp4"), "rb") as f:
+            assert f.read() == name.encode()
+    # Events are delivered on the event loop, not on the job threads
+    assert threads == {threading.main_thread()}
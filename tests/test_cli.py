@@ -0,0 +1,130 @@
+"""Tests for the command line interface."""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from cli import main, parse_size
+from tests.conftest import write_file
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def keep_sigint_handler():
+    """main() installs its own Ctrl+C handler; put the test runner's back."""
+    handler = signal.getsignal(signal.SIGINT)
+    yield
+    signal.signal(signal.SIGINT, handler)
+
+
+def _run(capsys, *argv):
+    """Run the CLI, returning its exit code and the JSON records it printed."""
+    code = main(list(argv))
+    return code, [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+@pytest.mark.parametrize("value, size", [
+    ("123", 123),
+    ("4K", 4096),
+    ("500M", 500 * 1024 ** 2),
+    ("500MB", 500 * 1024 ** 2),
+    ("1.5GiB", int(1.5 * 1024 ** 3)),
+    ("2t", 2 * 1024 ** 4),
+])
+def test_parse_size_uses_binary_units(value, size):
+    assert parse_size(value) == size
+
+
+def test_parse_size_rejects_garbage():
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_size("lots")
+
+
+def test_preview_streams_json_lines(capsys, source, dest):
+    write_file(os.path.join(source, "a.mp4"), b"abc")
+    write_file(os.path.join(source, "notes.txt"), b"text")
+
+    code, records = _run(capsys, "preview", source, dest, "--category", "Video All")
+
+    assert code == 0
+    assert [record["event"] for record in records] == ["ScanStarted", "FileMatched", "OperationFinished"]
+    assert records[1]["relative_source"] == "a.mp4"
+    assert records[1]["destination"] == os.path.join(dest, "Video All", "a.mp4")
+    assert records[-1]["files"] == 1 and records[-1]["bytes"] == 3
+    assert all(record["t"] >= 0 for record in records)
+    assert os.listdir(dest) == []
+
+
+def test_execute_transfers_files(capsys, source, dest):
+    write_file(os.path.join(source, "a.mp4"), b"abc")
+
+    code, records = _run(capsys, "execute", source, dest, "--category", "Video All", "--operation", "Move")
+
+    assert code == 0
+    assert [record["event"] for record in records] == ["ExecuteStarted", "FileTransferred", "OperationFinished"]
+    assert records[1]["operation_type"] == "Move"
+    assert os.path.exists(os.path.join(dest, "Video All", "a.mp4"))
+    assert not os.path.exists(os.path.join(source, "a.mp4"))
+
+
+def test_quiet_omits_per_file_events(capsys, source, dest):
+    write_file(os.path.join(source, "a.mp4"), b"abc")
+
+    code, records = _run(capsys, "execute", source, dest, "--category", "Video All", "--quiet")
+
+    assert code == 0
+    assert [record["event"] for record in records] == ["ExecuteStarted", "OperationFinished"]
+
+
+def test_execute_without_matches_fails(capsys, source, dest):
+    code, records = _run(capsys, "execute", source, dest, "--category", "Video All")
+
+    assert code == 1
+    assert records[-1]["event"] == "OperationFinished"
+    assert records[-1]["files"] == 0
+
+
+def test_invalid_config_reported_as_json(capsys, source, dest):
+    code, records = _run(capsys, "preview", source + "-missing", dest, "--category", "Video All")
+
+    assert code == 2
+    [record] = records
+    assert record["event"] == "OperationError"
+    assert record["message"].startswith("Configuration error")
+
+
+@pytest.mark.parametrize("argv", [
+    ["preview", "src", "dst"],
+    ["preview", "src", "dst", "--category", "No Such Category"],
+    ["copy", "src", "dst", "--category", "Video All"],
+], ids=["no-category", "unknown-category", "unknown-command"])
+def test_bad_arguments_exit_2(capsys, argv):
+    with pytest.raises(SystemExit) as raised:
+        main(argv)
+
+    assert raised.value.code == 2
+    assert capsys.readouterr().out == ""
+
+
+def test_pyqt_never_imported(source, dest):
+    write_file(os.path.join(source, "a.mp4"), b"abc")
+    # A fresh interpreter, since the GUI tests import PyQt6 into this one
+    script = (
+        "import sys\n"
+        "import cli\n"
+        "code = cli.main(sys.argv[1:])\n"
+        "sys.exit(3 if 'PyQt6' in sys.modules else code)\n"
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", script, "execute", source, dest, "--category", "Video All"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert [json.loads(line)["event"] for line in result.stdout.splitlines()][-1] == "OperationFinished"
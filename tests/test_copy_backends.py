@@ -0,0 +1,115 @@
+"""Tests for the copy backends and their fallback chain."""
+import errno
+import fcntl
+import os
+import sys
+
+import pytest
+
+from operations import copy_backends
+from operations.copy_backends import copy_data
+from tests.conftest import write_file
+
+pytestmark = pytest.mark.skipif(sys.platform != "linux", reason="the fallback chain is Linux only")
+
+DATA = bytes(range(256)) * 41 + b"tail"
+
+BACKENDS = ["reflink", "copy_file_range", "sendfile"]
+
+_real_copy_file_range = os.copy_file_range
+_real_sendfile = os.sendfile
+
+
+def _unsupported(*args):
+    raise OSError(errno.EOPNOTSUPP, "not supported")
+
+
+def _fake_reflink(outfd, request, infd):
+    """Clone by copying, so the reflink path can be exercised on any filesystem."""
+    assert request == copy_backends.FICLONE
+    os.lseek(infd, 0, os.SEEK_SET)
+    while chunk := os.read(infd, 1024):
+        os.write(outfd, chunk)
+
+
+def _disable_before(monkeypatch, strategy):
+    """Make every backend tried before strategy report itself unsupported."""
+    _disable(monkeypatch, BACKENDS[:BACKENDS.index(strategy)] if strategy in BACKENDS else BACKENDS)
+
+
+def _disable(monkeypatch, backends):
+    if "reflink" in backends:
+        monkeypatch.setattr(fcntl, "ioctl", _unsupported)
+    else:
+        monkeypatch.setattr(fcntl, "ioctl", _fake_reflink)
+    if "copy_file_range" in backends:
+        monkeypatch.setattr(os, "copy_file_range", _unsupported)
+    if "sendfile" in backends:
+        monkeypatch.setattr(os, "sendfile", _unsupported)
+
+
+@pytest.mark.parametrize("strategy", BACKENDS + ["buffered"])
+def test_falls_back_to_next_backend(monkeypatch, tmp_path, strategy):
+    src = write_file(str(tmp_path / "src.bin"), DATA)
+    dst = str(tmp_path / "dst.bin")
+    # Small chunks so the in-kernel loops take several rounds
+    monkeypatch.setattr(copy_backends, "COPY_CHUNK_SIZE", 1000)
+    _disable_before(monkeypatch, strategy)
+
+    assert copy_data(src, dst) == strategy
+    with open(dst, "rb") as f:
+        assert f.read() == DATA
+
+
+@pytest.mark.parametrize("strategy", ["copy_file_range", "sendfile", "buffered"])
+def test_empty_file(monkeypatch, tmp_path, strategy):
+    src = write_file(str(tmp_path / "src.bin"))
+    dst = str(tmp_path / "dst.bin")
+    _disable_before(monkeypatch, strategy)
+
+    assert copy_data(src, dst) == strategy
+    assert os.path.getsize(dst) == 0
+
+
+@pytest.mark.parametrize("backend", ["copy_file_range", "sendfile"])
+def test_error_after_partial_write_propagates(monkeypatch, tmp_path, backend):
+    src = write_file(str(tmp_path / "src.bin"), DATA)
+    dst = str(tmp_path / "dst.bin")
+    monkeypatch.setattr(copy_backends, "COPY_CHUNK_SIZE", 1000)
+    _disable_before(monkeypatch, backend)
+    real = _real_copy_file_range if backend == "copy_file_range" else _real_sendfile
+    calls = []
+
+    def fail_second_call(*args):
+        calls.append(args)
+        if len(calls) > 1:
+            # An "unsupported" errno must not restart the copy with the next backend
+            raise OSError(errno.EXDEV, "cross-device")
+        return real(*args)
+
+    monkeypatch.setattr(os, backend, fail_second_call)
+    monkeypatch.setattr(copy_backends.shutil, "copyfileobj", _unsupported)
+
+    with pytest.raises(OSError) as raised:
+        copy_data(src, dst)
+    assert raised.value.errno == errno.EXDEV
+    assert os.path.getsize(dst) == 1000
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_real_error_before_write_propagates(monkeypatch, tmp_path, backend):
+    src = write_file(str(tmp_path / "src.bin"), DATA)
+    dst = str(tmp_path / "dst.bin")
+    _disable_before(monkeypatch, backend)
+
+    def io_error(*args):
+        raise OSError(errno.EIO, "I/O error")
+
+    if backend == "reflink":
+        monkeypatch.setattr(fcntl, "ioctl", io_error)
+    else:
+        monkeypatch.setattr(os, backend, io_error)
+
+    with pytest.raises(OSError) as raised:
+        copy_data(src, dst)
+    assert raised.value.errno == errno.EIO
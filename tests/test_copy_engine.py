@@ -0,0 +1,261 @@
+"""Tests for the concurrent copy engine."""
+import errno
+import os
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from operations import copy_engine
+from operations.copy_engine import CopyEngine, _interleave_by_size
+from operations.events import FileFailed, FileTransferred, OperationFinished
+from operations.file_operations import execute_changes
+from operations.plan import PlanEntry
+from tests.conftest import write_file
+
+
+def _entries(source, dest, names, size=1):
+    entries = []
+    for name in names:
+        path = write_file(os.path.join(source, name), b"x" * size)
+        st = os.stat(path)
+        entries.append(PlanEntry(path, os.path.join(dest, os.path.basename(name)), "Video All",
+                                 st.st_size, st.st_mtime_ns))
+    return entries
+
+
+class _Tracker:
+    """Stand-in for _process_file that records how many transfers overlap."""
+
+    def __init__(self, key=lambda src_path: None):
+        self.key = key
+        self.running = Counter()
+        self.peak = Counter()
+        self.lock = threading.Lock()
+
+    def __call__(self, src_path, dest_path, operation_type):
+        keys = {"all", self.key(src_path)} - {None}
+        with self.lock:
+            for key in keys:
+                self.running[key] += 1
+                self.peak[key] = max(self.peak[key], self.running[key])
+        time.sleep(0.02)
+        with self.lock:
+            for key in keys:
+                self.running[key] -= 1
+        return "tracked", ()
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_workers_limit_concurrent_transfers(monkeypatch, source, dest, workers):
+    tracker = _Tracker()
+    monkeypatch.setattr(copy_engine, "_process_file", tracker)
+    engine = CopyEngine("Copy", workers=workers, source_device_workers=8, dest_device_workers=8)
+
+    stats = engine.run(_entries(source, dest, [f"{i}.mp4" for i in range(12)]), lambda event: None, source)
+
+    assert stats.files == 12
+    assert tracker.peak["all"] == workers
+
+
+@pytest.mark.parametrize("role", ["source", "dest"])
+def test_device_workers_limit_concurrent_transfers(monkeypatch, source, dest, role):
+    tracker = _Tracker()
+    monkeypatch.setattr(copy_engine, "_process_file", tracker)
+    limits = {"source_device_workers": 8, "dest_device_workers": 8}
+    limits[f"{role}_device_workers"] = 2
+    engine = CopyEngine("Copy", workers=8, **limits)
+
+    engine.run(_entries(source, dest, [f"{i}.mp4" for i in range(12)]), lambda event: None, source)
+
+    assert tracker.peak["all"] == 2
+
+
+def test_device_limits_are_per_device(monkeypatch, source, dest):
+    first = os.path.join(source, "first")
+    tracker = _Tracker(key=lambda src_path: os.path.dirname(src_path))
+    monkeypatch.setattr(copy_engine, "_process_file", tracker)
+    engine = CopyEngine("Copy", workers=8, source_device_workers=1, dest_device_workers=8)
+    # Pretend the two source folders are separate disks
+    monkeypatch.setattr(engine, "_device", lambda directory: 1 if directory == first else 2)
+    names = [f"{folder}/{folder}{i}.mp4" for folder in ("first", "second") for i in range(6)]
+
+    stats = engine.run(_entries(source, dest, names), lambda event: None, source)
+
+    assert stats.files == 12
+    assert tracker.peak[first] == tracker.peak[os.path.join(source, "second")] == 1
+    # Each device has its own limit, so both were busy at once
+    assert tracker.peak["all"] == 2
+
+
+def test_interleave_alternates_largest_and_smallest():
+    jobs = [(PlanEntry(f"/s/{size}", f"/d/{size}", "Video All", size, 0), f"/d/{size}")
+            for size in [5, 1, 4, 2, 3]]
+
+    ordered = [entry.size for entry, _ in _interleave_by_size(jobs)]
+
+    assert ordered == [5, 1, 4, 2, 3]
+    assert _interleave_by_size([]) == []
+
+
+def test_interleave_keeps_even_length_complete():
+    jobs = [(PlanEntry(f"/s/{size}", f"/d/{size}", "Video All", size, 0), f"/d/{size}")
+            for size in [10, 40, 20, 30]]
+
+    assert [entry.size for entry, _ in _interleave_by_size(jobs)] == [40, 10, 30, 20]
+
+
+def test_batches_dispatched_large_small_interleaved(monkeypatch, source, dest):
+    order = []
+    monkeypatch.setattr(copy_engine, "_process_file",
+                        lambda src_path, dest_path, operation_type: order.append(os.path.basename(src_path)) or ("tracked", ()))
+    engine = CopyEngine("Copy", workers=1)
+    entries = _entries(source, dest, ["small.mp4"], 1) + _entries(source, dest, ["big.mp4"], 100) \
+        + _entries(source, dest, ["mid.mp4"], 10)
+
+    engine.run(entries, lambda event: None, source)
+
+    assert order == ["big.mp4", "small.mp4", "mid.mp4"]
+
+
+def test_conflict_suffixes_follow_plan_order(source, dest):
+    entries = [
+        PlanEntry(*entry)
+        for entry in [
+            (write_file(os.path.join(source, "a", "clip.mp4"), b"a" * 50), os.path.join(dest, "clip.mp4"), "Video All", 50, 0),
+            (write_file(os.path.join(source, "b", "clip.mp4"), b"b"), os.path.join(dest, "clip.mp4"), "Video All", 1, 0),
+        ]
+    ]
+
+    CopyEngine("Copy", workers=4).run(entries, lambda event: None, source)
+
+    # The second entry gets the suffix even though its smaller copy may finish first
+    with open(os.path.join(dest, "clip.mp4"), "rb") as f:
+        assert f.read() == b"a" * 50
+    with open(os.path.join(dest, "clip_1.mp4"), "rb") as f:
+        assert f.read() == b"b"
+
+
+def _finished(events):
+    [finished] = [event for event in events if isinstance(event, OperationFinished)]
+    return finished
+
+
+def test_same_device_move_renames(make_config, source, dest, events):
+    write_file(os.path.join(source, "a.mp4"), b"a")
+    write_file(os.path.join(source, "b.mp4"), b"b")
+
+    assert execute_changes(make_config(operation_type="Move"), on_event=events.append)
+
+    finished = _finished(events)
+    assert (finished.renamed, finished.moved_by_copy) == (2, 0)
+    assert {event.strategy for event in events if isinstance(event, FileTransferred)} == {"rename"}
+    assert sorted(os.listdir(os.path.join(dest, "Video All"))) == ["a.mp4", "b.mp4"]
+    assert os.listdir(source) == []
+
+
+def test_cross_device_move_copies(monkeypatch, make_config, source, dest, events):
+    write_file(os.path.join(source, "a.mp4"), b"a" * 1000)
+    # The destination folder looks like another disk
+    monkeypatch.setattr(CopyEngine, "_device", lambda self, directory: 2 if directory.startswith(dest) else 1)
+
+    assert execute_changes(make_config(operation_type="Move"), on_event=events.append)
+
+    finished = _finished(events)
+    assert (finished.renamed, finished.moved_by_copy) == (0, 1)
+    with open(os.path.join(dest, "Video All", "a.mp4"), "rb") as f:
+        assert f.read() == b"a" * 1000
+    assert os.listdir(source) == []
+
+
+def test_rename_across_mount_points_falls_back_to_copy(monkeypatch, make_config, source, dest, events):
+    write_file(os.path.join(source, "a.mp4"), b"a" * 1000)
+
+    def rename(src, dst):
+        # Same st_dev, but two mount points, as with a bind mount
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(copy_engine.os, "rename", rename)
+
+    assert execute_changes(make_config(operation_type="Move"), on_event=events.append)
+
+    finished = _finished(events)
+    assert (finished.renamed, finished.moved_by_copy) == (0, 1)
+    assert os.path.exists(os.path.join(dest, "Video All", "a.mp4"))
+    assert os.listdir(source) == []
+
+
+def test_failed_rename_reported(monkeypatch, make_config, source, dest, events):
+    write_file(os.path.join(source, "a.mp4"), b"a")
+
+    def rename(src, dst):
+        raise PermissionError(errno.EACCES, "Permission denied")
+
+    monkeypatch.setattr(copy_engine.os, "rename", rename)
+
+    assert not execute_changes(make_config(operation_type="Move"), on_event=events.append)
+
+    assert [type(event) for event in events if isinstance(event, FileFailed)] == [FileFailed]
+    finished = _finished(events)
+    assert (finished.errors, finished.renamed, finished.moved_by_copy) == (1, 0, 0)
+    assert os.path.exists(os.path.join(source, "a.mp4"))
+
+
+def test_source_changed_during_move_is_kept(monkeypatch, make_config, source, dest, events):
+    path = write_file(os.path.join(source, "a.mp4"), b"a" * 1000)
+    monkeypatch.setattr(CopyEngine, "_device", lambda self, directory: 2 if directory.startswith(dest) else 1)
+    real_copy_data = copy_engine.copy_data
+
+    def copy_data_while_written(src_path, dest_path):
+        strategy = real_copy_data(src_path, dest_path)
+        # Another program appends to the source while it is copied
+        with open(src_path, "ab") as f:
+            f.write(b"more")
+        return strategy
+
+    monkeypatch.setattr(copy_engine, "copy_data", copy_data_while_written)
+
+    assert not execute_changes(make_config(operation_type="Move"), on_event=events.append)
+
+    [failed] = [event for event in events if isinstance(event, FileFailed)]
+    assert "source changed" in failed.error
+    with open(path, "rb") as f:
+        assert f.read() == b"a" * 1000 + b"more"
+    assert os.listdir(os.path.join(dest, "Video All")) == []
+    finished = _finished(events)
+    assert (finished.errors, finished.renamed, finished.moved_by_copy) == (1, 0, 0)
+
+
+def test_short_copy_is_removed(source, dest):
+    src = write_file(os.path.join(source, "a.mp4"), b"a" * 1000)
+    dst = os.path.join(dest, "a.mp4")
+    before = os.stat(src)
+    write_file(dst, b"a" * 10)
+
+    with pytest.raises(OSError, match="copied 10 of 1000 bytes"):
+        copy_engine._verify_copy(src, dst, before)
+
+    assert not os.path.exists(dst)
+    assert os.path.exists(src)
+
+
+def test_verified_move_removes_source(source, dest):
+    src = write_file(os.path.join(source, "a.mp4"), b"a" * 1000)
+    dst = os.path.join(dest, "a.mp4")
+
+    strategy, phases = copy_engine._process_file(src, dst, "Move")
+
+    assert strategy in {"reflink", "copy_file_range", "sendfile", "buffered", "shutil"}
+    assert [phase for phase, _ in phases] == ["copy", "metadata", "verify"]
+    assert not os.path.exists(src)
+    assert os.stat(dst).st_size == 1000
+
+
+def test_copy_keeps_source(source, dest):
+    src = write_file(os.path.join(source, "a.mp4"), b"a")
+
+    _, phases = copy_engine._process_file(src, os.path.join(dest, "a.mp4"), "Copy")
+
+    assert [phase for phase, _ in phases] == ["copy", "metadata"]
+    assert os.path.exists(src)
@@ -0,0 +1,110 @@
+"""Tests for content-hash deduplication."""
+import os
+
+import pytest
+
+from operations.dedup import PARTIAL_BLOCK_SIZE, find_duplicates, link_duplicates
+from operations.events import DuplicateFound, FileFailed
+from operations.file_operations import execute_changes
+from operations.name_index import DestinationNameIndex
+from operations.plan import PlanEntry
+from tests.conftest import write_file
+
+# Below one block, between one and two blocks, and above two blocks
+SIZES = [1000, 100_000, 3 * PARTIAL_BLOCK_SIZE + 17]
+
+
+def _content(size: int, seed: int = 0) -> bytes:
+    return bytes((i * 31 + seed) % 251 for i in range(size))
+
+
+def _entry(path: str) -> PlanEntry:
+    st = os.stat(path)
+    return PlanEntry(path, path + ".dest", "Video All", st.st_size, st.st_mtime_ns)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("where", ["head", "middle", "tail"])
+def test_same_size_different_content_not_duplicates(tmp_path, size, where):
+    offset = {"head": 0, "middle": size // 2, "tail": size - 1}[where]
+    data = _content(size)
+    changed = bytearray(data)
+    changed[offset] ^= 0xFF
+    a = write_file(str(tmp_path / "a.mp4"), data)
+    b = write_file(str(tmp_path / "b.mp4"), bytes(changed))
+    c = write_file(str(tmp_path / "c.mp4"), data)
+
+    groups = find_duplicates([_entry(a), _entry(b), _entry(c)])
+
+    assert [(group.original.source, [d.source for d in group.duplicates]) for group in groups] == [(a, [c])]
+
+
+def test_different_sizes_not_compared(tmp_path):
+    a = write_file(str(tmp_path / "a.mp4"), b"x" * 10)
+    b = write_file(str(tmp_path / "b.mp4"), b"x" * 11)
+
+    assert find_duplicates([_entry(a), _entry(b)]) == []
+
+
+def test_unreadable_file_not_duplicate(tmp_path):
+    a = write_file(str(tmp_path / "a.mp4"), b"same")
+    b = write_file(str(tmp_path / "b.mp4"), b"same")
+    entries = [_entry(a), _entry(b)]
+    os.unlink(b)
+
+    assert find_duplicates(entries) == []
+
+
+def test_hardlink_move_keeps_unique_tails(make_config, source, dest, events):
+    # Same size and same first block, different tails
+    head = _content(PARTIAL_BLOCK_SIZE)
+    write_file(os.path.join(source, "a.mp4"), head + b"a" * (100_000 - PARTIAL_BLOCK_SIZE))
+    write_file(os.path.join(source, "b.mp4"), head + b"b" * (100_000 - PARTIAL_BLOCK_SIZE))
+    config = make_config(operation_type="Move", dedup_mode="Hardlink", ordered_scan=True)
+
+    assert execute_changes(config, on_event=events.append)
+
+    assert not any(isinstance(event, DuplicateFound) for event in events)
+    for name, tail in (("a.mp4", b"a"), ("b.mp4", b"b")):
+        with open(os.path.join(dest, "Video All", name), "rb") as f:
+            assert f.read().endswith(tail * 100)
+    assert os.listdir(source) == []
+
+
+def test_hardlink_links_identical_files(make_config, source, dest, events):
+    data = _content(200_000)
+    write_file(os.path.join(source, "a.mp4"), data)
+    write_file(os.path.join(source, "b.mp4"), data)
+    config = make_config(operation_type="Move", dedup_mode="Hardlink", ordered_scan=True)
+
+    assert execute_changes(config, on_event=events.append)
+
+    folder = os.path.join(dest, "Video All")
+    assert os.path.samefile(os.path.join(folder, "a.mp4"), os.path.join(folder, "b.mp4"))
+    assert [event.action for event in events if isinstance(event, DuplicateFound)] == ["hard-linked"]
+    assert os.listdir(source) == []
+
+
+def test_skip_transfers_only_originals(make_config, source, dest, events):
+    data = _content(5000)
+    write_file(os.path.join(source, "a.mp4"), data)
+    write_file(os.path.join(source, "b.mp4"), data)
+    write_file(os.path.join(source, "c.mp4"), data[:-1] + b"!")
+
+    assert execute_changes(make_config(dedup_mode="Skip", ordered_scan=True), on_event=events.append)
+
+    assert sorted(os.listdir(os.path.join(dest, "Video All"))) == ["a.mp4", "c.mp4"]
+    assert [(os.path.basename(event.source), event.action) for event in events
+            if isinstance(event, DuplicateFound)] == [("b.mp4", "skipped")]
+
+
+def test_duplicate_of_failed_original_reported(tmp_path, events):
+    original = _entry(write_file(str(tmp_path / "a.mp4"), b"same"))
+    duplicate = _entry(write_file(str(tmp_path / "b.mp4"), b"same"))
+
+    # The original has no destination, as if its transfer failed
+    linked, failed = link_duplicates([(duplicate, original)], {}, DestinationNameIndex(), "Move", events.append)
+
+    assert (linked, failed) == (0, 1)
+    assert [(type(event), event.source) for event in events] == [(FileFailed, duplicate.source)]
+    assert os.path.exists(duplicate.source)
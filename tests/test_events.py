@@ -0,0 +1,86 @@
+"""Tests for operation events and their reporters."""
+import io
+import json
+from dataclasses import dataclass
+
+from rich.console import Console
+
+from operations.events import (
+    ConsoleReporter,
+    FileFailed,
+    FileMatched,
+    JsonLinesReporter,
+    Notice,
+    OperationEvent,
+    OperationFinished,
+    broadcast,
+)
+
+
+def test_base_event_describes_itself_by_class_name():
+    @dataclass(frozen=True)
+    class Custom(OperationEvent):
+        value: int = 0
+
+    assert Custom().describe() == "Custom"
+
+
+def test_finished_levels_and_messages():
+    assert OperationFinished("Preview", 3).describe() == "Found 3 matching files."
+    assert OperationFinished("Preview", 0).level == "warning"
+    failed = OperationFinished("Copy", 2, errors=1)
+    assert failed.level == "error"
+    assert failed.describe().endswith("Encountered errors with 1 files.")
+    moved = OperationFinished("Move", 4, renamed=3, moved_by_copy=1)
+    assert "3 renamed in place, 1 copied across devices." in moved.describe()
+
+
+def test_console_reporter_indents_per_file_lines():
+    output = io.StringIO()
+    reporter = ConsoleReporter(Console(file=output, width=200, color_system=None))
+
+    reporter(Notice("Scanning [bold]now[/bold]"))
+    reporter(FileFailed("/src/a.mp4", "boom"))
+
+    assert output.getvalue().splitlines() == [
+        "Scanning [bold]now[/bold]",
+        "  Error processing a.mp4: boom",
+    ]
+
+
+def test_json_lines_reporter_writes_fields():
+    stream = io.StringIO()
+    reporter = JsonLinesReporter(stream, start=0.0)
+
+    reporter(FileMatched("/src/a.mp4", "/dest/a.mp4", "a.mp4"))
+    reporter(OperationFinished("Preview", 1, bytes=5))
+
+    matched, finished = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert matched["event"] == "FileMatched"
+    assert matched["source"] == "/src/a.mp4"
+    assert matched["level"] == "info"
+    assert finished["event"] == "OperationFinished"
+    assert finished["files"] == 1 and finished["bytes"] == 5
+    assert finished["level"] == "success"
+    assert finished["message"] == "Found 1 matching files."
+    assert finished["t"] > 0
+
+
+def test_json_lines_reporter_can_skip_per_file_events():
+    stream = io.StringIO()
+    reporter = JsonLinesReporter(stream, per_file=False)
+
+    reporter(FileFailed("/src/a.mp4", "boom"))
+    reporter(Notice("done"))
+
+    assert [json.loads(line)["event"] for line in stream.getvalue().splitlines()] == ["Notice"]
+
+
+def test_broadcast_forwards_in_order():
+    received = []
+    listener = broadcast([lambda event: received.append(("a", event)), lambda event: received.append(("b", event))])
+    event = Notice("hello")
+
+    listener(event)
+
+    assert received == [("a", event), ("b", event)]
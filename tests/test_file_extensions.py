@@ -0,0 +1,95 @@
+"""Tests for the extension index and category lookups."""
+import pytest
+
+from operations.file_extensions import (
+    CATEGORIES_MAP,
+    EXTENSION_INDEX,
+    MAX_SUFFIX_DOTS,
+    ROUTING_PRECEDENCE,
+    categories_for,
+    longest_suffix,
+    routing_table,
+)
+
+ARCHIVES = {".gz", ".tar.gz", ".tar", ".bz2"}
+
+
+@pytest.mark.parametrize("name, suffix", [
+    ("backup.tar.gz", ".tar.gz"),
+    ("backup.2024.tar.gz", ".tar.gz"),
+    ("notes.gz", ".gz"),
+    ("backup.tar", ".tar"),
+    ("archive.tar.bz2", ".bz2"),
+    ("archive.zip", None),
+    ("archive", None),
+])
+def test_longest_suffix_prefers_compound(name, suffix):
+    assert longest_suffix(name, ARCHIVES, 2) == suffix
+
+
+def test_longest_suffix_limited_by_max_dots():
+    assert longest_suffix("backup.tar.gz", ARCHIVES, 1) == ".gz"
+
+
+@pytest.mark.parametrize("name, suffix", [
+    (".gz", None),
+    ("..gz", None),
+    (".tar.gz", ".gz"),
+    (".backup.tar.gz", ".tar.gz"),
+])
+def test_leading_dots_belong_to_the_name(name, suffix):
+    assert longest_suffix(name, ARCHIVES, 2) == suffix
+
+
+def test_index_lists_every_category_extension():
+    for category, extensions in CATEGORIES_MAP.items():
+        for ext in extensions:
+            assert category in EXTENSION_INDEX[ext.lower()]
+    assert all(ext == ext.lower() for ext in EXTENSION_INDEX)
+    assert MAX_SUFFIX_DOTS == max(ext.count(".") for ext in EXTENSION_INDEX)
+
+
+def test_index_follows_routing_precedence():
+    rank = {category: i for i, category in enumerate(ROUTING_PRECEDENCE)}
+    for categories in EXTENSION_INDEX.values():
+        assert [rank[category] for category in categories] == sorted(rank[category] for category in categories)
+    assert set(ROUTING_PRECEDENCE) == set(CATEGORIES_MAP)
+
+
+def test_index_is_read_only():
+    with pytest.raises(TypeError):
+        EXTENSION_INDEX[".new"] = ("Text",)
+
+
+@pytest.mark.parametrize("name, categories", [
+    ("clip.mp4", ("Video Basic", "Video All")),
+    ("CLIP.MP4", ("Video Basic", "Video All")),
+    ("Photo.JpG", ("Image Basic", "Image All")),
+    ("cover.psd", ("Design", "Layout", "Image All")),
+    ("logo.svg", ("Image Basic", "Image All", "Markup")),
+    ("data.json", ("JSON",)),
+    ("archive.tar.gz", ()),
+    ("README", ()),
+    (".mp4", ()),
+    (".hidden.mp4", ("Video Basic", "Video All")),
+])
+def test_categories_for(name, categories):
+    assert categories_for(name) == categories
+
+
+def test_routing_table_follows_precedence():
+    table = routing_table(CATEGORIES_MAP)
+
+    assert table[".psd"] == "Design"
+    assert table[".svg"] == "Image Basic"
+    assert table[".mp4"] == "Video Basic"
+    assert set(table) == set(EXTENSION_INDEX)
+
+
+def test_routing_table_only_uses_given_categories():
+    table = routing_table(["Image All", "Markup"])
+
+    assert table[".psd"] == "Image All"
+    assert table[".svg"] == "Image All"
+    assert ".mp4" not in table
+    assert set(table.values()) <= {"Image All", "Markup"}
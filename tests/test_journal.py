@@ -0,0 +1,306 @@
+"""Tests for the transfer journal and resumed executes."""
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+from operations.events import DuplicateFound, Notice
+from operations.file_operations import execute_changes
+from operations.journal import TransferJournal
+from operations.plan import PlanEntry
+from tests.conftest import write_file
+
+
+def _records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def _entry(source, dest):
+    st = os.stat(source)
+    return PlanEntry(source, os.path.join(dest, "Video All", os.path.basename(source)), "Video All",
+                     st.st_size, st.st_mtime_ns)
+
+
+def test_new_journal_begins_and_ends(make_config, tmp_path):
+    path = str(tmp_path / "run.journal")
+    journal = TransferJournal(path, make_config())
+    assert not journal.resumed
+    journal.close(True)
+
+    assert [record["t"] for record in _records(path)] == ["begin", "end"]
+    assert not TransferJournal(path, make_config()).resumed
+
+
+def test_unfinished_journal_resumes(make_config, source, dest, tmp_path):
+    path = str(tmp_path / "run.journal")
+    a = _entry(write_file(os.path.join(source, "a.mp4"), b"a"), dest)
+    b = _entry(write_file(os.path.join(source, "b.mp4"), b"b"), dest)
+    journal = TransferJournal(path, make_config())
+    journal.planned([a, b], [a.destination, b.destination])
+    journal.done(a.source)
+    journal.close(False)
+
+    # Tuning options may change between attempts
+    resumed = TransferJournal(path, make_config(copy_workers=1))
+
+    assert resumed.resumed
+    assert not resumed.scan_complete
+    assert resumed.is_completed(a.source)
+    assert resumed.destination(b.source) == b.destination
+    resumed.close(False)
+
+
+def test_journal_of_other_config_discarded(make_config, source, dest, tmp_path):
+    path = str(tmp_path / "run.journal")
+    a = _entry(write_file(os.path.join(source, "a.mp4"), b"a"), dest)
+    journal = TransferJournal(path, make_config())
+    journal.planned([a], [a.destination])
+    journal.close(False)
+
+    other = TransferJournal(path, make_config(selected_types=[".mp4"]))
+
+    assert not other.resumed
+    assert other.destination(a.source) is None
+    other.close(False)
+
+
+def test_torn_last_record_ignored(make_config, source, dest, tmp_path):
+    path = str(tmp_path / "run.journal")
+    a = _entry(write_file(os.path.join(source, "a.mp4"), b"a"), dest)
+    journal = TransferJournal(path, make_config())
+    journal.planned([a], [a.destination])
+    journal.close(False)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"t":"done","src":')
+
+    resumed = TransferJournal(path, make_config())
+
+    assert resumed.resumed
+    assert not resumed.is_completed(a.source)
+    resumed.close(False)
+
+
+def test_recovery_settles_in_flight_transfers(make_config, source, dest, tmp_path):
+    path = str(tmp_path / "run.journal")
+    complete = _entry(write_file(os.path.join(source, "complete.mp4"), b"complete"), dest)
+    partial = _entry(write_file(os.path.join(source, "partial.mp4"), b"partial data"), dest)
+    journal = TransferJournal(path, make_config(operation_type="Move"))
+    journal.planned([complete, partial], [complete.destination, partial.destination])
+    journal.close(False)
+    # One copy finished before its source was removed, the other was cut short
+    os.makedirs(os.path.dirname(complete.destination))
+    shutil.copy2(complete.source, complete.destination)
+    write_file(partial.destination, b"part")
+
+    resumed = TransferJournal(path, make_config(operation_type="Move"))
+
+    assert resumed.recovered == 1
+    assert resumed.is_completed(complete.source)
+    assert not os.path.exists(complete.source)
+    assert not os.path.exists(partial.destination)
+    assert resumed.destination(partial.source) == partial.destination
+    resumed.close(False)
+
+
+def test_execute_resumes_interrupted_run(make_config, source, dest, tmp_path, events):
+    path = str(tmp_path / "run.journal")
+    config = make_config(journal_path=path, ordered_scan=True)
+    a = _entry(write_file(os.path.join(source, "a.mp4"), b"a" * 100), dest)
+    b = _entry(write_file(os.path.join(source, "b.mp4"), b"b" * 100), dest)
+    # An earlier attempt planned both files, copied a and was cut off copying b
+    journal = TransferJournal(path, config)
+    journal.planned([a, b], [a.destination, b.destination])
+    os.makedirs(os.path.dirname(a.destination))
+    shutil.copy2(a.source, a.destination)
+    journal.done(a.source)
+    write_file(b.destination, b"b" * 10)
+    journal.mark_scanned()
+    journal.close(False)
+
+    assert execute_changes(config, on_event=events.append)
+
+    assert any(isinstance(event, Notice) and event.message.startswith("Resuming") for event in events)
+    assert sorted(os.listdir(os.path.join(dest, "Video All"))) == ["a.mp4", "b.mp4"]
+    with open(b.destination, "rb") as f:
+        assert f.read() == b"b" * 100
+    assert _records(path)[-1]["t"] == "end"
+
+
+def test_execute_with_journal_finishes(make_config, source, dest, tmp_path, events):
+    path = str(tmp_path / "run.journal")
+    write_file(os.path.join(source, "a.mp4"), b"a")
+
+    assert execute_changes(make_config(journal_path=path), on_event=events.append)
+
+    assert os.path.exists(os.path.join(dest, "Video All", "a.mp4"))
+    kinds = [record["t"] for record in _records(path)]
+    assert kinds[0] == "begin" and kinds[-1] == "end"
+    assert "done" in kinds
+
+
+def test_execute_with_journal_and_date_range(make_config, source, dest, tmp_path, events):
+    path = str(tmp_path / "run.journal")
+    write_file(os.path.join(source, "a.mp4"), b"a")
+    config = make_config(
+        journal_path=path,
+        date_after=datetime(2000, 1, 1),
+        date_before=datetime(2100, 1, 1, tzinfo=timezone.utc),
+    )
+
+    assert execute_changes(config, on_event=events.append)
+
+    assert os.path.exists(os.path.join(dest, "Video All", "a.mp4"))
+    assert _records(path)[0]["config"]["date_after"] == "2000-01-01T00:00:00"
+
+
+def test_journal_with_date_range_resumes(make_config, tmp_path):
+    path = str(tmp_path / "run.journal")
+    config = make_config(date_after=datetime(2000, 1, 1))
+    TransferJournal(path, config).close(False)
+
+    resumed = TransferJournal(path, make_config(date_after=datetime(2000, 1, 1)))
+    assert resumed.resumed
+    resumed.close(False)
+
+    assert not TransferJournal(path, make_config(date_after=datetime(2001, 1, 1))).resumed
+
+
+def _interrupted(path, config, entries):
+    """Leave a journal as an attempt cut off with entries planned but not done."""
+    journal = TransferJournal(path, config)
+    journal.planned(entries, [entry.destination for entry in entries])
+    journal.close(False)
+
+
+def test_recovery_allows_coarse_destination_mtime(make_config, source, dest, tmp_path):
+    path = str(tmp_path / "run.journal")
+    a = _entry(write_file(os.path.join(source, "a.mp4"), b"complete"), dest)
+    _interrupted(path, make_config(), [a])
+    write_file(a.destination, b"complete")
+    # The source mtime has sub-second precision; the destination stores 2 second steps
+    os.utime(a.source, ns=(1_600_000_001_300_000_000, 1_600_000_001_300_000_000))
+    os.utime(a.destination, ns=(1_600_000_002_000_000_000, 1_600_000_002_000_000_000))
+
+    resumed = TransferJournal(path, make_config())
+
+    assert resumed.recovered == 1
+    assert resumed.is_completed(a.source)
+    assert os.path.exists(a.destination)
+    resumed.close(False)
+
+
+def test_recovery_removes_copy_with_other_mtime(make_config, source, dest, tmp_path):
+    path = str(tmp_path / "run.journal")
+    a = _entry(write_file(os.path.join(source, "a.mp4"), b"complete"), dest)
+    _interrupted(path, make_config(), [a])
+    # Same size, but the metadata was never copied
+    write_file(a.destination, b"complete")
+    os.utime(a.source, (1_600_000_000, 1_600_000_000))
+
+    resumed = TransferJournal(path, make_config())
+
+    assert resumed.recovered == 0
+    assert not os.path.exists(a.destination)
+    assert resumed.destination(a.source) == a.destination
+    resumed.close(False)
+
+
+def test_recovery_of_move_with_missing_source(make_config, source, dest, tmp_path):
+    path = str(tmp_path / "run.journal")
+    config = make_config(operation_type="Move")
+    a = _entry(write_file(os.path.join(source, "a.mp4"), b"a"), dest)
+    _interrupted(path, config, [a])
+    os.makedirs(os.path.dirname(a.destination))
+    os.rename(a.source, a.destination)
+
+    resumed = TransferJournal(path, config)
+
+    assert resumed.recovered == 1
+    assert resumed.is_completed(a.source)
+    resumed.close(False)
+
+
+def test_recovery_of_copy_with_missing_source(make_config, source, dest, tmp_path):
+    path = str(tmp_path / "run.journal")
+    a = _entry(write_file(os.path.join(source, "a.mp4"), b"complete"), dest)
+    _interrupted(path, make_config(), [a])
+    write_file(a.destination, b"comp")
+    os.unlink(a.source)
+
+    resumed = TransferJournal(path, make_config())
+
+    # Nothing says the copy finished, so it is neither trusted nor deleted
+    assert resumed.recovered == 0
+    assert not resumed.is_completed(a.source)
+    assert resumed.destination(a.source) == a.destination
+    assert os.path.exists(a.destination)
+    resumed.close(False)
+
+
+def test_recovery_leaves_transfers_that_never_started(make_config, source, dest, tmp_path):
+    path = str(tmp_path / "run.journal")
+    a = _entry(write_file(os.path.join(source, "a.mp4"), b"a"), dest)
+    _interrupted(path, make_config(), [a])
+
+    resumed = TransferJournal(path, make_config())
+
+    assert resumed.recovered == 0
+    assert resumed.destination(a.source) == a.destination
+    assert os.path.exists(a.source)
+    resumed.close(False)
+
+
+def test_hard_links_are_journaled(make_config, source, dest, tmp_path, events):
+    path = str(tmp_path / "run.journal")
+    write_file(os.path.join(source, "a.mp4"), b"same")
+    write_file(os.path.join(source, "b.mp4"), b"same")
+    config = make_config(journal_path=path, dedup_mode="Hardlink", ordered_scan=True)
+
+    assert execute_changes(config, on_event=events.append)
+
+    records = _records(path)
+    b = os.path.join(source, "b.mp4")
+    assert [record["dst"] for record in records if record["t"] == "plan" and record["src"] == b] \
+        == [os.path.join(dest, "Video All", "b.mp4")]
+    assert any(record["t"] == "done" and record["src"] == b for record in records)
+
+
+def test_resume_links_duplicate_of_transferred_original(make_config, source, dest, tmp_path, events):
+    path = str(tmp_path / "run.journal")
+    config = make_config(journal_path=path, dedup_mode="Hardlink", ordered_scan=True)
+    a = _entry(write_file(os.path.join(source, "a.mp4"), b"same"), dest)
+    b = _entry(write_file(os.path.join(source, "b.mp4"), b"same"), dest)
+    # An earlier attempt copied the original and stopped before linking
+    journal = TransferJournal(path, config)
+    journal.planned([a], [a.destination])
+    os.makedirs(os.path.dirname(a.destination))
+    shutil.copy2(a.source, a.destination)
+    journal.done(a.source)
+    journal.close(False)
+
+    assert execute_changes(config, on_event=events.append)
+
+    assert sorted(os.listdir(os.path.dirname(a.destination))) == ["a.mp4", "b.mp4"]
+    assert os.path.samefile(a.destination, b.destination)
+
+
+def test_resume_skips_links_made_earlier(make_config, source, dest, tmp_path, events):
+    path = str(tmp_path / "run.journal")
+    config = make_config(journal_path=path, dedup_mode="Hardlink", ordered_scan=True)
+    a = _entry(write_file(os.path.join(source, "a.mp4"), b"same"), dest)
+    b = _entry(write_file(os.path.join(source, "b.mp4"), b"same"), dest)
+    # An earlier attempt copied and linked both, then was cut off before finishing
+    journal = TransferJournal(path, config)
+    journal.planned([a, b], [a.destination, b.destination])
+    os.makedirs(os.path.dirname(a.destination))
+    shutil.copy2(a.source, a.destination)
+    os.link(a.destination, b.destination)
+    journal.done(a.source)
+    journal.done(b.source)
+    journal.close(False)
+
+    assert execute_changes(config, on_event=events.append)
+
+    assert sorted(os.listdir(os.path.dirname(a.destination))) == ["a.mp4", "b.mp4"]
+    assert not any(isinstance(event, DuplicateFound) for event in events)
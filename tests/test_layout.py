@@ -0,0 +1,114 @@
+"""Tests for destination layouts."""
+import os
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from operations.file_operations import execute_changes, preview_changes
+from operations.layout import NO_EXTENSION, UNKNOWN_DATE, DestinationLayout, layout_fields
+from operations.plan import MISSING
+from operations.scanner import ScanEntry
+from tests.conftest import write_file
+
+# Noon on 2023-04-05 local time
+APRIL_5 = int(time.mktime((2023, 4, 5, 12, 0, 0, 0, 0, -1)))
+
+
+def test_layout_fields():
+    assert layout_fields("{category}/{year}/{month}") == ["category", "year", "month"]
+    assert layout_fields("Sorted/{ext}") == ["ext"]
+
+
+@pytest.mark.parametrize("template", [
+    "",
+    "/abs/{category}",
+    "{category}/../escape",
+    "{colour}",
+    "{year:04d}",
+    "{year!r}",
+    "{category",
+])
+def test_invalid_layouts_rejected(template):
+    with pytest.raises(ValueError):
+        layout_fields(template)
+
+
+def test_invalid_layout_rejected_by_config(make_config):
+    with pytest.raises(ValidationError):
+        make_config(dest_layout="{category}/{week}")
+
+
+def test_directory_fields(tmp_path):
+    root = str(tmp_path / "dest")
+    layout = DestinationLayout(root, "{category}/{year}/{month}/{day}/{ext}")
+    entry = ScanEntry(str(tmp_path), "Clip.MP4")
+
+    assert layout.directory(entry, "Video All", APRIL_5 * 1_000_000_000) == os.path.join(
+        root, "Video All", "2023", "04", "05", "mp4"
+    )
+
+
+def test_directory_unknown_date_and_extension(tmp_path):
+    root = str(tmp_path / "dest")
+    layout = DestinationLayout(root, "{category}/{year}/{ext}")
+
+    assert layout.directory(ScanEntry(str(tmp_path), "README"), "Text", MISSING) == os.path.join(
+        root, "Text", UNKNOWN_DATE, NO_EXTENSION
+    )
+
+
+def test_directory_source_dir(tmp_path):
+    source = str(tmp_path / "source")
+    root = str(tmp_path / "dest")
+    layout = DestinationLayout(root, "{category}/{source_dir}", source)
+
+    nested = layout.directory(ScanEntry(os.path.join(source, "trip", "day1"), "a.mp4"), "Video All", 0)
+    top = layout.directory(ScanEntry(source, "b.mp4"), "Video All", 0)
+
+    assert nested == os.path.join(root, "Video All", "trip", "day1")
+    # Files at the top of the scan go straight into the category folder
+    assert top == os.path.join(root, "Video All")
+
+
+def test_directory_shared_between_files(tmp_path):
+    layout = DestinationLayout(str(tmp_path), "{category}/{year}")
+    first = layout.directory(ScanEntry(str(tmp_path), "a.mp4"), "Video All", APRIL_5 * 1_000_000_000)
+    second = layout.directory(ScanEntry(str(tmp_path), "b.mov"), "Video All", (APRIL_5 + 60) * 1_000_000_000)
+
+    assert first is second
+
+
+def test_default_layout_is_category_folder(make_config, source, dest, events):
+    write_file(os.path.join(source, "sub", "a.mp4"))
+
+    plan = preview_changes(make_config(), on_event=events.append)
+
+    assert [entry.destination for entry in plan] == [os.path.join(dest, "Video All", "a.mp4")]
+
+
+def test_execute_with_dated_layout(make_config, source, dest, events):
+    path = write_file(os.path.join(source, "a.mp4"), b"a")
+    os.utime(path, (APRIL_5, APRIL_5))
+    write_file(os.path.join(source, "trip", "b.mov"), b"b")
+    config = make_config(dest_layout="{category}/{year}/{month}", ordered_scan=True)
+    plan = preview_changes(config, on_event=events.append)
+
+    assert execute_changes(config, plan, on_event=events.append)
+
+    assert os.path.exists(os.path.join(dest, "Video All", "2023", "04", "a.mp4"))
+    year, month = time.strftime("%Y %m").split()
+    assert os.path.exists(os.path.join(dest, "Video All", year, month, "b.mov"))
+
+
+def test_execute_with_routed_source_layout(make_config, source, dest, events):
+    write_file(os.path.join(source, "trip", "a.mp4"), b"a")
+    write_file(os.path.join(source, "trip", "b.jpg"), b"b")
+    write_file(os.path.join(source, "c.jpg"), b"c")
+    config = make_config(route_categories=["Video All", "Image Basic"], dest_layout="{category}/{source_dir}")
+
+    assert execute_changes(config, on_event=events.append)
+
+    assert os.path.exists(os.path.join(dest, "Video All", "trip", "a.mp4"))
+    assert os.path.exists(os.path.join(dest, "Image Basic", "trip", "b.jpg"))
+    assert os.path.exists(os.path.join(dest, "Image Basic", "c.jpg"))
@@ -0,0 +1,28 @@
+"""Tests for the batched UI log."""
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+
+from gui.main_window import MAX_FILE_LINES_PER_FLUSH, LogHandler  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def test_collapsed_summary_precedes_next_line(app):
+    log_area = QtWidgets.QTextEdit()
+    handler = LogHandler(log_area, flush_interval_ms=60_000)
+    for i in range(MAX_FILE_LINES_PER_FLUSH + 5):
+        handler.log(f"file {i}", per_file=True)
+    handler.log("Statistics: done")
+    handler.flush()
+
+    lines = log_area.toPlainText().splitlines()
+    assert len(lines) == MAX_FILE_LINES_PER_FLUSH + 2
+    assert lines[-2].endswith("... 5 more file lines (see log file)")
+    assert lines[-1].endswith("Statistics: done")
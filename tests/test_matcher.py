@@ -0,0 +1,190 @@
+"""Tests for filename matching."""
+import os
+import time
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import ValidationError
+
+from operations.file_operations import preview_changes
+from operations.matcher import FileMatcher, StatFilter, compile_pattern
+from operations.scanner import ScanEntry
+from tests.conftest import write_file
+
+VIDEOS = [".mp4", ".mov", ".tar.gz"]
+
+
+def test_extensions_are_case_insensitive():
+    matcher = FileMatcher(VIDEOS)
+
+    assert matcher.match_many(["a.MP4", "b.mov", "c.txt", "mp4", ".mp4", "d.TAR.GZ"]) == [
+        True, True, False, False, False, True,
+    ]
+
+
+def test_contains_and_exact_match():
+    contains = FileMatcher(VIDEOS, "Holiday", "Contains")
+    exact = FileMatcher(VIDEOS, "Holiday", "Exact Match")
+
+    assert contains.filter(["my_holiday.mp4", "HOLIDAY.mov", "work.mp4"]) == ["my_holiday.mp4", "HOLIDAY.mov"]
+    assert exact.filter(["my_holiday.mp4", "HOLIDAY.mov", "holiday.txt"]) == ["HOLIDAY.mov"]
+
+
+def test_glob_patterns_cover_whole_name():
+    matcher = FileMatcher(VIDEOS, "IMG_2024*; DSC_??.mp4", "Glob")
+
+    assert matcher.match_many(["img_20240101.mp4", "old_IMG_2024.mp4", "DSC_01.mp4", "DSC_001.mp4"]) == [
+        True, False, True, False,
+    ]
+
+
+def test_glob_still_requires_extension():
+    matcher = FileMatcher(VIDEOS, "*", "Glob")
+
+    assert matcher.match_many(["a.mp4", "a.txt"]) == [True, False]
+
+
+def test_regex_searches_original_case_pattern():
+    # \D must not be lowercased to \d
+    matcher = FileMatcher(VIDEOS, r"_\D{3}_\d+", "Regex")
+
+    assert matcher.match_many(["clip_ABC_12.mp4", "clip_123_12.mp4", "clip_abc_.mp4"]) == [True, False, False]
+
+
+def test_empty_patterns_match_everything():
+    assert compile_pattern("", "Regex") is None
+    assert compile_pattern(" ; ", "Glob") is None
+    assert compile_pattern("abc", "Contains") is None
+    assert FileMatcher(VIDEOS, " ; ", "Glob").matches("a.mp4")
+
+
+def test_invalid_regex_raises():
+    with pytest.raises(ValueError, match="Invalid regex pattern"):
+        FileMatcher(VIDEOS, "(unclosed", "Regex")
+
+
+def test_invalid_regex_rejected_by_config(make_config):
+    with pytest.raises(ValidationError):
+        make_config(mode="Advanced", keyword="[a-", match_type="Regex")
+    # Basic mode ignores the keyword
+    make_config(mode="Basic", keyword="[a-", match_type="Regex")
+
+
+def test_routes_by_extension():
+    matcher = FileMatcher([".mp4", ".jpg"], routes={".mp4": "Video All", ".jpg": "Image Basic"})
+
+    assert matcher.category("a.MP4") == "Video All"
+    assert matcher.category("a.mp4", ".jpg") == "Image Basic"
+    assert matcher.category("a.txt") is None
+
+
+def test_preview_with_glob(make_config, source, events):
+    for name in ("IMG_2024_01.mp4", "IMG_2023_01.mp4", "VID_2024.mov", "IMG_2024.txt"):
+        write_file(os.path.join(source, name))
+    config = make_config(mode="Advanced", keyword="IMG_2024*;VID_*", match_type="Glob")
+
+    plan = preview_changes(config, on_event=events.append)
+
+    assert sorted(os.path.basename(entry.source) for entry in plan) == ["IMG_2024_01.mp4", "VID_2024.mov"]
+
+
+def test_preview_with_regex(make_config, source, events):
+    for name in ("trip_001.mp4", "trip_final.mp4", "TRIP_042.mov"):
+        write_file(os.path.join(source, name))
+    config = make_config(mode="Advanced", keyword=r"^trip_\d{3}\.", match_type="Regex")
+
+    plan = preview_changes(config, on_event=events.append)
+
+    assert sorted(os.path.basename(entry.source) for entry in plan) == ["TRIP_042.mov", "trip_001.mp4"]
+
+
+def _aged_file(folder, name, size, days_old, now):
+    path = write_file(os.path.join(folder, name), b"x" * size)
+    os.utime(path, (now - days_old * 86400, now - days_old * 86400))
+    return path
+
+
+def test_stat_filter_limits_size(tmp_path):
+    now = time.time()
+    small = ScanEntry(str(tmp_path), os.path.basename(_aged_file(str(tmp_path), "small.mp4", 10, 0, now)))
+    big = ScanEntry(str(tmp_path), os.path.basename(_aged_file(str(tmp_path), "big.mp4", 1000, 0, now)))
+    stat_filter = StatFilter(min_size=10, max_size=999)
+
+    assert stat_filter.accepts(small)
+    assert not stat_filter.accepts(big)
+
+
+def test_stat_filter_limits_dates(tmp_path):
+    now = time.time()
+    old = _aged_file(str(tmp_path), "old.mp4", 1, 30, now)
+    new = _aged_file(str(tmp_path), "new.mp4", 1, 1, now)
+    stat_filter = StatFilter(earliest_ns=int((now - 10 * 86400) * 1e9))
+
+    assert not stat_filter.accepts(ScanEntry(str(tmp_path), os.path.basename(old)))
+    assert stat_filter.accepts(ScanEntry(str(tmp_path), os.path.basename(new)))
+
+
+def test_stat_filter_ctime_ignores_mtime(tmp_path):
+    now = time.time()
+    path = _aged_file(str(tmp_path), "touched.mp4", 1, 365, now)
+    # The mtime was set a year back, but the status change time is now
+    stat_filter = StatFilter(earliest_ns=int((now - 86400) * 1e9), use_ctime=True)
+
+    assert stat_filter.accepts(ScanEntry(str(tmp_path), os.path.basename(path)))
+    assert not StatFilter(earliest_ns=int((now - 86400) * 1e9)).accepts(
+        ScanEntry(str(tmp_path), os.path.basename(path))
+    )
+
+
+def test_stat_filter_rejects_missing_file(tmp_path):
+    assert not StatFilter(min_size=0).accepts(ScanEntry(str(tmp_path), "gone.mp4"))
+
+
+def test_stat_filter_from_config(make_config):
+    now = datetime(2024, 6, 1, tzinfo=timezone.utc).timestamp()
+    config = make_config(
+        min_age_days=1,
+        max_age_days=10,
+        date_after=datetime(2024, 5, 1, tzinfo=timezone.utc),
+    )
+
+    stat_filter = StatFilter.from_config(config, now)
+
+    # The later of date_after and the maximum age wins
+    assert stat_filter.earliest_ns == int((now - 10 * 86400) * 1e9)
+    assert stat_filter.latest_ns == int((now - 86400) * 1e9)
+    assert StatFilter.from_config(make_config()) is None
+
+
+def test_empty_ranges_rejected(make_config):
+    with pytest.raises(ValidationError):
+        make_config(min_size=10, max_size=5)
+    with pytest.raises(ValidationError):
+        make_config(min_age_days=10, max_age_days=5)
+
+
+def test_preview_with_size_and_age_limits(make_config, source, events):
+    now = time.time()
+    _aged_file(source, "keep.mp4", 500, 5, now)
+    _aged_file(source, "too_small.mp4", 10, 5, now)
+    _aged_file(source, "too_old.mp4", 500, 50, now)
+    _aged_file(source, "too_new.mp4", 500, 0, now)
+    config = make_config(min_size=100, min_age_days=1, max_age_days=30)
+
+    plan = preview_changes(config, on_event=events.append)
+
+    assert [os.path.basename(entry.source) for entry in plan] == ["keep.mp4"]
+
+
+def test_preview_with_limits_and_metadata_index(make_config, source, tmp_path, events):
+    now = time.time()
+    _aged_file(source, "keep.mp4", 500, 0, now)
+    _aged_file(source, "small.mp4", 10, 0, now)
+    config = make_config(min_size=100, index_path=str(tmp_path / "index.sqlite"))
+
+    first = preview_changes(config, on_event=events.append)
+    # The second scan is served from the index
+    second = preview_changes(config, on_event=events.append)
+
+    assert [os.path.basename(entry.source) for entry in first] == ["keep.mp4"]
+    assert [os.path.basename(entry.source) for entry in second] == ["keep.mp4"]
@@ -0,0 +1,155 @@
+"""Tests for the persistent metadata index."""
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from operations import file_operations, scanner
+from operations.file_operations import preview_changes
+from operations.metadata_index import MetadataIndex
+from operations.scanner import scan_files
+from tests.conftest import write_file
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = MetadataIndex(str(tmp_path / "index.sqlite"))
+    yield index
+    index.close()
+
+
+@pytest.fixture
+def listed(monkeypatch):
+    """Directories the scanner actually read, rather than served from the index."""
+    paths = []
+    real_scandir = os.scandir
+
+    def scandir(path):
+        paths.append(path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(scanner.os, "scandir", scandir)
+    return paths
+
+
+def _touch_dir(path, seconds):
+    """Give a directory a new mtime, even on filesystems with coarse timestamps."""
+    os.utime(path, (seconds, seconds))
+
+
+def _scan(source, index):
+    return sorted(os.path.relpath(entry.path, source) for entry in scan_files(source, index=index, ordered=True))
+
+
+def test_unchanged_directories_served_from_index(source, index, listed):
+    write_file(os.path.join(source, "a.mp4"), b"a")
+    write_file(os.path.join(source, "sub", "b.mp4"), b"bb")
+    first = _scan(source, index)
+    listed.clear()
+
+    assert _scan(source, index) == first == ["a.mp4", os.path.join("sub", "b.mp4")]
+    assert listed == []
+
+
+def test_changed_directory_mtime_invalidates_listing(source, index, listed):
+    write_file(os.path.join(source, "a.mp4"), b"a")
+    sub = os.path.dirname(write_file(os.path.join(source, "sub", "b.mp4"), b"bb"))
+    _scan(source, index)
+    listed.clear()
+
+    write_file(os.path.join(sub, "c.mp4"), b"ccc")
+    _touch_dir(sub, 1_000_000)
+
+    assert _scan(source, index) == ["a.mp4", os.path.join("sub", "b.mp4"), os.path.join("sub", "c.mp4")]
+    assert listed == [sub]
+
+
+def test_indexed_metadata_served_with_entries(source, index):
+    write_file(os.path.join(source, "a.mp4"), b"abc")
+    list(scan_files(source, index=index))
+
+    [entry] = list(scan_files(source, index=index))
+
+    assert entry.size == 3
+    assert entry.mtime_ns == os.stat(os.path.join(source, "a.mp4")).st_mtime_ns
+
+
+def test_deleted_directories_purged_only_after_complete_scan(source, index):
+    write_file(os.path.join(source, "a", "1.mp4"))
+    write_file(os.path.join(source, "a", "2.mp4"))
+    write_file(os.path.join(source, "b", "3.mp4"))
+    _scan(source, index)
+    shutil.rmtree(os.path.join(source, "b"))
+    _touch_dir(source, 1_000_000)
+
+    # Stop after the first file, leaving the scan incomplete
+    files = scan_files(source, index=index, ordered=True)
+    next(files)
+    files.close()
+    assert index.summary(source) == {"dirs": 3, "files": 3, "bytes": 0}
+
+    _scan(source, index)
+    assert index.summary(source) == {"dirs": 2, "files": 2, "bytes": 0}
+
+
+def test_query_api(source, index):
+    write_file(os.path.join(source, "Holiday.MP4"), b"x" * 10)
+    write_file(os.path.join(source, "sub", "clip.mov"), b"x" * 5)
+    write_file(os.path.join(source, "sub", "holiday.mov"), b"x" * 20)
+    root = os.path.abspath(source)
+    assert index.roots() == []
+
+    files = scan_files(source, index=index, ordered=True)
+    next(files)
+    files.close()
+    # Listed, but not completely scanned yet
+    assert index.roots() == [(root, None)]
+
+    _scan(source, index)
+    [(path, scanned_at)] = index.roots()
+    assert path == root and scanned_at is not None
+    assert index.summary(source) == {"dirs": 2, "files": 3, "bytes": 35}
+    assert {f.name for f in index.find(source, ext=".MP4")} == {"Holiday.MP4"}
+    assert {f.name for f in index.find(source, ext=".mov", min_size=10)} == {"holiday.mov"}
+    assert {f.path for f in index.find(source, name_contains="clip")} == {os.path.join(root, "sub", "clip.mov")}
+    assert list(index.find(str(source) + "-missing")) == []
+
+    index.forget(source)
+    assert index.roots() == []
+    assert index.summary(source) == {"dirs": 0, "files": 0, "bytes": 0}
+
+
+def test_close_closes_every_thread_connection(source, tmp_path):
+    index = MetadataIndex(str(tmp_path / "index.sqlite"))
+    write_file(os.path.join(source, "sub", "a.mp4"))
+    # The second scan reads cached listings from the scan workers
+    _scan(source, index)
+    _scan(source, index)
+    connections = list(index._connections)
+    assert len(connections) > 1
+
+    index.close()
+
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    # A closed index reconnects if it is used again
+    assert index.summary(source)["files"] == 1
+    index.close()
+
+
+def test_preview_closes_index(monkeypatch, make_config, tmp_path):
+    closed = []
+    real_close = MetadataIndex.close
+
+    def close(self):
+        closed.append(self.db_path)
+        real_close(self)
+
+    monkeypatch.setattr(file_operations.MetadataIndex, "close", close)
+    path = str(tmp_path / "index.sqlite")
+
+    preview_changes(make_config(index_path=path))
+
+    assert closed == [path]
@@ -0,0 +1,154 @@
+"""Tests for run metrics."""
+import json
+import os
+import threading
+
+import pytest
+
+from operations import metrics as metrics_module
+from operations.events import OperationFinished
+from operations.file_operations import preview_changes
+from operations.metrics import (
+    LATENCY_BINS,
+    SIZE_BUCKET_LABELS,
+    LatencyHistogram,
+    OperationStats,
+    size_bucket,
+)
+from tests.conftest import write_file
+
+
+@pytest.mark.parametrize("size, bucket", [
+    (0, 0),
+    (64 * 1024 - 1, 0),
+    (64 * 1024, 1),
+    (1024 * 1024, 2),
+    (256 * 1024 * 1024 - 1, 3),
+    (10 ** 12, len(SIZE_BUCKET_LABELS) - 1),
+])
+def test_size_buckets(size, bucket):
+    assert size_bucket(size) == bucket
+
+
+@pytest.mark.parametrize("seconds, bin_index", [
+    (0.0, 0),
+    (0.5e-6, 0),
+    (1e-6, 1),
+    (3e-6, 2),
+    (4e-6, 3),
+    (0.001, 10),
+    (10 ** 9, LATENCY_BINS - 1),
+])
+def test_latency_bins(seconds, bin_index):
+    histogram = LatencyHistogram()
+
+    histogram.add(seconds)
+
+    assert histogram.counts[bin_index] == 1
+    assert histogram.count == 1
+
+
+def test_percentiles_are_bin_upper_bounds():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(0.5) == 0.0
+    for _ in range(90):
+        histogram.add(0.001)  # 1000 us, in the bin below 1024 us
+    for _ in range(10):
+        histogram.add(0.1)  # 100000 us, in the bin below 131072 us
+
+    assert histogram.percentile(0.5) == histogram.percentile(0.9) == 1024 / 1_000_000
+    assert histogram.percentile(0.99) == 131072 / 1_000_000
+    summary = histogram.to_dict()
+    assert summary["count"] == 100
+    assert summary["mean_ms"] == pytest.approx(10.9)
+    assert summary["bins_us"] == [[1024, 90], [131072, 10]]
+
+
+def test_merge_adds_histograms():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.add(0.001)
+    second.add(0.001)
+    second.add(0.1)
+
+    first.merge(second)
+
+    assert first.count == 3
+    assert first.total == pytest.approx(0.102)
+    assert first.counts[10] == 2 and first.counts[17] == 1
+
+
+def test_thread_totals_are_merged():
+    stats = OperationStats("Copy")
+
+    def work():
+        for _ in range(100):
+            stats.record_file(1000, 0.001, [("copy", 0.0005)])
+        stats.record_error()
+        stats.add_time("scan", 1.0)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(stats._threads) == 4
+    assert (stats.files, stats.bytes, stats.errors) == (400, 400_000, 4)
+    phases = stats.phases()
+    assert phases["copy"] == (pytest.approx(0.2), 400)
+    assert phases["scan"] == (pytest.approx(4.0), 4)
+    assert [histogram.count for histogram in stats.latencies()] == [400, 0, 0, 0, 0]
+
+
+def test_snapshot_lists_only_recorded_buckets():
+    stats = OperationStats("Copy")
+    stats.record_file(10, 0.001)
+    stats.record_file(2 * 1024 * 1024, 0.01)
+    stats.add_files(3, 30)
+    stats.finish()
+
+    snapshot = stats.snapshot()
+
+    assert snapshot["operation"] == "Copy"
+    assert snapshot["files"] == 5
+    assert set(snapshot["latency_by_size"]) == {"<64KiB", "1MiB-16MiB"}
+    assert snapshot["elapsed"] == stats.elapsed
+
+
+def test_write_replaces_file(tmp_path):
+    path = str(tmp_path / "metrics.json")
+    write_file(path, b"old")
+    stats = OperationStats("Copy")
+    stats.record_file(10, 0.001)
+
+    stats.write(path)
+
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["files"] == 1
+    assert os.listdir(tmp_path) == ["metrics.json"]
+
+
+def test_failed_write_keeps_old_file(monkeypatch, tmp_path):
+    path = str(tmp_path / "metrics.json")
+    write_file(path, b"old")
+
+    def replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(metrics_module.os, "replace", replace)
+
+    OperationStats("Copy").write(path)
+
+    with open(path, "rb") as f:
+        assert f.read() == b"old"
+    assert os.listdir(tmp_path) == ["metrics.json"]
+
+
+def test_preview_reports_elapsed(make_config, source, events):
+    write_file(os.path.join(source, "a.mp4"), b"a")
+
+    preview_changes(make_config(), on_event=events.append)
+
+    [finished] = [event for event in events if isinstance(event, OperationFinished)]
+    assert finished.files == 1
+    assert finished.elapsed > 0
@@ -0,0 +1,112 @@
+"""Tests for the destination name index."""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from operations.events import ConflictRenamed
+from operations.file_operations import execute_changes
+from operations.name_index import DestinationNameIndex
+from tests.conftest import write_file
+
+
+def test_reserve_free_name(tmp_path):
+    index = DestinationNameIndex()
+    path = str(tmp_path / "clip.mp4")
+
+    assert index.reserve(path) == path
+
+
+def test_reserve_skips_names_on_disk(tmp_path):
+    write_file(str(tmp_path / "clip.mp4"))
+    write_file(str(tmp_path / "clip_1.mp4"))
+    index = DestinationNameIndex()
+
+    assert index.reserve(str(tmp_path / "clip.mp4")) == str(tmp_path / "clip_2.mp4")
+    assert index.reserve(str(tmp_path / "clip.mp4")) == str(tmp_path / "clip_3.mp4")
+
+
+def test_reserve_skips_reserved_names(tmp_path):
+    index = DestinationNameIndex()
+    path = str(tmp_path / "clip.mp4")
+
+    assert [index.reserve(path) for _ in range(3)] == [
+        path,
+        str(tmp_path / "clip_1.mp4"),
+        str(tmp_path / "clip_2.mp4"),
+    ]
+    # A numbered name taken explicitly is skipped too
+    assert index.reserve(str(tmp_path / "clip_3.mp4")) == str(tmp_path / "clip_3.mp4")
+    assert index.reserve(path) == str(tmp_path / "clip_4.mp4")
+
+
+def test_release_frees_unwritten_name(tmp_path):
+    index = DestinationNameIndex()
+    path = str(tmp_path / "clip.mp4")
+    index.reserve(path)
+
+    index.release(path)
+
+    assert index.reserve(path) == path
+
+
+def test_release_keeps_written_name(tmp_path):
+    index = DestinationNameIndex()
+    path = index.reserve(str(tmp_path / "clip.mp4"))
+    write_file(path)
+
+    index.release(path)
+
+    assert index.reserve(path) == str(tmp_path / "clip_1.mp4")
+
+
+def test_claim_marks_name_taken(tmp_path):
+    index = DestinationNameIndex()
+    path = str(tmp_path / "clip.mp4")
+    index.claim(path)
+
+    assert index.reserve(path) == str(tmp_path / "clip_1.mp4")
+
+
+def test_directory_listed_once(tmp_path):
+    index = DestinationNameIndex()
+    index.reserve(str(tmp_path / "a.mp4"))
+    # Created behind the index's back, after the directory was listed
+    write_file(str(tmp_path / "b.mp4"))
+
+    assert index.reserve(str(tmp_path / "b.mp4")) == str(tmp_path / "b.mp4")
+
+
+def test_added_empty_directory_not_listed(tmp_path):
+    index = DestinationNameIndex()
+    index.add_empty_directory(str(tmp_path))
+    write_file(str(tmp_path / "clip.mp4"))
+
+    assert index.reserve(str(tmp_path / "clip.mp4")) == str(tmp_path / "clip.mp4")
+
+
+def test_concurrent_reserves_are_unique(tmp_path):
+    index = DestinationNameIndex()
+    path = str(tmp_path / "clip.mp4")
+
+    with ThreadPoolExecutor(8) as executor:
+        reserved = list(executor.map(lambda _: index.reserve(path), range(400)))
+
+    assert len(set(reserved)) == 400
+
+
+def test_execute_renames_conflicts(make_config, source, dest, events):
+    write_file(os.path.join(dest, "Video All", "clip.mp4"), b"existing")
+    write_file(os.path.join(source, "clip.mp4"), b"top")
+    write_file(os.path.join(source, "nested", "clip.mp4"), b"nested")
+
+    assert execute_changes(make_config(ordered_scan=True), on_event=events.append)
+
+    folder = os.path.join(dest, "Video All")
+    assert sorted(os.listdir(folder)) == ["clip.mp4", "clip_1.mp4", "clip_2.mp4"]
+    with open(os.path.join(folder, "clip.mp4"), "rb") as f:
+        assert f.read() == b"existing"
+    contents = set()
+    for name in ("clip_1.mp4", "clip_2.mp4"):
+        with open(os.path.join(folder, name), "rb") as f:
+            contents.add(f.read())
+    assert contents == {b"top", b"nested"}
+    assert sum(isinstance(event, ConflictRenamed) for event in events) == 2
@@ -0,0 +1,128 @@
+"""Tests for operation plans."""
+import bisect
+import os
+
+import pytest
+
+import operations.plan as plan_module
+from operations.events import Notice
+from operations.file_operations import execute_changes, preview_changes
+from operations.plan import MISSING, OperationPlan, PlanEntry, PlanStore
+from tests.conftest import write_file
+
+
+def test_plan_matches_ignores_tuning_fields(make_config):
+    plan = OperationPlan(make_config())
+
+    assert plan.matches(make_config(operation_type="Move"))
+    assert plan.matches(make_config(copy_workers=1, scan_workers=2, hash_workers=3, sniff_workers=5))
+    assert plan.matches(make_config(ordered_scan=True, metrics_path="metrics.json"))
+    assert not plan.matches(make_config(selected_types=[".mp4"]))
+    assert not plan.matches(make_config(dest_layout="{category}/{year}"))
+
+
+def test_execute_reuses_plan_after_tuning_change(make_config, source, dest, events):
+    write_file(os.path.join(source, "clip.mp4"), b"video")
+    plan = preview_changes(make_config(), on_event=events.append)
+
+    assert execute_changes(make_config(copy_workers=1, scan_workers=1), plan, on_event=events.append)
+    assert not any(isinstance(event, Notice) and "rescanning" in event.message for event in events)
+    assert os.path.exists(os.path.join(dest, "Video All", "clip.mp4"))
+
+
+def _entries(root, count):
+    entries = []
+    for i in range(count):
+        folder = os.path.join(root, "source", f"dir{i % 7}")
+        name = f"clip_{i:05d}_é.mp4"
+        dest_name = name if i % 10 else f"renamed_{i}.mp4"
+        entries.append(PlanEntry(
+            os.path.join(folder, name),
+            os.path.join(root, "dest", f"cat{i % 3}", dest_name),
+            f"cat{i % 3}",
+            MISSING if i % 11 == 0 else i * 10,
+            i * 1_000_000_007,
+        ))
+    return entries
+
+
+def test_plan_store_round_trips_entries(tmp_path):
+    entries = _entries(str(tmp_path), 50)
+    store = PlanStore(spill_threshold=None)
+    for entry in entries:
+        store.append(entry)
+
+    assert len(store) == 50
+    assert list(store) == entries
+    assert store[0] == entries[0]
+    assert store[-1] == entries[-1]
+    assert store.page(45, 10) == entries[45:]
+    assert store.page(60, 10) == []
+    assert store.total_bytes == sum(entry.size for entry in entries if entry.size != MISSING)
+    assert not store.spilled
+    with pytest.raises(IndexError):
+        store[50]
+
+
+def test_plan_store_spills_names(tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_module, "_SPILL_CHUNK", 256)
+    monkeypatch.setattr(plan_module, "PAGE_SIZE", 64)
+    entries = _entries(str(tmp_path), 1000)
+    store = PlanStore(spill_threshold=1024)
+    for entry in entries:
+        store.append(entry)
+
+    assert store.spilled
+    # Names come from the spill file, from memory, and from both in one page
+    assert list(store) == entries
+    assert store.page(0, 3) == entries[:3]
+    assert store.page(990, 20) == entries[990:]
+    # First entry whose name is still in memory
+    boundary = bisect.bisect_right(store._name_ends, store._spilled)
+    assert 0 < boundary < len(store)
+    assert store.page(boundary - 2, 4) == entries[boundary - 2:boundary + 2]
+    store.close()
+
+
+def test_plan_store_keeps_undecodable_names(tmp_path):
+    source = os.path.join(str(tmp_path), "bad\udcff.mp4")
+    entry = PlanEntry(source, os.path.join(str(tmp_path), "dest", "bad\udcff.mp4"), "Video All", 1, 1)
+    store = PlanStore(spill_threshold=None)
+    store.append(entry)
+
+    assert store[0] == entry
+
+
+def test_plan_store_destination_dirs(tmp_path):
+    root = str(tmp_path)
+    store = PlanStore(spill_threshold=None)
+    for dest_dir in ("Video All/2024", "Video All", "Video All/2023", "Video All/2024"):
+        store.append(PlanEntry(
+            os.path.join(root, "source", "a.mp4"),
+            os.path.join(root, "dest", dest_dir, "a.mp4"),
+            "Video All",
+            1,
+            1,
+        ))
+
+    assert store.destination_dirs() == [
+        os.path.join(root, "dest", "Video All"),
+        os.path.join(root, "dest", "Video All", "2023"),
+        os.path.join(root, "dest", "Video All", "2024"),
+    ]
+
+
+def test_plan_store_sort_keys(tmp_path):
+    entries = _entries(str(tmp_path), 30)
+    store = PlanStore(spill_threshold=None)
+    for entry in entries:
+        store.append(entry)
+
+    by_size = sorted(range(len(store)), key=store.sort_key("size"))
+    assert [store[i].size for i in by_size] == sorted(entry.size for entry in entries)
+    by_name = sorted(range(len(store)), key=store.sort_key("name"))
+    assert [os.path.basename(store[i].source) for i in by_name] == sorted(
+        os.path.basename(entry.source) for entry in entries
+    )
+    with pytest.raises(ValueError):
+        store.sort_key("colour")
@@ -0,0 +1,128 @@
+"""Tests for the parallel directory scanner."""
+import os
+import threading
+import time
+
+import pytest
+
+import operations.scanner as scanner
+from operations.events import OperationFinished
+from operations.file_operations import preview_changes
+from operations.scanner import scan_files
+from tests.conftest import write_file
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "tree"
+    for path in (
+        "b.txt", "a.txt", "z/1.txt", "z/0.txt", "m/x.txt", "m/deep/er/y.txt", "m/deep/w.txt", "c/empty/.keep",
+    ):
+        write_file(str(root / path))
+    return str(root)
+
+
+def _walk_order(root):
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        paths.extend(os.path.join(dirpath, name) for name in sorted(filenames))
+    return paths
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_ordered_scan_matches_os_walk(tree, workers):
+    assert [entry.path for entry in scan_files(tree, workers=workers, ordered=True)] == _walk_order(tree)
+
+
+def test_unordered_scan_finds_same_files(tree):
+    assert sorted(entry.path for entry in scan_files(tree, workers=4)) == sorted(_walk_order(tree))
+
+
+def test_match_filters_names_in_batches(tree):
+    batches = []
+
+    def match(names):
+        batches.append(list(names))
+        return [name.endswith("x.txt") or name == "a.txt" for name in names]
+
+    found = [entry.name for entry in scan_files(tree, match=match, ordered=True)]
+
+    assert found == ["a.txt", "x.txt"]
+    # One call per directory holding files
+    assert sorted(sorted(batch) for batch in batches) == sorted(
+        [["a.txt", "b.txt"], ["x.txt"], ["w.txt"], ["y.txt"], ["0.txt", "1.txt"], [".keep"]]
+    )
+
+
+def test_accept_filters_files(tree):
+    found = [entry.name for entry in scan_files(tree, ordered=True, accept=lambda entry: entry.name < "b")]
+
+    assert found == ["a.txt", ".keep", "0.txt", "1.txt"]
+
+
+def test_symlinked_directories_not_followed(tmp_path):
+    root = tmp_path / "root"
+    write_file(str(root / "real" / "a.txt"))
+    outside = tmp_path / "outside"
+    write_file(str(outside / "secret.txt"))
+    os.symlink(outside, root / "link")
+    os.symlink(root / "real" / "a.txt", root / "alias.txt")
+
+    found = sorted(os.path.relpath(entry.path, root) for entry in scan_files(str(root)))
+
+    assert found == ["alias.txt", os.path.join("real", "a.txt")]
+
+
+@pytest.mark.parametrize("ordered", [False, True])
+def test_unreadable_directory_skipped(tree, monkeypatch, ordered):
+    blocked = os.path.join(tree, "m")
+    scandir = os.scandir
+
+    def guarded(path):
+        if os.fspath(path) == blocked:
+            raise PermissionError(13, "Permission denied", path)
+        return scandir(path)
+
+    monkeypatch.setattr(scanner.os, "scandir", guarded)
+
+    found = sorted(entry.path for entry in scan_files(tree, ordered=ordered))
+
+    assert found == sorted(path for path in _walk_order(tree) if not path.startswith(blocked + os.sep))
+
+
+def test_closing_scan_stops_listing(tmp_path, monkeypatch):
+    for i in range(200):
+        write_file(str(tmp_path / f"d{i:03d}" / "f.txt"))
+    listed = []
+    scan_dir = scanner._scan_dir
+
+    def slow_scan_dir(*args):
+        listed.append(args[0])
+        time.sleep(0.005)
+        return scan_dir(*args)
+
+    monkeypatch.setattr(scanner, "_scan_dir", slow_scan_dir)
+
+    files = scan_files(str(tmp_path), workers=1, ordered=True)
+    next(files)
+    files.close()
+
+    # Directories queued but not started when the scan was closed are dropped
+    assert len(listed) < 100
+
+
+def test_cancelled_preview_stops_scan(make_config, source, events):
+    for i in range(50):
+        write_file(os.path.join(source, f"d{i}", "clip.mp4"))
+    cancel_event = threading.Event()
+
+    def listener(event):
+        events.append(event)
+        cancel_event.set()
+
+    plan = preview_changes(make_config(), cancel_event, listener)
+
+    finished = [event for event in events if isinstance(event, OperationFinished)]
+    assert finished[0].cancelled
+    assert len(plan) < 50
@@ -0,0 +1,139 @@
+"""Tests for content sniffing."""
+import os
+
+import pytest
+
+import operations.sniffer as sniffer
+from operations.file_operations import preview_changes
+from operations.metadata_index import MetadataIndex
+from operations.scanner import ScanEntry, scan_files
+from operations.sniffer import ContentSniffer, SniffCache, _cache_key, sniff
+from tests.conftest import write_file
+
+JPEG = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00" + b"\x00" * 64
+MP4 = b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00isomiso2" + b"\x00" * 64
+PDF = b"%PDF-1.7\n" + b"\x00" * 64
+
+
+@pytest.mark.parametrize("head, ext", [
+    (JPEG, ".jpg"),
+    (MP4, ".mp4"),
+    (b"\x00\x00\x00\x18ftypqt  " + b"\x00" * 16, ".mov"),
+    (b"\x00\x00\x00\x18ftypheic" + b"\x00" * 16, ".heic"),
+    (PDF, ".pdf"),
+    (b"SQLite format 3\x00" + b"\x00" * 16, ".sqlite"),
+    (b"<?xml version='1.0'?><svg xmlns='http://www.w3.org/2000/svg'/>", ".svg"),
+    (b"<!DOCTYPE html><html></html>", ".html"),
+    (b'{\n  "name": "falcon"\n}', ".json"),
+    (b'\xef\xbb\xbf[{"id": 1}]', ".json"),
+    (b"[section]\nkey = value\n", None),
+    (b"[[package]]\nname = 'x'\n", None),
+    (b"{\\rtf1\\ansi hello}", ".rtf"),
+    (b"plain text", None),
+    (b"", None),
+], ids=[
+    "jpg", "mp4", "mov", "heic", "pdf", "sqlite", "svg", "html",
+    "json-object", "json-array", "ini", "toml", "rtf", "text", "empty",
+])
+def test_sniff(head, ext):
+    assert sniff(head) == ext
+
+
+def test_cache_key_includes_device(tmp_path):
+    path = write_file(str(tmp_path / "clip"), MP4)
+    st = os.stat(path)
+
+    assert _cache_key(ScanEntry(str(tmp_path), "clip")) == (st.st_size, st.st_mtime_ns, st.st_dev, st.st_ino)
+
+
+def test_cache_key_of_indexed_file_needs_no_stat(tmp_path, monkeypatch):
+    source = str(tmp_path / "source")
+    path = write_file(os.path.join(source, "sub", "clip"), MP4)
+    st = os.stat(path)
+    index = MetadataIndex(str(tmp_path / "index.sqlite"))
+    list(scan_files(source, index=index))
+    [scan_entry] = list(scan_files(source, index=index))
+    index.close()
+
+    def no_stat(self):
+        raise AssertionError(f"{self.path} was stat'ed")
+
+    monkeypatch.setattr(ScanEntry, "stat", no_stat)
+
+    assert scan_entry.entry is None
+    assert _cache_key(scan_entry) == (st.st_size, st.st_mtime_ns, st.st_dev, st.st_ino)
+
+
+def test_classify_keeps_order_and_uses_cache(tmp_path, monkeypatch):
+    names = [f"file{i:03d}" for i in range(150)]
+    for i, name in enumerate(names):
+        write_file(str(tmp_path / name), JPEG if i % 2 else MP4)
+    cache = SniffCache()
+    files = [ScanEntry(str(tmp_path), name) for name in names]
+
+    results = list(ContentSniffer(workers=3, cache=cache).classify(files))
+
+    assert [entry.name for entry, _ in results] == names
+    assert [ext for _, ext in results] == [".jpg" if i % 2 else ".mp4" for i in range(150)]
+    assert len(cache) == 150
+    # Unchanged files are answered from the cache without being read
+    monkeypatch.setattr(sniffer, "sniff_file", lambda path: pytest.fail(f"{path} was read again"))
+    again = list(ContentSniffer(cache=cache).classify(ScanEntry(str(tmp_path), name) for name in names))
+    assert [ext for _, ext in again] == [ext for _, ext in results]
+
+
+@pytest.mark.parametrize("name, head, selected", [
+    ("photo.jpeg", JPEG, [".jpeg"]),
+    ("photo.jfif", JPEG, [".jfif"]),
+    ("logo.ai", PDF, [".ai"]),
+    ("scan.tif", b"II*\x00" + b"\x00" * 64, [".tif"]),
+    ("raw.dng", b"II*\x00" + b"\x00" * 64, [".dng"]),
+    ("clip.mpeg", b"\x00\x00\x01\xba" + b"\x00" * 64, [".mpeg"]),
+    ("notes.db", b"SQLite format 3\x00" + b"\x00" * 64, [".db"]),
+    ("events.jsonl", b'{"id": 1}\n{"id": 2}\n', [".jsonl"]),
+], ids=["jpeg", "jfif", "ai", "tif", "dng", "mpeg", "db", "jsonl"])
+def test_all_sniffing_keeps_aliased_names(make_config, source, events, name, head, selected):
+    write_file(os.path.join(source, name), head)
+    config = make_config(selected_category="Image All", selected_types=selected, content_sniffing="All")
+
+    plan = preview_changes(config, on_event=events.append)
+
+    assert [os.path.basename(entry.source) for entry in plan] == [name]
+
+
+def test_all_sniffing_routes_mislabeled_files_by_content(make_config, source, events):
+    write_file(os.path.join(source, "clip.jpg"), MP4)
+    write_file(os.path.join(source, "photo.jpg"), JPEG)
+    write_file(os.path.join(source, "photo.jpeg"), JPEG)
+    config = make_config(route_categories=["Video All", "Image Basic"], content_sniffing="All", ordered_scan=True)
+
+    plan = preview_changes(config, on_event=events.append)
+
+    assert {os.path.basename(entry.source): entry.category for entry in plan} == {
+        "clip.jpg": "Video All",
+        "photo.jpg": "Image Basic",
+        "photo.jpeg": "Image Basic",
+    }
+
+
+def test_all_sniffing_accepts_canonical_type_of_unselected_alias(make_config, source, events):
+    write_file(os.path.join(source, "photo.jpeg"), JPEG)
+    config = make_config(selected_category="Image Basic", selected_types=[".jpg"], content_sniffing="All")
+
+    assert len(preview_changes(config, on_event=events.append)) == 1
+
+
+def test_unknown_sniffing_matches_extensionless_files(make_config, source, events):
+    write_file(os.path.join(source, "clip"), MP4)
+    write_file(os.path.join(source, "notes"), b"plain text")
+
+    plan = preview_changes(make_config(content_sniffing="Unknown"), on_event=events.append)
+
+    assert [os.path.basename(entry.source) for entry in plan] == ["clip"]
+
+
+def test_all_sniffing_routes_extensionless_json(make_config, source, events):
+    write_file(os.path.join(source, "export"), b'{"items": []}')
+    config = make_config(route_categories=["JSON", "Video All"], content_sniffing="All")
+
+    assert [entry.category for entry in preview_changes(config, on_event=events.append)] == ["JSON"]
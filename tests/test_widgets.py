@@ -0,0 +1,21 @@
+"""Tests for the GUI widget helpers."""
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from gui.widgets import format_size  # noqa: E402
+from operations.plan import MISSING  # noqa: E402
+
+
+@pytest.mark.parametrize("size, text", [
+    (0, "0 B"),
+    (1023, "1023 B"),
+    (1024, "1.0 KiB"),
+    (1536, "1.5 KiB"),
+    (500 * 1024 ** 2, "500.0 MiB"),
+    (2 * 1024 ** 3, "2.0 GiB"),
+    (3 * 1024 ** 4, "3.0 TiB"),
+    (MISSING, "?"),
+])
+def test_format_size_uses_binary_units(size, text):
+    assert format_size(size) == text